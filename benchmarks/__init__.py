@@ -0,0 +1 @@
+"""Benchmarks de performance do airev (não fazem parte do pacote publicado)."""
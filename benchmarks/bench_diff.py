@@ -0,0 +1,238 @@
+"""Benchmark do pipeline de diff: parse, filtro de ignorados e montagem do prompt.
+
+Gera diffs sintéticos (ver synthetic.py) e mede, para cada estágio, a vazão
+(linhas ou caminhos por segundo, melhor de N execuções) e o pico de memória
+alocada pelo estágio (tracemalloc, em uma execução separada para não
+distorcer o tempo). Nenhum runner de IA é usado.
+
+Uso:
+
+    python -m benchmarks.bench_diff                  # todos os formatos
+    python -m benchmarks.bench_diff --shape large    # um formato
+    python -m benchmarks.bench_diff --scale 0.1      # execução rápida
+    python -m benchmarks.bench_diff --git            # inclui git diff real
+    python -m benchmarks.bench_diff --check          # falha em regressão
+"""
+
+import argparse
+import gc
+import json
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, NamedTuple, Optional
+
+from code_reviewer.diff_parser import (
+    is_ignored_file,
+    iter_diff_files,
+    parse_diff,
+    stream_git_diff,
+)
+from code_reviewer.prompt_builder import format_diff_for_prompt
+
+from .synthetic import SHAPES, DiffShape, create_repository, file_path, generate_diff
+
+# Verificações de caminho por arquivo do diff no estágio "ignore"
+IGNORE_CHECKS_PER_FILE = 200
+
+
+class Threshold(NamedTuple):
+    """Limites de regressão de um estágio.
+
+    As vazões mínimas ficam cerca de uma ordem de grandeza abaixo do medido
+    em uma máquina de desenvolvimento comum, para absorver variação entre
+    máquinas: o objetivo é pegar regressões de complexidade (ex: um passo
+    quadrático), não de poucos por cento.
+    """
+
+    min_rate: float
+    max_bytes_per_unit: float
+
+
+# Limites por estágio; formatos com linhas longas usam o limite específico
+THRESHOLDS: dict[str, Threshold] = {
+    "parse": Threshold(min_rate=25_000, max_bytes_per_unit=600),
+    "ignore": Threshold(min_rate=30_000, max_bytes_per_unit=50),
+    "prompt": Threshold(min_rate=100_000, max_bytes_per_unit=600),
+    "git": Threshold(min_rate=5_000, max_bytes_per_unit=600),
+}
+LONG_LINE_THRESHOLDS: dict[str, Threshold] = {
+    "parse": Threshold(min_rate=5_000, max_bytes_per_unit=8_000),
+    "prompt": Threshold(min_rate=10_000, max_bytes_per_unit=8_000),
+    "git": Threshold(min_rate=2_000, max_bytes_per_unit=8_000),
+}
+
+
+@dataclass
+class StageResult:
+    """Resultado de um estágio em um formato."""
+
+    shape: str
+    stage: str
+    units: int
+    unit: str
+    seconds: float
+    peak_bytes: int
+    regression: Optional[str] = None
+
+    @property
+    def rate(self) -> float:
+        """Unidades processadas por segundo."""
+        return self.units / self.seconds if self.seconds else float("inf")
+
+
+def measure(func: Callable[[], Any], repeat: int) -> tuple[float, int]:
+    """Mede o melhor tempo de N execuções e o pico de memória de uma execução.
+
+    Args:
+        func: Estágio a medir (sem argumentos)
+        repeat: Número de execuções cronometradas
+
+    Returns:
+        Tupla (melhor tempo em segundos, pico de bytes alocados)
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return best, peak
+
+
+def threshold_for(shape: DiffShape, stage: str) -> Threshold:
+    """Limite aplicável ao estágio no formato dado."""
+    if shape.line_length > 500 and stage in LONG_LINE_THRESHOLDS:
+        return LONG_LINE_THRESHOLDS[stage]
+    return THRESHOLDS[stage]
+
+
+def check_regression(result: StageResult, threshold: Threshold) -> Optional[str]:
+    """Compara o resultado com o limite e descreve a regressão, se houver."""
+    if result.rate < threshold.min_rate:
+        return f"vazão {result.rate:,.0f} < {threshold.min_rate:,.0f} {result.unit}/s"
+    bytes_per_unit = result.peak_bytes / max(1, result.units)
+    if bytes_per_unit > threshold.max_bytes_per_unit:
+        limit = threshold.max_bytes_per_unit
+        return f"memória {bytes_per_unit:,.0f} > {limit:,.0f} B/{result.unit}"
+    return None
+
+
+def run_shape(shape: DiffShape, repeat: int, with_git: bool) -> list[StageResult]:
+    """Executa todos os estágios para um formato de diff."""
+    # O git entrega bytes; o parser trabalha direto sobre eles
+    diff_text = generate_diff(shape).encode()
+    diff_lines = diff_text.count(b"\n")
+    results: list[StageResult] = []
+
+    def record(stage: str, units: int, unit: str, func: Callable[[], Any]) -> None:
+        seconds, peak = measure(func, repeat)
+        results.append(StageResult(shape.name, stage, units, unit, seconds, peak))
+
+    record("parse", diff_lines, "linhas", lambda: parse_diff(diff_text))
+
+    paths = [file_path(shape, i) for i in range(shape.files)] * IGNORE_CHECKS_PER_FILE
+    record("ignore", len(paths), "caminhos", lambda: [is_ignored_file(p) for p in paths])
+
+    diff_files = parse_diff(diff_text)
+    prompt_lines = sum(len(hunk) + 2 for f in diff_files for hunk in f.hunks)
+    record(
+        "prompt",
+        prompt_lines,
+        "linhas",
+        lambda files=diff_files: format_diff_for_prompt(files),
+    )
+    # Libera o diff parseado antes do estágio do git
+    del diff_files
+
+    if with_git:
+        with tempfile.TemporaryDirectory(prefix="airev-bench-") as tmp:
+            repo = create_repository(shape, Path(tmp))
+            record(
+                "git",
+                diff_lines,
+                "linhas",
+                lambda: list(iter_diff_files(stream_git_diff("main", repo))),
+            )
+
+    for result in results:
+        result.regression = check_regression(result, threshold_for(shape, result.stage))
+
+    return results
+
+
+def format_table(results: list[StageResult]) -> str:
+    """Formata os resultados como tabela de texto."""
+    header = (
+        f"{'formato':<12} {'estágio':<8} {'unidades':>10} {'vazão/s':>14} "
+        f"{'pico MB':>9}  status"
+    )
+    rows = [header, "-" * len(header)]
+    for r in results:
+        status = f"REGRESSÃO: {r.regression}" if r.regression else "ok"
+        rows.append(
+            f"{r.shape:<12} {r.stage:<8} {r.units:>10,} {r.rate:>14,.0f} "
+            f"{r.peak_bytes / 1024 / 1024:>9.1f}  {status}"
+        )
+    return "\n".join(rows)
+
+
+def max_rss_mb() -> float:
+    """Pico de RSS do processo inteiro, em MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KB, macOS em bytes
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Ponto de entrada do benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--shape",
+        action="append",
+        choices=sorted(SHAPES),
+        help="Formato a executar (repetível; padrão: todos)",
+    )
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="Multiplica o número de arquivos"
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Execuções cronometradas")
+    parser.add_argument("--git", action="store_true", help="Inclui git diff em repositório real")
+    parser.add_argument("--check", action="store_true", help="Sai com código 1 em regressão")
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    args = parser.parse_args(argv)
+
+    shapes = [SHAPES[name].scaled(args.scale) for name in (args.shape or SHAPES)]
+
+    results: list[StageResult] = []
+    for shape in shapes:
+        results.extend(run_shape(shape, args.repeat, args.git))
+
+    if args.json:
+        payload = [dict(asdict(r), rate=r.rate) for r in results]
+        print(json.dumps({"results": payload, "max_rss_mb": max_rss_mb()}, indent=2))
+    else:
+        print(format_table(results))
+        print(f"\nPico de RSS do processo: {max_rss_mb():.1f} MB")
+
+    if args.check and any(r.regression for r in results):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+"""Geração de diffs e repositórios sintéticos para os benchmarks.
+
+Todo o conteúdo é determinístico (derivado apenas do formato), então
+execuções diferentes medem exatamente a mesma entrada.
+"""
+
+import subprocess
+from dataclasses import dataclass, replace
+from pathlib import Path
+
+
+@dataclass(frozen=True)
+class DiffShape:
+    """Formato de um diff sintético."""
+
+    name: str
+    files: int
+    hunks_per_file: int
+    lines_per_hunk: int
+    line_length: int = 40
+    context_lines: int = 3
+    # Fração dos arquivos com caminho ignorado (lockfiles, node_modules, ...)
+    ignored_ratio: float = 0.1
+
+    @property
+    def total_lines(self) -> int:
+        """Número aproximado de linhas do diff (apenas linhas de hunk)."""
+        per_hunk = self.lines_per_hunk * 2 + self.context_lines * 2
+        return self.files * self.hunks_per_file * per_hunk
+
+    def scaled(self, factor: float) -> "DiffShape":
+        """Retorna o mesmo formato com o número de arquivos multiplicado."""
+        return replace(self, files=max(1, int(self.files * factor)))
+
+
+# Formatos padrão: muitos arquivos, diff enorme, linhas longas e hunks minúsculos
+SHAPES: dict[str, DiffShape] = {
+    shape.name: shape
+    for shape in (
+        DiffShape("many-files", files=1000, hunks_per_file=2, lines_per_hunk=5),
+        DiffShape("large", files=500, hunks_per_file=50, lines_per_hunk=17),
+        DiffShape("long-lines", files=200, hunks_per_file=5, lines_per_hunk=10, line_length=2000),
+        DiffShape(
+            "tiny-hunks", files=200, hunks_per_file=500, lines_per_hunk=1, context_lines=0
+        ),
+    )
+}
+
+IGNORED_PREFIXES = ("node_modules/pkg", "dist", "build")
+
+
+def file_path(shape: DiffShape, index: int) -> str:
+    """Caminho do i-ésimo arquivo do diff sintético."""
+    if shape.ignored_ratio and index % round(1 / shape.ignored_ratio) == 0:
+        prefix = IGNORED_PREFIXES[index % len(IGNORED_PREFIXES)]
+        return f"{prefix}/gen_{index:05d}.js"
+    return f"src/pkg_{index % 50:02d}/module_{index:05d}.py"
+
+
+def _line(shape: DiffShape, tag: str, number: int) -> str:
+    """Linha de código com o comprimento configurado no formato."""
+    head = f"    value_{tag}_{number} = compute({number}, "
+    padding = shape.line_length - len(head) - 1
+    return head + "x" * max(0, padding) + ")"
+
+
+def generate_diff(shape: DiffShape) -> str:
+    """Gera um diff unificado sintético no formato do git diff.
+
+    Args:
+        shape: Formato do diff
+
+    Returns:
+        Texto do diff
+    """
+    parts: list[str] = []
+    step = shape.lines_per_hunk + shape.context_lines * 2 + 10
+
+    for index in range(shape.files):
+        path = file_path(shape, index)
+        parts.append(f"diff --git a/{path} b/{path}")
+        parts.append("index 1234567..89abcde 100644")
+        parts.append(f"--- a/{path}")
+        parts.append(f"+++ b/{path}")
+
+        for hunk in range(shape.hunks_per_file):
+            start = 1 + hunk * step
+            size = shape.lines_per_hunk + shape.context_lines * 2
+            parts.append(f"@@ -{start},{size} +{start},{size} @@ def func_{hunk}(arg):")
+            for c in range(shape.context_lines):
+                parts.append(" " + _line(shape, "ctx", start + c))
+            for n in range(shape.lines_per_hunk):
+                parts.append("-" + _line(shape, "old", start + n))
+            for n in range(shape.lines_per_hunk):
+                parts.append("+" + _line(shape, "new", start + n))
+            for c in range(shape.context_lines):
+                parts.append(" " + _line(shape, "end", start + c))
+
+    parts.append("")
+    return "\n".join(parts)
+
+
+def _git(repo: Path, *args: str) -> None:
+    subprocess.run(
+        ["git", "-c", "user.name=bench", "-c", "user.email=bench@example.com", *args],
+        cwd=repo,
+        check=True,
+        capture_output=True,
+    )
+
+
+def create_repository(shape: DiffShape, root: Path) -> Path:
+    """Cria um repositório git cujo diff feature...main tem o formato dado.
+
+    A branch ``main`` recebe os arquivos originais e a branch ``feature``
+    reescreve as linhas de cada hunk.
+
+    Args:
+        shape: Formato do diff
+        root: Diretório (vazio) onde o repositório é criado
+
+    Returns:
+        Caminho do repositório
+    """
+    step = shape.lines_per_hunk + shape.context_lines * 2 + 10
+    lines_per_file = shape.hunks_per_file * step
+
+    def write_files(tag: str) -> None:
+        for index in range(shape.files):
+            path = root / file_path(shape, index)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            lines = []
+            for number in range(1, lines_per_file + 1):
+                offset = (number - 1) % step
+                changed = shape.context_lines <= offset < shape.context_lines + shape.lines_per_hunk
+                lines.append(_line(shape, tag if changed else "ctx", number))
+            path.write_text("\n".join(lines) + "\n")
+
+    _git(root, "init", "-q", "-b", "main")
+    write_files("old")
+    _git(root, "add", "-A")
+    _git(root, "commit", "-q", "-m", "base")
+    _git(root, "checkout", "-q", "-b", "feature")
+    write_files("new")
+    _git(root, "commit", "-q", "-am", "feature")
+    return root
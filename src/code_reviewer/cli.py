@@ -1,22 +1,60 @@
 """CLI Entry Point - Comando principal do airev."""
 
+import sqlite3
+import subprocess
 import sys
 import time
+from contextlib import ExitStack
+from itertools import chain
 from pathlib import Path
 
 import click
 
 from . import __version__
-from .context_builder import build_context_graph
+from .compact_diff import CompactDiffFile
+from .context_builder import (
+    DEFAULT_CONTEXT_DEPTH,
+    DEFAULT_CONTEXT_TOKENS,
+    build_context_graph,
+)
 from .description_input import get_description
-from .diff_parser import get_current_branch, get_git_diff, parse_diff
+from .diff_cache import DiffCache, cache_key
+from .diff_parser import (
+    DEFAULT_RENAME_THRESHOLD,
+    FileStat,
+    get_current_branch,
+    get_diff_numstat,
+    get_head_sha,
+    get_merge_base,
+    iter_diff_files,
+    parallel_parse_diff,
+    stream_git_diff,
+)
 from .formatters.progress import ProgressReporter
 from .formatters.terminal import format_result
 from .i18n import get_available_languages, set_language, t
-from .models import ReviewSummary, Severity
+from .ignore_rules import IgnoreRules
+from .incremental import (
+    build_review_state,
+    is_ancestor,
+    load_review_state,
+    merge_review,
+    save_review_state,
+    state_to_result,
+)
+from .models import (
+    ContextGraph,
+    ReviewResult,
+    ReviewState,
+    ReviewSummary,
+    Severity,
+)
 from .prompt_builder import build_prompt
 from .response_parser import parse_response
 from .runners import DEFAULT_RUNNER, RunnerNotFoundError, get_runner, list_runners
+from .search_scope import resolve_search_root
+from .symbol_index import SymbolIndex
+from .trigram_index import TrigramIndex
 from .updater import check_for_update, notify_update, run_upgrade
 
 
@@ -110,6 +148,85 @@ def main():
     default=3,
     help="Linhas de contexto no diff (default: 3). Use 0 para desabilitar.",
 )
+@click.option(
+    "--jobs",
+    type=click.IntRange(1, 64),
+    default=1,
+    help=(
+        "Processos para extrair o diff em paralelo (default: 1). "
+        "Útil em branches com milhares de arquivos."
+    ),
+)
+@click.option(
+    "--rename-threshold",
+    type=click.IntRange(0, 100),
+    default=DEFAULT_RENAME_THRESHOLD,
+    help=(
+        "Similaridade mínima (%) para detectar arquivos renomeados/copiados "
+        "(default: 50). Use 0 para desabilitar."
+    ),
+)
+@click.option(
+    "--max-file-lines",
+    type=click.IntRange(min=0),
+    default=0,
+    help=(
+        "Ignora arquivos com mais de N linhas alteradas "
+        "(default: 0, nenhum arquivo é ignorado)."
+    ),
+)
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    default=False,
+    help="Não usa o cache de diffs parseados (~/.cache/airev)",
+)
+@click.option(
+    "--no-symbol-index",
+    is_flag=True,
+    default=False,
+    help="Não usa o índice de símbolos (.git/airev/index); busca o contexto com grep",
+)
+@click.option(
+    "--trigram-index",
+    is_flag=True,
+    default=False,
+    help=(
+        "Sem índice de símbolos, restringe o grep com um índice de trigramas "
+        "(.git/airev/trigrams)"
+    ),
+)
+@click.option(
+    "--context-tokens",
+    type=click.IntRange(min=0),
+    default=DEFAULT_CONTEXT_TOKENS,
+    help=(
+        "Orçamento (tokens estimados) de funções e referências no prompt "
+        f"(default: {DEFAULT_CONTEXT_TOKENS}). Use 0 para desabilitar."
+    ),
+)
+@click.option(
+    "--context-depth",
+    type=click.IntRange(1, 5),
+    default=DEFAULT_CONTEXT_DEPTH,
+    help=(
+        "Níveis de callers/callees a partir das funções modificadas "
+        f"(default: {DEFAULT_CONTEXT_DEPTH})"
+    ),
+)
+@click.option(
+    "--search-root",
+    "search_roots",
+    multiple=True,
+    help="Diretório tratado como pacote ao limitar as buscas de contexto (pode repetir)",
+)
+@click.option(
+    "--incremental",
+    "-i",
+    is_flag=True,
+    default=False,
+    help="Revisa apenas os commits desde a última revisão desta branch e combina os findings",
+)
 @click.option(
     "--show-deps",
     "-D",
@@ -130,6 +247,16 @@ def review(
     no_interactive: bool,
     min_confidence: int,
     context_lines: int,
+    jobs: int,
+    rename_threshold: int,
+    max_file_lines: int,
+    no_cache: bool,
+    no_symbol_index: bool,
+    trigram_index: bool,
+    context_tokens: int,
+    context_depth: int,
+    search_roots: tuple[str, ...],
+    incremental: bool,
     show_deps: bool,
 ):
     """Analisa o diff da branch atual contra a branch base.
@@ -157,6 +284,14 @@ def review(
         airev review --base main --context-lines 5  # Mais contexto no diff
 
         airev review --base main -C 0  # Sem linhas de contexto
+
+        airev review --base release --jobs 8  # Diff paralelo para branches grandes
+
+        airev review --base main --max-file-lines 5000  # Ignora arquivos gerados enormes
+
+        airev review --base main --incremental  # Apenas commits novos desde a última revisão
+
+        airev review --base main --context-tokens 4000  # Contexto menor para diffs grandes
     """
     workdir = workdir or Path.cwd()
     start_time = time.perf_counter()
@@ -189,6 +324,13 @@ def review(
             # Falha silenciosa - não bloqueia execução
             pass
 
+    # Raízes de busca relativas à raiz do repositório; fora dele são rejeitadas
+    try:
+        search_roots = tuple(resolve_search_root(root, workdir) for root in search_roots)
+    except ValueError as e:
+        reporter.error(t("cli.error_search_root", error=e))
+        sys.exit(1)
+
     # Obtém o nome da branch atual
     try:
         current_branch = get_current_branch(workdir)
@@ -198,30 +340,125 @@ def review(
 
     reporter.info(t("cli.analyzing", branch=current_branch, base=base))
 
-    # Obtém o diff
+    # Regras de arquivos ignorados (padrão + .airevignore), aplicadas no próprio git
+    ignore_rules = IgnoreRules.load(workdir)
+
+    # Modo incremental: o diff cobre apenas ultimo_sha..HEAD
+    # (ultimo_sha...HEAD equivale a ultimo_sha..HEAD quando ele é ancestral de HEAD)
+    diff_base = base
+    head_sha = ""
+    previous_state: ReviewState | None = None
+    # Em HEAD destacado (comum em CI) não há branch para chavear o estado
+    if incremental and current_branch == "HEAD":
+        reporter.warning(t("cli.incremental_detached"))
+        incremental = False
+    if incremental:
+        try:
+            head_sha = get_head_sha(workdir)
+        except Exception as e:
+            reporter.error(t("cli.error_diff", error=e))
+            sys.exit(1)
+
+        previous_state = load_review_state(workdir, current_branch)
+        if previous_state and previous_state.base == base:
+            if previous_state.head == head_sha:
+                reporter.info(t("cli.incremental_up_to_date", sha=head_sha[:8]))
+                _output_result(
+                    state_to_result(previous_state),
+                    reporter,
+                    json_output=json_output,
+                    min_confidence=min_confidence,
+                    context_graphs=[],
+                    show_deps=show_deps,
+                    start_time=start_time,
+                )
+                return
+            if is_ancestor(previous_state.head, workdir):
+                diff_base = previous_state.head
+                reporter.info(t("cli.incremental_since", sha=diff_base[:8]))
+            else:
+                previous_state = None
+        else:
+            previous_state = None
+
+        if previous_state is None:
+            reporter.info(t("cli.incremental_full"))
+
+    # Prepass barato (--numstat): contagens por arquivo antes do parse completo
     with reporter.status(t("cli.getting_diff")):
         try:
-            diff_output = get_git_diff(base, workdir, context_lines=context_lines)
+            numstat = get_diff_numstat(diff_base, workdir, ignore_rules, rename_threshold)
         except Exception as e:
             reporter.error(t("cli.error_diff", error=e))
             reporter.print(t("cli.error_diff_help", base=base))
             sys.exit(1)
 
-    if not diff_output.strip():
+    if not numstat:
         reporter.warning(t("cli.no_changes"))
         sys.exit(0)
 
-    # Parseia o diff
-    with reporter.status(t("cli.analyzing_diff")):
-        diff_files = parse_diff(diff_output)
+    # Arquivos enormes (geralmente gerados) ficam fora do parse e do prompt
+    if max_file_lines:
+        large_stats = [stat for stat in numstat if stat.changed > max_file_lines]
+        large_files = [stat.path for stat in large_stats]
+        if large_files:
+            reporter.warning(
+                t(
+                    "cli.skipped_large_files",
+                    count=len(large_files),
+                    limit=max_file_lines,
+                    files=", ".join(large_files),
+                )
+            )
+            # Sem o caminho antigo, o git deixa de parear a renomeação e o
+            # arquivo original voltaria ao diff como removido
+            ignore_rules = ignore_rules.excluding(
+                [*large_files, *(stat.old_path for stat in large_stats if stat.old_path)]
+            )
+            numstat = [stat for stat in numstat if not ignore_rules.matches(stat.path)]
+
+    file_stats = {stat.path: stat for stat in numstat}
+
+    # Cache de diffs parseados, indexado pelos SHAs do merge-base e de HEAD
+    cache: DiffCache | None = None
+    key = ""
+    if not no_cache:
+        try:
+            key = cache_key(
+                get_merge_base(diff_base, workdir),
+                get_head_sha(workdir),
+                context_lines,
+                ignore_rules,
+                rename_threshold,
+            )
+            cache = DiffCache()
+        except Exception:
+            # Sem SHAs resolvidos o cache é desativado; erros reais surgem no diff
+            cache = None
+
+    diff_files = cache.get(key) if cache else None
+
+    if diff_files is None:
+        diff_files = _load_diff_files(
+            reporter,
+            diff_base,
+            workdir,
+            context_lines,
+            ignore_rules,
+            jobs,
+            rename_threshold,
+            numstat,
+        )
+        if cache:
+            cache.put(key, diff_files)
 
     if not diff_files:
         reporter.warning(t("cli.no_files"))
         sys.exit(0)
 
     # Exibe arquivos modificados
-    reporter.show_diff_files(diff_files)
-    reporter.show_diff_summary(diff_files)
+    reporter.show_diff_files(diff_files, file_stats)
+    reporter.show_diff_summary(diff_files, file_stats)
 
     # Obtém descrição das alterações (após mostrar diff para contexto)
     change_description = get_description(
@@ -231,9 +468,41 @@ def review(
         reporter=reporter,
     )
 
-    # Constrói contexto (backtracking)
-    with reporter.status(t("cli.building_context")):
-        context_graphs = build_context_graph(diff_files, workdir)
+    # Os índices são fechados mesmo se a construção do contexto falhar
+    with ExitStack() as indexes:
+        # Índice de símbolos (.git/airev/index); sem ele o contexto usa grep
+        symbol_index: SymbolIndex | None = None
+        if not no_symbol_index:
+            with reporter.status(t("cli.updating_index")):
+                try:
+                    symbol_index = SymbolIndex.open(workdir)
+                except (subprocess.CalledProcessError, sqlite3.Error, OSError):
+                    symbol_index = None
+            if symbol_index is not None:
+                indexes.callback(symbol_index.close)
+
+        # Sem índice de símbolos, o índice de trigramas restringe o grep
+        trigrams: TrigramIndex | None = None
+        if symbol_index is None and trigram_index:
+            with reporter.status(t("cli.updating_trigram_index")):
+                try:
+                    trigrams = TrigramIndex.open(workdir)
+                except (subprocess.CalledProcessError, OSError):
+                    trigrams = None
+            if trigrams is not None:
+                indexes.callback(trigrams.close)
+
+        # Constrói contexto (backtracking)
+        with reporter.status(t("cli.building_context")):
+            context_graphs = build_context_graph(
+                diff_files,
+                workdir,
+                symbol_index,
+                token_budget=context_tokens,
+                max_depth=context_depth,
+                search_roots=search_roots,
+                trigrams=trigrams,
+            )
 
     # Exibe dependências encontradas
     if context_graphs:
@@ -285,6 +554,43 @@ def review(
             files_analyzed=len(diff_files),
         )
 
+    # Modo incremental: combina com os findings de arquivos que não mudaram.
+    # Respostas não estruturadas não viram estado para não contaminar a próxima execução
+    if incremental and result.raw_response is None:
+        # Findings do caminho antigo de arquivos renomeados também são substituídos
+        changed_files = {diff_file.path for diff_file in diff_files}
+        changed_files.update(
+            diff_file.old_path for diff_file in diff_files if diff_file.is_renamed
+        )
+        result = merge_review(previous_state, result, changed_files)
+        save_review_state(
+            workdir,
+            build_review_state(
+                current_branch, base, head_sha, previous_state, result, changed_files
+            ),
+        )
+
+    _output_result(
+        result,
+        reporter,
+        json_output=json_output,
+        min_confidence=min_confidence,
+        context_graphs=context_graphs,
+        show_deps=show_deps,
+        start_time=start_time,
+    )
+
+
+def _output_result(
+    result: ReviewResult,
+    reporter: ProgressReporter,
+    json_output: bool,
+    min_confidence: int,
+    context_graphs: list[ContextGraph],
+    show_deps: bool,
+    start_time: float,
+) -> None:
+    """Filtra os findings por confidence e exibe o resultado final."""
     # Filtra findings por confidence
     if min_confidence > 1:
         filtered_findings = [
@@ -325,6 +631,87 @@ def review(
         reporter.success(t("cli.analysis_complete", elapsed=elapsed))
 
 
+def _load_diff_files(
+    reporter: ProgressReporter,
+    base: str,
+    workdir: Path,
+    context_lines: int,
+    ignore_rules: IgnoreRules,
+    jobs: int,
+    rename_threshold: int = DEFAULT_RENAME_THRESHOLD,
+    numstat: list[FileStat] | None = None,
+) -> list[CompactDiffFile]:
+    """Extrai e parseia o diff, em paralelo (jobs > 1) ou em um único processo git."""
+    if jobs <= 1:
+        return _read_diff_sequential(
+            reporter, base, workdir, context_lines, ignore_rules, rename_threshold
+        )
+
+    # Extração paralela por arquivo para change sets muito grandes
+    with reporter.status(t("cli.getting_diff")):
+        try:
+            return parallel_parse_diff(
+                base,
+                workdir,
+                context_lines=context_lines,
+                ignore_rules=ignore_rules,
+                jobs=jobs,
+                stats=numstat,
+                rename_threshold=rename_threshold,
+            )
+        except Exception as e:
+            reporter.error(t("cli.error_diff", error=e))
+            reporter.print(t("cli.error_diff_help", base=base))
+            sys.exit(1)
+
+
+def _read_diff_sequential(
+    reporter: ProgressReporter,
+    base: str,
+    workdir: Path,
+    context_lines: int,
+    ignore_rules: IgnoreRules,
+    rename_threshold: int = DEFAULT_RENAME_THRESHOLD,
+) -> list[CompactDiffFile]:
+    """Obtém e parseia o diff, com o parser consumindo a saída do git enquanto ela chega.
+
+    O resultado é materializado em uma lista: a listagem de arquivos, o
+    contexto, o prompt e o cache precisam de todos os arquivos, e o prompt
+    é uma única string. O pico de memória fica, portanto, próximo do diff
+    inteiro em forma compacta (bytes, ver compact_diff), e não do maior
+    arquivo; o ganho em relação ao modo bufferizado é evitar as cópias do
+    texto completo e das linhas divididas.
+
+    Encerra o processo com a mensagem adequada se o diff falhar ou estiver vazio.
+    """
+    with reporter.status(t("cli.getting_diff")):
+        try:
+            diff_lines = stream_git_diff(
+                base,
+                workdir,
+                context_lines=context_lines,
+                ignore_rules=ignore_rules,
+                rename_threshold=rename_threshold,
+            )
+            first_line = next(diff_lines, None)
+        except Exception as e:
+            reporter.error(t("cli.error_diff", error=e))
+            reporter.print(t("cli.error_diff_help", base=base))
+            sys.exit(1)
+
+    if first_line is None:
+        reporter.warning(t("cli.no_changes"))
+        sys.exit(0)
+
+    with reporter.status(t("cli.analyzing_diff")):
+        try:
+            return list(iter_diff_files(chain([first_line], diff_lines), ignore_rules))
+        except Exception as e:
+            reporter.error(t("cli.error_diff", error=e))
+            reporter.print(t("cli.error_diff_help", base=base))
+            sys.exit(1)
+
+
 @main.command()
 def runners():
     """Lista os runners de IA disponíveis."""
@@ -0,0 +1,384 @@
+"""Representação compacta do diff parseado.
+
+Os modelos Pydantic (DiffHunk/DiffLine) validam e alocam um objeto por linha
+do diff, o que domina tempo e memória em diffs grandes. Internamente o parser
+usa estas estruturas: cada hunk guarda os números de linha em arrays e todo o
+conteúdo em um único buffer de bytes com offsets. O conteúdo só é decodificado
+(UTF-8, bytes inválidos substituídos) quando a linha é lida, então arquivos
+descartados nunca pagam a decodificação. parse_diff, iter_diff_files e
+parallel_parse_diff retornam estes objetos, com a mesma API de leitura dos
+modelos; to_model converte um arquivo quando é preciso o modelo Pydantic
+(por exemplo, para serializar em JSON).
+"""
+
+from array import array
+from collections.abc import Iterator, Sequence
+from typing import NamedTuple, Optional, Union
+
+from .models import DiffFile, DiffHunk, DiffLine
+
+# Tipos de linha, armazenados como o próprio prefixo do diff
+ADDED = ord("+")
+REMOVED = ord("-")
+CONTEXT = ord(" ")
+
+# Decodificação do conteúdo: um byte inválido nunca interrompe a revisão
+ENCODING = "utf-8"
+DECODE_ERRORS = "replace"
+
+
+class LineRecord(NamedTuple):
+    """Visão leve de uma linha do hunk (mesmos campos de DiffLine)."""
+
+    line_number: int
+    content: str
+    is_addition: bool
+
+
+class CompactHunk:
+    """Hunk do diff com armazenamento compacto das linhas.
+
+    Mantém a ordem original do diff: kinds[i] é o prefixo da i-ésima linha,
+    numbers[i] seu número (lado antigo para removidas, novo para as demais)
+    e o conteúdo fica, em bytes, em buffer[offsets[i]:offsets[i + 1]].
+    """
+
+    __slots__ = (
+        "function_name",
+        "start_line_old",
+        "start_line_new",
+        "added_count",
+        "removed_count",
+        "_kinds",
+        "_numbers",
+        "_offsets",
+        "_buffer",
+        "_pending",
+    )
+
+    def __init__(
+        self,
+        function_name: Optional[str],
+        start_line_old: int,
+        start_line_new: int,
+    ):
+        self.function_name = function_name
+        self.start_line_old = start_line_old
+        self.start_line_new = start_line_new
+        self.added_count = 0
+        self.removed_count = 0
+        self._kinds = bytearray()
+        self._numbers = array("l")
+        self._offsets = array("l", [0])
+        self._buffer = b""
+        self._pending: Optional[list[bytes]] = []
+
+    def append(self, kind: int, line_number: int, content: Union[bytes, str]) -> None:
+        """Adiciona uma linha ao hunk (usado pelo parser).
+
+        Args:
+            kind: ADDED, REMOVED ou CONTEXT
+            line_number: Número da linha no arquivo
+            content: Conteúdo da linha, sem o prefixo do diff (bytes como
+                saíram do git; str é codificado em UTF-8)
+        """
+        if isinstance(content, str):
+            content = content.encode(ENCODING, "surrogateescape")
+
+        if self._pending is None:
+            # Hunk já congelado: reabre o buffer para novas linhas
+            self._pending = [self._buffer]
+            self._buffer = b""
+
+        self._kinds.append(kind)
+        self._numbers.append(line_number)
+        self._offsets.append(self._offsets[-1] + len(content))
+        self._pending.append(content)
+
+        if kind == ADDED:
+            self.added_count += 1
+        elif kind == REMOVED:
+            self.removed_count += 1
+
+    def freeze(self) -> None:
+        """Concatena o conteúdo pendente em um único buffer."""
+        if self._pending is not None:
+            self._buffer = b"".join(self._pending)
+            self._pending = None
+
+    def __len__(self) -> int:
+        return len(self._kinds)
+
+    def iter_lines(self) -> Iterator[tuple[str, int, str]]:
+        """Itera as linhas na ordem do diff.
+
+        Yields:
+            Tuplas (prefixo, número_da_linha, conteúdo decodificado)
+        """
+        self.freeze()
+        # memoryview: cada fatia é decodificada sem cópia intermediária
+        view = memoryview(self._buffer)
+        offsets = self._offsets
+        numbers = self._numbers
+        for i, kind in enumerate(self._kinds):
+            content = str(view[offsets[i] : offsets[i + 1]], ENCODING, DECODE_ERRORS)
+            yield chr(kind), numbers[i], content
+
+    def _records(self, kind: int) -> list[LineRecord]:
+        """Materializa (e decodifica) as linhas de um tipo como LineRecord."""
+        self.freeze()
+        view = memoryview(self._buffer)
+        offsets = self._offsets
+        numbers = self._numbers
+        is_addition = kind == ADDED
+        return [
+            LineRecord(
+                numbers[i],
+                str(view[offsets[i] : offsets[i + 1]], ENCODING, DECODE_ERRORS),
+                is_addition,
+            )
+            for i, k in enumerate(self._kinds)
+            if k == kind
+        ]
+
+    @property
+    def added_lines(self) -> list[LineRecord]:
+        """Linhas adicionadas."""
+        return self._records(ADDED)
+
+    @property
+    def removed_lines(self) -> list[LineRecord]:
+        """Linhas removidas."""
+        return self._records(REMOVED)
+
+    @property
+    def context_lines(self) -> list[LineRecord]:
+        """Linhas de contexto (sem modificação)."""
+        return self._records(CONTEXT)
+
+    def to_state(self) -> tuple:
+        """Estado do hunk apenas com tipos primitivos (bytes, int, str).
+
+        Usado na serialização binária do cache de diffs.
+        """
+        self.freeze()
+        return (
+            self.function_name,
+            self.start_line_old,
+            self.start_line_new,
+            self.added_count,
+            self.removed_count,
+            bytes(self._kinds),
+            self._numbers.tobytes(),
+            self._offsets.tobytes(),
+            self._buffer,
+        )
+
+    @classmethod
+    def from_state(cls, state: tuple) -> "CompactHunk":
+        """Reconstrói um hunk a partir de to_state()."""
+        (
+            function_name,
+            start_line_old,
+            start_line_new,
+            added_count,
+            removed_count,
+            kinds,
+            numbers,
+            offsets,
+            buffer,
+        ) = state
+        hunk = cls(function_name, start_line_old, start_line_new)
+        hunk.added_count = added_count
+        hunk.removed_count = removed_count
+        hunk._kinds = bytearray(kinds)
+        hunk._numbers = array("l")
+        hunk._numbers.frombytes(numbers)
+        hunk._offsets = array("l")
+        hunk._offsets.frombytes(offsets)
+        hunk._buffer = buffer
+        hunk._pending = None
+        return hunk
+
+    def to_model(self) -> DiffHunk:
+        """Converte para o modelo Pydantic público."""
+        return DiffHunk(
+            function_name=self.function_name,
+            start_line_old=self.start_line_old,
+            start_line_new=self.start_line_new,
+            added_lines=[DiffLine(**r._asdict()) for r in self.added_lines],
+            removed_lines=[DiffLine(**r._asdict()) for r in self.removed_lines],
+            context_lines=[DiffLine(**r._asdict()) for r in self.context_lines],
+        )
+
+    @classmethod
+    def from_model(cls, hunk: DiffHunk) -> "CompactHunk":
+        """Cria um hunk compacto a partir do modelo Pydantic.
+
+        O modelo não guarda a ordem original do diff, então as linhas são
+        intercaladas por número de linha (removidas, adicionadas, contexto).
+        """
+        lines: list[tuple[int, int, str]] = []
+        lines.extend((line.line_number, REMOVED, line.content) for line in hunk.removed_lines)
+        lines.extend((line.line_number, ADDED, line.content) for line in hunk.added_lines)
+        lines.extend((line.line_number, CONTEXT, line.content) for line in hunk.context_lines)
+        lines.sort(key=lambda x: x[0])
+
+        compact = cls(hunk.function_name, hunk.start_line_old, hunk.start_line_new)
+        for number, kind, content in lines:
+            compact.append(kind, number, content)
+        compact.freeze()
+        return compact
+
+
+class CompactDiffFile:
+    """Arquivo modificado no diff, com hunks compactos."""
+
+    __slots__ = (
+        "path",
+        "hunks",
+        "is_new",
+        "is_deleted",
+        "old_path",
+        "is_renamed",
+        "is_copied",
+        "similarity",
+    )
+
+    def __init__(
+        self,
+        path: str,
+        hunks: Optional[list[CompactHunk]] = None,
+        is_new: bool = False,
+        is_deleted: bool = False,
+        old_path: Optional[str] = None,
+        is_renamed: bool = False,
+        is_copied: bool = False,
+        similarity: Optional[int] = None,
+    ):
+        self.path = path
+        self.hunks: list[CompactHunk] = hunks if hunks is not None else []
+        self.is_new = is_new
+        self.is_deleted = is_deleted
+        self.old_path = old_path
+        self.is_renamed = is_renamed
+        self.is_copied = is_copied
+        self.similarity = similarity
+
+    @property
+    def added_count(self) -> int:
+        """Total de linhas adicionadas no arquivo."""
+        return sum(hunk.added_count for hunk in self.hunks)
+
+    @property
+    def removed_count(self) -> int:
+        """Total de linhas removidas no arquivo."""
+        return sum(hunk.removed_count for hunk in self.hunks)
+
+    def to_state(self) -> tuple:
+        """Estado do arquivo apenas com tipos primitivos (ver CompactHunk.to_state)."""
+        return (
+            self.path,
+            self.is_new,
+            self.is_deleted,
+            self.old_path,
+            self.is_renamed,
+            self.is_copied,
+            self.similarity,
+            [hunk.to_state() for hunk in self.hunks],
+        )
+
+    @classmethod
+    def from_state(cls, state: tuple) -> "CompactDiffFile":
+        """Reconstrói um arquivo a partir de to_state()."""
+        path, is_new, is_deleted, old_path, is_renamed, is_copied, similarity, hunks = state
+        return cls(
+            path=path,
+            hunks=[CompactHunk.from_state(hunk) for hunk in hunks],
+            is_new=is_new,
+            is_deleted=is_deleted,
+            old_path=old_path,
+            is_renamed=is_renamed,
+            is_copied=is_copied,
+            similarity=similarity,
+        )
+
+    def to_model(self) -> DiffFile:
+        """Converte para o modelo Pydantic público."""
+        return DiffFile(
+            path=self.path,
+            hunks=[hunk.to_model() for hunk in self.hunks],
+            is_new=self.is_new,
+            is_deleted=self.is_deleted,
+            old_path=self.old_path,
+            is_renamed=self.is_renamed,
+            is_copied=self.is_copied,
+            similarity=self.similarity,
+        )
+
+    @classmethod
+    def from_model(cls, diff_file: DiffFile) -> "CompactDiffFile":
+        """Cria um arquivo compacto a partir do modelo Pydantic."""
+        return cls(
+            path=diff_file.path,
+            hunks=[CompactHunk.from_model(hunk) for hunk in diff_file.hunks],
+            is_new=diff_file.is_new,
+            is_deleted=diff_file.is_deleted,
+            old_path=diff_file.old_path,
+            is_renamed=diff_file.is_renamed,
+            is_copied=diff_file.is_copied,
+            similarity=diff_file.similarity,
+        )
+
+
+# Qualquer uma das representações aceitas pelos consumidores do diff
+DiffFileLike = Union[DiffFile, CompactDiffFile]
+DiffHunkLike = Union[DiffHunk, CompactHunk]
+
+
+def as_compact(diff_file: DiffFileLike) -> CompactDiffFile:
+    """Retorna a representação compacta de um arquivo do diff.
+
+    Args:
+        diff_file: Arquivo compacto (retornado como está) ou modelo Pydantic
+
+    Returns:
+        CompactDiffFile equivalente
+    """
+    if isinstance(diff_file, CompactDiffFile):
+        return diff_file
+    return CompactDiffFile.from_model(diff_file)
+
+
+def count_changes(diff_file: DiffFileLike) -> tuple[int, int]:
+    """Conta linhas adicionadas e removidas sem materializar as linhas.
+
+    Args:
+        diff_file: Arquivo do diff em qualquer representação
+
+    Returns:
+        Tupla (adicionadas, removidas)
+    """
+    if isinstance(diff_file, CompactDiffFile):
+        return diff_file.added_count, diff_file.removed_count
+    added = sum(len(hunk.added_lines) for hunk in diff_file.hunks)
+    removed = sum(len(hunk.removed_lines) for hunk in diff_file.hunks)
+    return added, removed
+
+
+def total_changes(diff_files: Sequence[DiffFileLike]) -> tuple[int, int]:
+    """Soma linhas adicionadas e removidas de todos os arquivos.
+
+    Args:
+        diff_files: Arquivos do diff
+
+    Returns:
+        Tupla (adicionadas, removidas)
+    """
+    total_added = 0
+    total_removed = 0
+    for diff_file in diff_files:
+        added, removed = count_changes(diff_file)
+        total_added += added
+        total_removed += removed
+    return total_added, total_removed
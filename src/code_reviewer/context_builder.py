@@ -1,43 +1,188 @@
 """Context Builder - Backtracking de callers/callees."""
 
+import functools
 import re
 import subprocess
-from pathlib import Path
-from typing import Optional
-
-from .models import ContextGraph, DiffFile, FunctionRef
-
-# Diretórios excluídos do backtracking
-EXCLUDED_DIRS = [
-    "node_modules",
-    "venv",
-    ".venv",
-    "env",
-    ".env",
-    ".git",
-    "__pycache__",
-    ".pytest_cache",
-    ".mypy_cache",
-    "dist",
-    "build",
-    ".tox",
-    ".eggs",
-    "*.egg-info",
-    "vendor",
-    "third_party",
-]
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Generator, Hashable, Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import closing
+from pathlib import Path, PurePosixPath
+from typing import TYPE_CHECKING, Generic, NamedTuple, Optional, TypeVar
+
+from .compact_diff import DiffFileLike, DiffHunkLike
+from .extractors import (
+    Definition,
+    FileSymbols,
+    extract_file,
+    extractor_key,
+    get_extractor,
+    load_extractor,
+)
+from .definition_intervals import DefinitionIntervals
+from .file_cache import CachedFile, FileCache
+from .file_scanner import Match, scan_files
+from .models import ContextGraph, FunctionRef
+from .search_scope import SearchScopes, load_search_scopes
+from .source_files import list_source_files
+
+if TYPE_CHECKING:
+    from .symbol_index import SymbolIndex
+    from .trigram_index import TrigramIndex
 
 # Limites para controlar tamanho do contexto
 MAX_REFS_PER_SYMBOL = 5
 MAX_CONTEXT_LINES = 10
+# Linhas máximas do trecho enviado por função modificada
+MAX_EXCERPT_LINES = 120
+# Assinaturas de definições vizinhas enviadas por função modificada
+MAX_SIBLING_SIGNATURES = 20
+
+# Orçamento padrão (tokens estimados) de trechos e referências no prompt
+DEFAULT_CONTEXT_TOKENS = 12000
+# Níveis padrão de callers/callees a partir das funções modificadas
+DEFAULT_CONTEXT_DEPTH = 2
+# Caracteres por token na estimativa do orçamento
+CHARS_PER_TOKEN = 4
+
+# Nome do nó das alterações fora de qualquer definição (sem callers a buscar)
+MODULE_SCOPE = "<módulo>"
+
+# Threads para leitura dos arquivos do diff e consultas de símbolos
+CONTEXT_WORKERS = 8
+
+# Chamadas que não são buscadas como callees (palavras-chave e builtins comuns)
+IGNORED_CALLEES = {
+    "if",
+    "for",
+    "while",
+    "with",
+    "except",
+    "print",
+    "len",
+    "str",
+    "int",
+    "float",
+    "list",
+    "dict",
+    "set",
+    "tuple",
+    "range",
+    "enumerate",
+    "zip",
+    "map",
+    "filter",
+    "sorted",
+    "reversed",
+    "isinstance",
+    "type",
+    "hasattr",
+    "getattr",
+    "setattr",
+}
+
+CALLEE_PATTERN = re.compile(r"\b([a-zA-Z_][a-zA-Z0-9_]*)\s*\(")
+IDENTIFIER_PATTERN = re.compile(r"[a-zA-Z_][a-zA-Z0-9_]*")
+
+# Tamanho máximo da lista de arquivos passada a cada execução do grep
+GREP_ARGS_BYTES = 64 * 1024
+# Tempo máximo (segundos) de uma busca, somando o grep e o scanner em processo
+GREP_TIMEOUT = 30
+
+# Formato da saída do grep -Hn: path/to/file.py:123:conteudo
+GREP_LINE_PATTERN = re.compile(r"^\.?/?(.+?):(\d+):(.+)$")
+
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class _Memo(Generic[K, V]):
+    """Memoiza uma consulta para toda a execução, compartilhada entre threads.
+
+    Chamadas simultâneas com a mesma chave esperam a primeira em vez de
+    repetir a consulta.
+    """
+
+    def __init__(self, func: Callable[[K], V]):
+        self._func = func
+        self._results: dict[K, Future[V]] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, key: K) -> V:
+        with self._lock:
+            future = self._results.get(key)
+            owner = future is None
+            if owner:
+                future = self._results[key] = Future()
+
+        if owner:
+            try:
+                future.set_result(self._func(key))
+            except BaseException as exc:
+                future.set_exception(exc)
+        return future.result()
 
 
-def _build_grep_exclude_args() -> list[str]:
-    """Constrói argumentos de exclusão para o grep."""
-    args = []
-    for dir_pattern in EXCLUDED_DIRS:
-        args.extend(["--exclude-dir", dir_pattern])
-    return args
+def _search_matches(
+    patterns: list[str],
+    files: list[str],
+    workdir: Optional[Path],
+    workers: int,
+) -> Generator[Match, None, bool]:
+    """Linhas que casam com os padrões, pelo grep ou pelo scanner em processo.
+
+    A busca inteira tem um prazo de GREP_TIMEOUT. Se o grep não estiver
+    instalado, ou parar no prazo, os arquivos que ele não varreu passam
+    pelo scanner (ver file_scanner) com o tempo que resta do prazo. O que
+    já foi encontrado é mantido: com o tempo esgotado o resultado fica
+    parcial, não vazio.
+
+    Returns:
+        Se todos os arquivos foram varridos (False: busca truncada pelo prazo)
+    """
+    deadline = time.time() + GREP_TIMEOUT
+    try:
+        unscanned = yield from _stream_grep(patterns, files, workdir, workers, deadline)
+    except FileNotFoundError:
+        unscanned = files
+    if not unscanned:
+        return True
+    return (
+        yield from scan_files(
+            patterns, unscanned, workdir, workers, timeout=max(0.0, deadline - time.time())
+        )
+    )
+
+
+class SymbolMatches(NamedTuple):
+    """Resultado de uma busca em lote por símbolos.
+
+    ``truncated`` traz os símbolos cuja busca parou no prazo antes de
+    terminar: suas referências podem estar incompletas.
+    """
+
+    callers: dict[str, list[FunctionRef]]
+    definitions: dict[str, FunctionRef]
+    truncated: frozenset[str] = frozenset()
+
+
+def _chunk_paths(paths: list[str], max_bytes: int) -> list[list[str]]:
+    """Divide a lista de arquivos em lotes que cabem na linha de comando."""
+    chunks: list[list[str]] = []
+    current: list[str] = []
+    size = 0
+    for path in paths:
+        if current and size + len(path) + 1 > max_bytes:
+            chunks.append(current)
+            current, size = [], 0
+        current.append(path)
+        size += len(path) + 1
+    if current:
+        chunks.append(current)
+    return chunks
 
 
 def _is_comment_line(line: str) -> bool:
@@ -53,206 +198,405 @@ def _is_comment_line(line: str) -> bool:
     )
 
 
-def find_callers(
-    function_name: str,
-    workdir: Optional[Path] = None,
-) -> list[FunctionRef]:
-    """Encontra chamadas a uma função no projeto via grep.
+class _SymbolsByLine(NamedTuple):
+    """Definições e chamadas de um arquivo agrupadas por linha."""
 
-    Args:
-        function_name: Nome da função a buscar
-        workdir: Diretório raiz do projeto
+    definitions: dict[int, set[str]]
+    calls: dict[int, set[str]]
 
-    Returns:
-        Lista de referências (FunctionRef) onde a função é chamada
-    """
-    if not function_name:
-        return []
 
-    # Busca por function_name( para pegar chamadas
-    pattern = f"{function_name}\\("
+def _group_by_line(symbols: FileSymbols) -> _SymbolsByLine:
+    by_line = _SymbolsByLine({}, {})
+    for symbol, line in symbols.definitions:
+        by_line.definitions.setdefault(line, set()).add(symbol)
+    for symbol, line in symbols.calls:
+        by_line.calls.setdefault(line, set()).add(symbol)
+    return by_line
 
-    cmd = [
-        "grep",
-        "-rn",
-        "-E",
-        pattern,
-        ".",
-    ] + _build_grep_exclude_args()
 
-    try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
+def _file_symbols_by_line(
+    file_path: str, workdir: Optional[Path], cache: Optional[FileCache]
+) -> Optional[_SymbolsByLine]:
+    """Extrai os símbolos de um arquivo com o extrator da linguagem; None se ilegível."""
+    content = read_file_content(file_path, workdir, cache)
+    if content is None:
+        return None
+    return _group_by_line(extract_file(file_path, content))
+
+
+def _stream_grep(
+    patterns: list[str],
+    files: list[str],
+    workdir: Optional[Path],
+    workers: int,
+    deadline: float,
+) -> Generator[Match, None, list[str]]:
+    """Executa o grep sobre os lotes de arquivos e entrega a saída linha a linha.
+
+    Até ``workers`` processos rodam adiantados, mas a saída é consumida na
+    ordem dos lotes (o resultado não depende da concorrência). Processos à
+    frente ficam bloqueados no pipe até serem lidos. Quando o consumidor
+    para de iterar, ou no ``deadline`` (instante de ``time.time()``), os
+    processos restantes são encerrados.
+
+    Yields:
+        Linhas encontradas como (arquivo, número da linha, conteúdo)
+
+    Returns:
+        Arquivos que o grep não terminou de varrer (vazio se não esgotou o tempo)
+
+    Raises:
+        FileNotFoundError: Se o grep não estiver instalado
+    """
+    chunks = _chunk_paths(files, GREP_ARGS_BYTES)
+    started = 0
+    done = 0
+    pattern_input = "\n".join(patterns) + "\n"
+    running: deque[subprocess.Popen[str]] = deque()
+    lock = threading.Lock()
+
+    def start_next() -> None:
+        nonlocal started
+        if started == len(chunks):
+            return
+        chunk = chunks[started]
+        started += 1
+        process = subprocess.Popen(
+            ["grep", "-HnI", "-E", "-f", "-", "--", *chunk],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
             text=True,
+            errors="replace",
             cwd=workdir,
-            timeout=30,
         )
-    except subprocess.TimeoutExpired:
-        return []
-    except FileNotFoundError:
+        with lock:
+            running.append(process)
+        # O grep lê todos os padrões antes de começar a busca
+        assert process.stdin is not None
+        process.stdin.write(pattern_input)
+        process.stdin.close()
+
+    def kill_all() -> None:
+        with lock:
+            for process in running:
+                process.kill()
+
+    timer = threading.Timer(max(0.0, deadline - time.time()), kill_all)
+    timer.daemon = True
+    timer.start()
+    try:
+        for _ in range(max(1, workers)):
+            start_next()
+
+        while running:
+            process = running[0]
+            assert process.stdout is not None
+            for line in process.stdout:
+                match = GREP_LINE_PATTERN.match(line.rstrip("\n"))
+                if match:
+                    yield match.group(1), int(match.group(2)), match.group(3)
+            process.wait()
+            with lock:
+                running.popleft()
+            if not timer.is_alive():
+                # Tempo esgotado: os processos foram encerrados no meio do lote
+                return [path for chunk in chunks[done:] for path in chunk]
+            done += 1
+            start_next()
         return []
+    finally:
+        timer.cancel()
+        kill_all()
+        for process in running:
+            process.wait()
+            if process.stdout is not None:
+                process.stdout.close()
 
-    refs: list[FunctionRef] = []
-    seen_locations: set[tuple[str, int]] = set()
 
-    for line in result.stdout.strip().split("\n"):
-        if not line:
-            continue
+def search_symbols(
+    caller_symbols: Iterable[str],
+    definition_symbols: Iterable[str],
+    workdir: Optional[Path] = None,
+    files: Optional[list[str]] = None,
+    workers: int = 1,
+    cache: Optional[FileCache] = None,
+    trigrams: Optional["TrigramIndex"] = None,
+) -> SymbolMatches:
+    """Busca chamadas e definições de vários símbolos em uma única varredura.
 
-        # Formato: ./path/to/file.py:123:conteudo
-        match = re.match(r"^\.?/?(.+?):(\d+):(.+)$", line)
-        if not match:
-            continue
+    Todos os símbolos viram uma alternação única passada ao grep (via
+    ``-f -``), e cada linha encontrada é atribuída aos símbolos
+    correspondentes em Python. O custo passa a ser uma varredura dos
+    arquivos, independente do número de símbolos.
 
-        file_path = match.group(1)
-        line_num = int(match.group(2))
-        content = match.group(3)
+    Os padrões de definição vêm dos extratores das linguagens presentes em
+    ``files``, e cada linha encontrada é confirmada pelo extrator do arquivo
+    (em Python, pela árvore sintática: strings e comentários não contam).
 
-        # Evita duplicatas
-        if (file_path, line_num) in seen_locations:
-            continue
+    Args:
+        caller_symbols: Funções cujas chamadas devem ser buscadas
+        definition_symbols: Símbolos cuja definição deve ser buscada
+        workdir: Diretório raiz do projeto
+        files: Arquivos pesquisáveis (ver list_source_files); calculados
+            se omitidos
+        workers: Execuções do grep em paralelo (uma por lote de arquivos)
+        cache: Cache de arquivos usado para confirmar as linhas encontradas
+        trigrams: Índice de trigramas que restringe os arquivos varridos aos
+            que podem conter os símbolos
+
+    Returns:
+        SymbolMatches com até MAX_REFS_PER_SYMBOL chamadas por símbolo, a
+        primeira definição encontrada de cada símbolo e os símbolos ainda
+        pendentes quando a busca parou no prazo
+    """
+    callers_wanted = {s for s in caller_symbols if IDENTIFIER_PATTERN.fullmatch(s)}
+    definitions_wanted = {s for s in definition_symbols if IDENTIFIER_PATTERN.fullmatch(s)}
+    matches = SymbolMatches({}, {})
+    if not callers_wanted and not definitions_wanted:
+        return matches
+
+    if files is None:
+        files = list_source_files(workdir)
+    if trigrams is not None:
+        files = trigrams.narrow(files, callers_wanted, definitions_wanted)
+        if not files:
+            return matches
+
+    patterns = []
+    if callers_wanted:
+        patterns.append(f"\\b({'|'.join(sorted(callers_wanted))})\\(")
+    if definitions_wanted:
+        for key in sorted({extractor_key(path) for path in files}):
+            patterns.extend(load_extractor(key).grep_patterns(definitions_wanted))
+
+    seen_locations: set[tuple[str, int]] = set()
+    file_symbols: dict[str, Optional[_SymbolsByLine]] = {}
+    pending_callers = set(callers_wanted)
+    pending_definitions = set(definitions_wanted)
+
+    def collect(file_path: str, line_num: int, content: str) -> None:
+        # Evita duplicatas e ignora comentários
+        if (file_path, line_num) in seen_locations or _is_comment_line(content):
+            return
         seen_locations.add((file_path, line_num))
 
-        # Ignora comentários
-        if _is_comment_line(content):
-            continue
+        # Filtro textual barato: só analisa o arquivo se a linha ainda pode
+        # contribuir com alguma chamada ou definição
+        words = set(IDENTIFIER_PATTERN.findall(content))
+        if not words & pending_callers and not words & pending_definitions:
+            return
 
-        # Ignora definições da própria função
-        if re.search(r"\bdef\s+" + function_name + r"\b", content):
-            continue
-        if re.search(r"\bfunction\s+" + function_name + r"\b", content):
-            continue
+        if file_path not in file_symbols:
+            file_symbols[file_path] = _file_symbols_by_line(file_path, workdir, cache)
+        by_line = file_symbols[file_path]
+        line_key = line_num
+        if by_line is None:
+            # Arquivo ilegível: analisa apenas a linha encontrada
+            by_line, line_key = _group_by_line(get_extractor(file_path).extract(content)), 1
 
-        refs.append(
-            FunctionRef(
+        defined = by_line.definitions.get(line_key, set())
+        called = by_line.calls.get(line_key, set())
+
+        for symbol in defined & pending_definitions:
+            matches.definitions[symbol] = FunctionRef(
                 file=file_path,
                 line=line_num,
                 snippet=content.strip(),
+                function_name=symbol,
             )
-        )
+            pending_definitions.discard(symbol)
 
-        # Limita quantidade de referências
-        if len(refs) >= MAX_REFS_PER_SYMBOL:
-            break
+        # A linha que define a função não é uma chamada a ela
+        for symbol in called & (pending_callers - defined):
+            refs = matches.callers.setdefault(symbol, [])
+            refs.append(FunctionRef(file=file_path, line=line_num, snippet=content.strip()))
+            if len(refs) >= MAX_REFS_PER_SYMBOL:
+                pending_callers.discard(symbol)
 
-    return refs
+    # A saída é consumida em streaming: com todos os símbolos completos, a
+    # busca é encerrada sem varrer o restante dos arquivos
+    found = _search_matches(patterns, files, workdir, workers)
+    with closing(found):
+        while pending_callers or pending_definitions:
+            try:
+                file_path, line_num, content = next(found)
+            except StopIteration as stop:
+                if not stop.value:
+                    return matches._replace(
+                        truncated=frozenset(pending_callers | pending_definitions)
+                    )
+                break
+            collect(file_path, line_num, content)
+
+    return matches
+
+
+def find_callers(
+    function_name: str,
+    workdir: Optional[Path] = None,
+    index: Optional["SymbolIndex"] = None,
+    trigrams: Optional["TrigramIndex"] = None,
+) -> list[FunctionRef]:
+    """Encontra chamadas a uma função no projeto.
+
+    Consulta o índice de símbolos quando disponível; sem índice, usa grep
+    (apenas nos arquivos candidatos do índice de trigramas, se houver).
+
+    Args:
+        function_name: Nome da função a buscar
+        workdir: Diretório raiz do projeto
+        index: Índice de símbolos do repositório
+        trigrams: Índice de trigramas usado para restringir o grep
+
+    Returns:
+        Lista de referências (FunctionRef) onde a função é chamada
+    """
+    if not function_name:
+        return []
+
+    if index is not None:
+        return index.find_callers(function_name, MAX_REFS_PER_SYMBOL)
+
+    matches = search_symbols([function_name], [], workdir, trigrams=trigrams)
+    return matches.callers.get(function_name, [])
+
+
+def extract_callee_symbols(added_lines: list[str]) -> list[str]:
+    """Extrai os nomes de funções chamadas nas linhas adicionadas.
+
+    Args:
+        added_lines: Linhas adicionadas no diff
+
+    Returns:
+        Símbolos na ordem da primeira ocorrência, sem palavras-chave e builtins
+    """
+    symbols: dict[str, None] = {}
+    for line in added_lines:
+        for match in CALLEE_PATTERN.findall(line):
+            if match not in IGNORED_CALLEES:
+                symbols[match] = None
+    return list(symbols)
 
 
 def find_callees(
     added_lines: list[str],
     workdir: Optional[Path] = None,
+    index: Optional["SymbolIndex"] = None,
+    trigrams: Optional["TrigramIndex"] = None,
 ) -> list[FunctionRef]:
     """Identifica novos símbolos usados nas linhas adicionadas e busca definições.
 
     Args:
         added_lines: Linhas adicionadas no diff
         workdir: Diretório raiz do projeto
+        index: Índice de símbolos do repositório (sem índice, usa grep)
+        trigrams: Índice de trigramas usado para restringir o grep
 
     Returns:
         Lista de referências às definições dos símbolos usados
     """
-    # Extrai possíveis chamadas de função das linhas adicionadas
-    symbol_pattern = re.compile(r"\b([a-zA-Z_][a-zA-Z0-9_]*)\s*\(")
-    symbols: set[str] = set()
+    symbols = extract_callee_symbols(added_lines)
 
-    for line in added_lines:
-        matches = symbol_pattern.findall(line)
-        for match in matches:
-            # Ignora palavras-chave e funções builtin comuns
-            if match not in {
-                "if",
-                "for",
-                "while",
-                "with",
-                "except",
-                "print",
-                "len",
-                "str",
-                "int",
-                "float",
-                "list",
-                "dict",
-                "set",
-                "tuple",
-                "range",
-                "enumerate",
-                "zip",
-                "map",
-                "filter",
-                "sorted",
-                "reversed",
-                "isinstance",
-                "type",
-                "hasattr",
-                "getattr",
-                "setattr",
-            }:
-                symbols.add(match)
+    if index is not None:
+        return _collect_callees(symbols, index.find_definition)
+
+    definitions = search_symbols([], symbols, workdir, trigrams=trigrams).definitions
+    return _collect_callees(symbols, definitions.get)
 
-    refs: list[FunctionRef] = []
 
+def _collect_callees(
+    symbols: list[str], lookup: Callable[[str], Optional[FunctionRef]]
+) -> list[FunctionRef]:
+    """Resolve as definições dos símbolos, na ordem, até MAX_REFS_PER_SYMBOL."""
+    refs: list[FunctionRef] = []
     for symbol in symbols:
-        # Busca definição: def symbol ou class symbol
-        pattern = f"(def|class|function|func)\\s+{symbol}\\b"
-
-        cmd = [
-            "grep",
-            "-rn",
-            "-E",
-            pattern,
-            ".",
-        ] + _build_grep_exclude_args()
-
-        try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                cwd=workdir,
-                timeout=30,
-            )
-        except (subprocess.TimeoutExpired, FileNotFoundError):
+        definition = lookup(symbol)
+        if definition is not None:
+            refs.append(definition)
+            if len(refs) >= MAX_REFS_PER_SYMBOL:
+                break
+    return refs
+
+
+def _hunk_changed_lines(hunk: DiffHunkLike) -> list[int]:
+    """Linhas do arquivo novo alteradas por um hunk.
+
+    Adições contam pela própria linha. Remoções substituídas por adições já
+    estão representadas por elas; remoções puras contam pela linha do
+    arquivo novo que as precede.
+    """
+    lines: list[int] = []
+    previous = hunk.start_line_new - 1
+    removed = False
+    for prefix, number, _ in hunk.iter_lines():
+        if prefix == "-":
+            removed = True
             continue
+        if prefix == "+":
+            lines.append(number)
+        elif removed:
+            lines.append(max(1, previous))
+        removed = False
+        previous = number
+    if removed:
+        lines.append(max(1, previous))
+    return lines
 
-        for line in result.stdout.strip().split("\n"):
-            if not line:
-                continue
 
-            match = re.match(r"^\.?/?(.+?):(\d+):(.+)$", line)
-            if not match:
-                continue
+def _definition_parents(ranges: list[Definition]) -> dict[Definition, Optional[Definition]]:
+    """Definição que contém cada uma (None no nível do módulo)."""
+    parents: dict[Definition, Optional[Definition]] = {}
+    stack: list[Definition] = []
+    for definition in ranges:
+        while stack and stack[-1].end < definition.end:
+            stack.pop()
+        parents[definition] = stack[-1] if stack else None
+        stack.append(definition)
+    return parents
 
-            file_path = match.group(1)
-            line_num = int(match.group(2))
-            content = match.group(3)
 
-            refs.append(
-                FunctionRef(
-                    file=file_path,
-                    line=line_num,
-                    snippet=content.strip(),
-                    function_name=symbol,
-                )
-            )
-            break  # Apenas primeira definição por símbolo
+def _hunk_callee_symbols(symbols: Optional[FileSymbols], hunk: DiffHunkLike) -> list[str]:
+    """Símbolos chamados nas linhas adicionadas de um hunk.
 
-        if len(refs) >= MAX_REFS_PER_SYMBOL:
-            break
+    Com o conteúdo do arquivo, as chamadas vêm do extrator da linguagem
+    (em Python, da árvore sintática: sem strings nem comentários, com
+    aliases de import resolvidos); sem ele, da extração textual das linhas.
+    """
+    if symbols is None:
+        return extract_callee_symbols([line.content for line in hunk.added_lines])
+    return _line_calls(symbols, {line.line_number for line in hunk.added_lines})
 
-    return refs
 
+def _line_calls(symbols: FileSymbols, lines: set[int]) -> list[str]:
+    """Símbolos chamados nas linhas dadas, sem palavras-chave e builtins."""
+    return list(
+        dict.fromkeys(
+            symbol
+            for symbol, line in symbols.calls
+            if line in lines and symbol not in IGNORED_CALLEES
+        )
+    )
 
-def read_file_content(file_path: str, workdir: Optional[Path] = None) -> Optional[str]:
+
+def read_file_content(
+    file_path: str,
+    workdir: Optional[Path] = None,
+    cache: Optional[FileCache] = None,
+) -> Optional[str]:
     """Lê o conteúdo completo de um arquivo.
 
     Args:
         file_path: Caminho relativo do arquivo
         workdir: Diretório raiz do projeto
+        cache: Cache de arquivos da execução (sem ele, lê do disco)
 
     Returns:
         Conteúdo do arquivo ou None se não existir
     """
+    if cache is not None:
+        return cache.read(file_path)
+
     full_path = Path(workdir or ".") / file_path
 
     try:
@@ -265,74 +609,702 @@ def get_context_around_line(
     file_path: str,
     line_number: int,
     workdir: Optional[Path] = None,
+    cache: Optional[FileCache] = None,
 ) -> str:
     """Obtém contexto ao redor de uma linha específica.
 
+    A janela é recortada pelo índice de linhas do cache, sem dividir o
+    arquivo inteiro em linhas.
+
     Args:
         file_path: Caminho do arquivo
         line_number: Número da linha central
         workdir: Diretório raiz
+        cache: Cache de arquivos da execução (reutiliza leituras anteriores)
 
     Returns:
         Snippet com linhas ao redor
     """
-    content = read_file_content(file_path, workdir)
-    if not content:
-        return ""
+    if cache is None:
+        cache = FileCache(workdir)
+
+    half = MAX_CONTEXT_LINES // 2
+    return cache.lines(file_path, line_number - half, line_number + half)
+
+
+class _FileAnalysis(NamedTuple):
+    """Arquivo com os símbolos e os intervalos das definições."""
+
+    cached: Optional[CachedFile]
+    symbols: Optional[FileSymbols]
+    ranges: list[Definition]
+    parents: dict[Definition, Optional[Definition]]
+    intervals: DefinitionIntervals
+
+
+class _ChangedFunction(NamedTuple):
+    """Função modificada e o trecho de código que a representa no prompt."""
+
+    path: str
+    name: str
+    callees: list[str]
+    excerpt: Optional[str]
+    excerpt_start: Optional[int]
+    excerpt_end: Optional[int]
+    sibling_signatures: list[str]
+    definition: Optional[Definition]
+
+
+def _analyze_file(file_path: str, cache: FileCache) -> _FileAnalysis:
+    """Lê um arquivo e extrai seus símbolos com o extrator da linguagem."""
+    cached = cache.get(file_path)
+    if cached is None:
+        return _FileAnalysis(None, None, [], {}, DefinitionIntervals([]))
+
+    # O extrator da linguagem só é carregado para arquivos efetivamente analisados
+    extractor = get_extractor(file_path)
+    ranges = extractor.definition_ranges(cached.text)
+    return _FileAnalysis(
+        cached,
+        extractor.extract(cached.text),
+        ranges,
+        _definition_parents(ranges),
+        DefinitionIntervals(ranges),
+    )
+
+
+def _definition_excerpt(
+    cached: CachedFile, definition: Definition, line: int
+) -> tuple[str, int, int]:
+    """Código de uma definição.
+
+    Definições maiores que MAX_EXCERPT_LINES são recortadas ao redor da
+    linha alterada, mantendo a linha da assinatura.
+    """
+    start, end = definition.start, definition.end
+    if end - start < MAX_EXCERPT_LINES:
+        return cached.lines(start, end), start, end
+
+    first = max(start + 1, line - MAX_EXCERPT_LINES // 2)
+    last = min(end, first + MAX_EXCERPT_LINES - 2)
+    parts = [cached.lines(start, start)]
+    if first > start + 1:
+        parts.append(f"... ({first - start - 1} linhas omitidas)")
+    parts.append(cached.lines(first, last))
+    if last < end:
+        parts.append(f"... ({end - last} linhas omitidas)")
+    return "\n".join(parts), start, end
+
+
+def _lines_excerpt(cached: CachedFile, lines: list[int]) -> tuple[str, int, int]:
+    """Linhas ao redor de alterações fora de qualquer definição."""
+    half = MAX_CONTEXT_LINES // 2
+    first = max(1, min(lines) - half)
+    last = min(cached.line_count, max(lines) + half, first + MAX_EXCERPT_LINES - 1)
+    return cached.lines(first, last), first, last
+
+
+def _sibling_signatures(
+    analysis: _FileAnalysis, definition: Optional[Definition]
+) -> list[str]:
+    """Primeira linha das outras definições do mesmo escopo da definição dada."""
+    assert analysis.cached is not None
+    parent = analysis.parents.get(definition) if definition is not None else None
+    signatures: list[str] = []
+    for other in analysis.ranges:
+        if other == definition or analysis.parents[other] != parent:
+            continue
+        signatures.append(analysis.cached.lines(other.start, other.start).strip())
+        if len(signatures) >= MAX_SIBLING_SIGNATURES:
+            break
+    return signatures
+
+
+def _changed_functions(
+    path: str, analysis: _FileAnalysis, hunk: DiffHunkLike
+) -> list[_ChangedFunction]:
+    """Funções modificadas por um hunk: uma por definição com linhas alteradas.
+
+    Cada linha alterada é atribuída à definição mais interna que a contém
+    (pelo índice de intervalos do arquivo novo). Linhas fora de qualquer
+    definição formam um nó MODULE_SCOPE, que não tem callers a buscar. O
+    nome do header do hunk só é usado quando o arquivo não pode ser lido.
+    """
+    if analysis.cached is None or analysis.symbols is None:
+        if not hunk.function_name:
+            return []
+        callees = _hunk_callee_symbols(None, hunk)
+        return [_ChangedFunction(path, hunk.function_name, callees, None, None, None, [], None)]
+
+    added = {line.line_number for line in hunk.added_lines}
+    functions: list[_ChangedFunction] = []
+    for definition, lines in analysis.intervals.group_lines(_hunk_changed_lines(hunk)).items():
+        callees = _line_calls(analysis.symbols, added.intersection(lines))
+        if definition is not None:
+            name = definition.name
+            excerpt, start, end = _definition_excerpt(analysis.cached, definition, lines[0])
+        else:
+            name = MODULE_SCOPE
+            excerpt, start, end = _lines_excerpt(analysis.cached, lines)
+        siblings = _sibling_signatures(analysis, definition)
+        functions.append(
+            _ChangedFunction(path, name, callees, excerpt, start, end, siblings, definition)
+        )
+    return functions
+
+
+# Direções da expansão: callers são seguidos para cima e callees para baixo
+_CALLERS = "callers"
+_CALLEES = "callees"
+
+# Consulta em lote: funções cujas chamadas buscar e símbolos cuja definição
+# buscar, cada um com os arquivos de onde partiu a busca
+_Lookup = Callable[[dict[str, set[str]], dict[str, set[str]]], SymbolMatches]
+
 
-    lines = content.split("\n")
-    start = max(0, line_number - MAX_CONTEXT_LINES // 2 - 1)
-    end = min(len(lines), line_number + MAX_CONTEXT_LINES // 2)
+class _Step(NamedTuple):
+    """Função alcançada pela expansão a partir da função modificada ``root``."""
 
-    return "\n".join(lines[start:end])
+    root: int
+    # None na própria função modificada, que é expandida nas duas direções
+    direction: Optional[str]
+    path: str
+    name: str
+    calls: list[str]
+
+
+class _Candidate(NamedTuple):
+    """Referência candidata ao prompt e sua relevância para a função modificada."""
+
+    root: int
+    direction: str
+    ref: FunctionRef
+    relevance: int
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimativa de tokens de um texto (CHARS_PER_TOKEN caracteres por token)."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _directory_package(path: str) -> str:
+    """Pacote de um arquivo fora de monorepos: o diretório que o contém."""
+    return str(PurePosixPath(path).parent)
+
+
+def _relevance(
+    ref_path: str,
+    lines: tuple[int, int],
+    depth: int,
+    changed_lines: dict[str, set[int]],
+    from_changed_lines: bool,
+    same_package: bool,
+) -> int:
+    """Pontua uma referência para uma função modificada.
+
+    Contam a favor: ser chamada nas linhas alteradas, estar em código tocado
+    pelo diff (ou ao menos em um arquivo do diff) e estar no mesmo pacote.
+    Cada nível de distância da função modificada reduz a pontuação.
+    """
+    score = 4 if from_changed_lines else 0
+    touched = changed_lines.get(ref_path)
+    if touched is not None:
+        first, last = lines
+        score += 3 if any(first <= line <= last for line in touched) else 1
+    if same_package:
+        score += 2
+    return score - 3 * (depth - 1)
+
+
+def _reference(
+    analysis: _FileAnalysis, ref: FunctionRef, direction: str, depth: int
+) -> tuple[FunctionRef, Optional[Definition]]:
+    """Completa uma referência com a definição que a contém e o código ao redor.
+
+    Callers levam as linhas ao redor da chamada; callees, o início da definição.
+    """
+    definition = analysis.intervals.enclosing(ref.line)
+    context = None
+    if analysis.cached is not None:
+        if direction == _CALLEES and definition is not None:
+            first = definition.start
+            last = min(definition.end, definition.start + MAX_CONTEXT_LINES)
+        else:
+            first = ref.line - MAX_CONTEXT_LINES // 2
+            last = ref.line + MAX_CONTEXT_LINES // 2
+        context = analysis.cached.lines(first, last)
+
+    update: dict[str, object] = {"depth": depth, "context": context}
+    if ref.function_name is None and definition is not None:
+        update["function_name"] = definition.name
+    return ref.model_copy(update=update), definition
+
+
+def _definition_calls(analysis: _FileAnalysis, definition: Definition) -> list[str]:
+    """Símbolos chamados no corpo de uma definição."""
+    if analysis.symbols is None:
+        return []
+    return list(
+        dict.fromkeys(
+            symbol
+            for symbol, line in analysis.symbols.calls
+            if definition.start <= line <= definition.end and symbol not in IGNORED_CALLEES
+        )
+    )
+
+
+def _index_lookup(index: "SymbolIndex", executor: ThreadPoolExecutor) -> _Lookup:
+    """Consultas ao índice de símbolos, memoizadas e executadas no pool."""
+    callers_of: Callable[[str], list[FunctionRef]] = _Memo(
+        lambda name: index.find_callers(name, MAX_REFS_PER_SYMBOL)
+    )
+    find_definition: Callable[[str], Optional[FunctionRef]] = _Memo(index.find_definition)
+
+    def lookup(
+        caller_origins: dict[str, set[str]], definition_origins: dict[str, set[str]]
+    ) -> SymbolMatches:
+        names, symbols = sorted(caller_origins), sorted(definition_origins)
+        callers = dict(zip(names, executor.map(callers_of, names)))
+        definitions = dict(zip(symbols, executor.map(find_definition, symbols)))
+        return SymbolMatches(
+            callers, {symbol: ref for symbol, ref in definitions.items() if ref is not None}
+        )
+
+    return lookup
+
+
+# Escopo de uma busca por grep: pacotes varridos (ver SearchScopes); fora de
+# monorepos, todas as buscas usam o repositório inteiro
+_Scope = frozenset[Optional[str]]
+_WHOLE_REPOSITORY: _Scope = frozenset({None})
+
+
+def _grep_lookup(
+    files: Callable[[], list[str]],
+    scopes: Callable[[], SearchScopes],
+    workdir: Optional[Path],
+    workers: int,
+    cache: FileCache,
+    trigrams: Optional["TrigramIndex"] = None,
+) -> _Lookup:
+    """Consultas por grep, só com símbolos ainda não buscados no mesmo escopo.
+
+    Em monorepos, cada símbolo é buscado primeiro no escopo do pacote de
+    onde partiu a busca (uma varredura por escopo distinto): callers no
+    pacote e nos seus dependentes, definições no pacote e nas suas
+    dependências. Os símbolos sem resultado no escopo são buscados juntos
+    em uma varredura do repositório inteiro. Os resultados são guardados
+    por (símbolo, escopo): o mesmo nome, visto a partir de outro pacote,
+    é buscado de novo.
+    """
+    callers: dict[tuple[str, _Scope], list[FunctionRef]] = {}
+    definitions: dict[tuple[str, _Scope], Optional[FunctionRef]] = {}
+    # Buscas que pararam no prazo
+    truncated: set[tuple[str, _Scope]] = set()
+
+    def search(
+        caller_keys: set[tuple[str, _Scope]],
+        definition_keys: set[tuple[str, _Scope]],
+        scope_files: list[str],
+    ) -> None:
+        matches = search_symbols(
+            {name for name, _ in caller_keys},
+            {symbol for symbol, _ in definition_keys},
+            workdir,
+            scope_files,
+            workers,
+            cache,
+            trigrams,
+        )
+        for key in caller_keys:
+            callers[key] = matches.callers.get(key[0], [])
+        for key in definition_keys:
+            definitions[key] = matches.definitions.get(key[0])
+        for key in caller_keys | definition_keys:
+            if key[0] in matches.truncated:
+                truncated.add(key)
+            else:
+                truncated.discard(key)
+
+    def scoped_search(
+        caller_keys: set[tuple[str, _Scope]], definition_keys: set[tuple[str, _Scope]]
+    ) -> None:
+        search_scopes = scopes()
+        if not search_scopes.is_monorepo:
+            search(caller_keys, definition_keys, files())
+            return
+
+        groups: dict[_Scope, tuple[set[tuple[str, _Scope]], set[tuple[str, _Scope]]]] = {}
+        for key in caller_keys:
+            groups.setdefault(key[1], (set(), set()))[0].add(key)
+        for key in definition_keys:
+            groups.setdefault(key[1], (set(), set()))[1].add(key)
+
+        complete: set[_Scope] = set()
+        for scope, (scope_callers, scope_definitions) in groups.items():
+            search(scope_callers, scope_definitions, search_scopes.files_in(scope))
+            if search_scopes.covers_all(scope):
+                complete.add(scope)
+
+        # Repositório inteiro apenas para o que o escopo não resolveu
+        pending_callers = {k for k in caller_keys if not callers[k] and k[1] not in complete}
+        pending_definitions = {
+            k for k in definition_keys if definitions[k] is None and k[1] not in complete
+        }
+        if pending_callers or pending_definitions:
+            search(pending_callers, pending_definitions, files())
+
+    def lookup(
+        caller_origins: dict[str, set[str]], definition_origins: dict[str, set[str]]
+    ) -> SymbolMatches:
+        search_scopes = scopes()
+
+        def scope_of(origins: set[str], scope: Callable[[str], _Scope]) -> _Scope:
+            if not search_scopes.is_monorepo:
+                return _WHOLE_REPOSITORY
+            return frozenset().union(*map(scope, origins))
+
+        caller_keys = {
+            name: (name, scope_of(origins, search_scopes.caller_scope))
+            for name, origins in caller_origins.items()
+        }
+        definition_keys = {
+            symbol: (symbol, scope_of(origins, search_scopes.definition_scope))
+            for symbol, origins in definition_origins.items()
+        }
+        new_callers = {key for key in caller_keys.values() if key not in callers}
+        new_definitions = {key for key in definition_keys.values() if key not in definitions}
+        if new_callers or new_definitions:
+            scoped_search(new_callers, new_definitions)
+
+        return SymbolMatches(
+            {name: callers[key] for name, key in caller_keys.items()},
+            {
+                symbol: ref
+                for symbol, key in definition_keys.items()
+                if (ref := definitions[key]) is not None
+            },
+            frozenset(
+                name
+                for name, key in (*caller_keys.items(), *definition_keys.items())
+                if key in truncated
+            ),
+        )
+
+    return lookup
+
+
+def _expand_references(
+    functions: list[_ChangedFunction],
+    lookup: _Lookup,
+    analyze: Callable[[str], _FileAnalysis],
+    executor: ThreadPoolExecutor,
+    changed_lines: dict[str, set[int]],
+    max_depth: int,
+    budget: Optional[int],
+    package_of: Callable[[str], Optional[str]] = _directory_package,
+) -> tuple[list[_Candidate], set[int]]:
+    """Busca em largura por callers e callees das funções modificadas.
+
+    Cada nível faz uma única consulta com todos os símbolos da fronteira.
+    Callers são seguidos para cima (callers dos callers) e callees para
+    baixo (definições chamadas pelos callees). A expansão para na
+    profundidade máxima ou quando as candidatas já esgotam o orçamento.
+    ``package_of`` define o pacote de um arquivo para a relevância.
+
+    Returns:
+        Candidatas na ordem em que foram encontradas (nível a nível) e as
+        funções modificadas (índices) com alguma busca truncada pelo prazo
+    """
+    candidates: list[_Candidate] = []
+    truncated_roots: set[int] = set()
+    seen_refs: set[tuple[int, str, str, int]] = set()
+    # Definições modificadas não são expandidas a partir de nenhuma raiz
+    changed = {
+        (function.path, function.definition.start)
+        for function in functions
+        if function.definition is not None
+    }
+    visited: set[tuple[int, str, int]] = set()
+    frontier = [
+        _Step(root, None, function.path, function.name, function.callees)
+        for root, function in enumerate(functions)
+    ]
+    spent = 0
+
+    for depth in range(1, max_depth + 1):
+        if not frontier:
+            break
+
+        caller_origins: dict[str, set[str]] = {}
+        definition_origins: dict[str, set[str]] = {}
+        for step in frontier:
+            if step.direction != _CALLEES and step.name != MODULE_SCOPE:
+                caller_origins.setdefault(step.name, set()).add(step.path)
+            if step.direction != _CALLERS:
+                for symbol in step.calls:
+                    definition_origins.setdefault(symbol, set()).add(step.path)
+        matches = lookup(caller_origins, definition_origins)
+        found: list[tuple[_Step, str, FunctionRef]] = []
+        for step in frontier:
+            if matches.truncated and (
+                (step.direction != _CALLEES and step.name in matches.truncated)
+                or (step.direction != _CALLERS and not matches.truncated.isdisjoint(step.calls))
+            ):
+                truncated_roots.add(step.root)
+            if step.direction != _CALLEES:
+                found.extend((step, _CALLERS, ref) for ref in matches.callers.get(step.name, []))
+            if step.direction != _CALLERS:
+                found.extend(
+                    (step, _CALLEES, matches.definitions[symbol])
+                    for symbol in step.calls
+                    if symbol in matches.definitions
+                )
+
+        # Arquivos das referências encontradas são lidos e analisados em paralelo
+        list(executor.map(analyze, dict.fromkeys(ref.file for _, _, ref in found)))
+
+        next_frontier: list[_Step] = []
+        for step, direction, found_ref in found:
+            key = (step.root, direction, found_ref.file, found_ref.line)
+            if key in seen_refs:
+                continue
+            seen_refs.add(key)
+
+            analysis = analyze(found_ref.file)
+            ref, definition = _reference(analysis, found_ref, direction, depth)
+            lines = (definition.start, definition.end) if definition else (ref.line, ref.line)
+            relevance = _relevance(
+                ref.file,
+                lines,
+                depth,
+                changed_lines,
+                from_changed_lines=direction == _CALLEES and step.direction is None,
+                same_package=package_of(functions[step.root].path) == package_of(ref.file),
+            )
+            candidates.append(_Candidate(step.root, direction, ref, relevance))
+            spent += estimate_tokens(ref.context or ref.snippet)
+
+            if (
+                definition is None
+                or (ref.file, definition.start) in changed
+                or (step.root, ref.file, definition.start) in visited
+            ):
+                continue
+            visited.add((step.root, ref.file, definition.start))
+            calls = _definition_calls(analysis, definition) if direction == _CALLEES else []
+            next_frontier.append(_Step(step.root, direction, ref.file, definition.name, calls))
+
+        if budget is not None and spent >= budget:
+            break
+        frontier = next_frontier
+
+    return candidates, truncated_roots
+
+
+def _fit_excerpts(
+    functions: list[_ChangedFunction], budget: Optional[int]
+) -> tuple[list[_ChangedFunction], Optional[int]]:
+    """Reserva o orçamento para os trechos das funções modificadas, na ordem do diff.
+
+    Sem espaço, a função perde primeiro as assinaturas vizinhas e depois o
+    trecho (o diff continua no prompt).
+
+    Returns:
+        Funções ajustadas e o orçamento restante (None: sem limite)
+    """
+    if budget is None:
+        return functions, None
+
+    fitted: list[_ChangedFunction] = []
+    for function in functions:
+        if function.excerpt is not None:
+            excerpt_cost = estimate_tokens(function.excerpt)
+            siblings_cost = (
+                estimate_tokens("\n".join(function.sibling_signatures))
+                if function.sibling_signatures
+                else 0
+            )
+            if excerpt_cost + siblings_cost <= budget:
+                budget -= excerpt_cost + siblings_cost
+            elif excerpt_cost <= budget:
+                function = function._replace(sibling_signatures=[])
+                budget -= excerpt_cost
+            else:
+                function = function._replace(
+                    excerpt=None, excerpt_start=None, excerpt_end=None, sibling_signatures=[]
+                )
+        fitted.append(function)
+    return fitted, budget
+
+
+def _select_references(
+    candidates: list[_Candidate], budget: Optional[int]
+) -> list[_Candidate]:
+    """Seleciona as referências mais relevantes que cabem no orçamento.
+
+    Referências cujo código não cabe entram apenas com a linha encontrada.
+
+    Returns:
+        Candidatas selecionadas, na ordem em que foram encontradas
+    """
+    if budget is None:
+        return candidates
+
+    ranked = sorted(
+        range(len(candidates)),
+        key=lambda i: (-candidates[i].relevance, candidates[i].ref.depth, i),
+    )
+    selected: dict[int, _Candidate] = {}
+    for i in ranked:
+        candidate = candidates[i]
+        ref = candidate.ref
+        cost = estimate_tokens(ref.snippet)
+        if ref.context is not None:
+            if cost + estimate_tokens(ref.context) <= budget:
+                selected[i] = candidate
+                budget -= cost + estimate_tokens(ref.context)
+                continue
+            ref = ref.model_copy(update={"context": None})
+        if cost <= budget:
+            selected[i] = candidate._replace(ref=ref)
+            budget -= cost
+    return [selected[i] for i in sorted(selected)]
 
 
 def build_context_graph(
-    diff_files: list[DiffFile],
+    diff_files: list[DiffFileLike],
     workdir: Optional[Path] = None,
+    index: Optional["SymbolIndex"] = None,
+    workers: int = CONTEXT_WORKERS,
+    cache: Optional[FileCache] = None,
+    token_budget: int = DEFAULT_CONTEXT_TOKENS,
+    max_depth: int = DEFAULT_CONTEXT_DEPTH,
+    search_roots: Iterable[str] = (),
+    trigrams: Optional["TrigramIndex"] = None,
 ) -> list[ContextGraph]:
     """Constrói o grafo de contexto para todas as funções modificadas.
 
+    Cada função modificada leva apenas o código da definição que contém a
+    alteração e as assinaturas das definições vizinhas, em vez do arquivo
+    inteiro.
+
+    Callers e callees são buscados em largura até ``max_depth`` níveis
+    (callers dos callers, definições chamadas pelos callees). As referências
+    encontradas são ordenadas por relevância (chamadas nas linhas alteradas,
+    tocadas pelo diff, no mesmo pacote, mais próximas) e entram no contexto
+    até esgotar ``token_budget``; os trechos das funções modificadas têm
+    prioridade. Em diffs grandes o contexto encolhe em vez de estourar o
+    prompt.
+
+    Em monorepos (vários pacotes detectados pelos manifestos ou por
+    ``search_roots``), as buscas por grep ficam restritas ao pacote da
+    função e aos pacotes relacionados, e "mesmo pacote" na relevância
+    passa a ser o pacote do manifesto (ver search_scope).
+
+    Leituras de arquivos e consultas de símbolos rodam em um pool limitado
+    de threads; cada símbolo é consultado uma única vez na execução, mesmo
+    que apareça em vários hunks. A ordem do resultado segue a do diff,
+    independente da ordem em que as consultas terminam.
+
     Args:
         diff_files: Arquivos parseados do diff
         workdir: Diretório raiz do projeto
+        index: Índice de símbolos do repositório (sem índice, usa grep)
+        workers: Número máximo de threads
+        cache: Cache de arquivos (padrão: um cache novo para esta execução)
+        token_budget: Tokens estimados para trechos e referências (0: sem limite)
+        max_depth: Níveis de callers/callees a partir das funções modificadas
+        search_roots: Diretórios tratados como limites de pacote, além dos manifestos
+        trigrams: Índice de trigramas que restringe o grep (usado sem ``index``)
 
     Returns:
         Lista de ContextGraph para cada função modificada
     """
-    graphs: list[ContextGraph] = []
-    seen_functions: set[tuple[str, str]] = set()
+    if cache is None:
+        cache = FileCache(workdir)
+    changed_files = [diff_file for diff_file in diff_files if diff_file.hunks]
+    budget: Optional[int] = token_budget or None
 
-    for diff_file in diff_files:
-        # Lê conteúdo completo do arquivo
-        file_content = read_file_content(diff_file.path, workdir)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        analyze: Callable[[str], _FileAnalysis] = _Memo(lambda path: _analyze_file(path, cache))
+        analyzed = list(executor.map(analyze, [diff_file.path for diff_file in changed_files]))
 
-        for hunk in diff_file.hunks:
-            function_name = hunk.function_name
-            if not function_name:
-                continue
+        # Funções modificadas: uma por definição, mesmo alterada em vários hunks
+        functions: list[_ChangedFunction] = []
+        positions: dict[tuple[str, object], int] = {}
+        changed_lines: dict[str, set[int]] = {}
 
-            # Evita duplicatas
-            key = (diff_file.path, function_name)
-            if key in seen_functions:
-                continue
-            seen_functions.add(key)
-
-            # Encontra callers
-            callers = find_callers(function_name, workdir)
-
-            # Extrai linhas adicionadas para buscar callees
-            added_content = [line.content for line in hunk.added_lines]
-            callees = find_callees(added_content, workdir)
-
-            graphs.append(
-                ContextGraph(
-                    function_name=function_name,
-                    file=diff_file.path,
-                    callers=callers,
-                    callees=callees,
-                    file_content=file_content,
-                )
-            )
+        for diff_file, analysis in zip(changed_files, analyzed):
+            changed_lines[diff_file.path] = {
+                line.line_number for hunk in diff_file.hunks for line in hunk.added_lines
+            }
+            for hunk in diff_file.hunks:
+                for function in _changed_functions(diff_file.path, analysis, hunk):
+                    definition = function.definition
+                    key = (function.path, definition.start if definition else function.name)
+                    if key not in positions:
+                        positions[key] = len(functions)
+                        functions.append(function)
+                        continue
+
+                    # Mesma função em outro hunk: acumula os símbolos chamados
+                    position = positions[key]
+                    callees = list(dict.fromkeys(functions[position].callees + function.callees))
+                    functions[position] = functions[position]._replace(callees=callees)
+
+        functions, budget = _fit_excerpts(functions, budget)
+
+        languages = {extractor_key(function.path) for function in functions}
 
+        @functools.cache
+        def repository_files() -> list[str]:
+            return list_source_files(workdir)
+
+        @functools.cache
+        def files() -> list[str]:
+            return [p for p in repository_files() if extractor_key(p) in languages]
+
+        @functools.cache
+        def scopes() -> SearchScopes:
+            return load_search_scopes(files(), workdir, search_roots, repository_files())
+
+        def package_of(path: str) -> Optional[str]:
+            search_scopes = scopes()
+            if search_scopes.is_monorepo:
+                return search_scopes.package_of(path)
+            return _directory_package(path)
+
+        if index is not None:
+            lookup = _index_lookup(index, executor)
+        else:
+            # Sem índice, cada nível é uma varredura com todos os símbolos (uma
+            # por escopo em monorepos), só nas linguagens presentes no diff
+            lookup = _grep_lookup(files, scopes, workdir, workers, cache, trigrams)
+
+        candidates, truncated_roots = _expand_references(
+            functions,
+            lookup,
+            analyze,
+            executor,
+            changed_lines,
+            max_depth,
+            budget,
+            package_of if index is None else _directory_package,
+        )
+
+    graphs = [
+        ContextGraph(
+            function_name=function.name,
+            file=function.path,
+            excerpt=function.excerpt,
+            excerpt_start=function.excerpt_start,
+            excerpt_end=function.excerpt_end,
+            sibling_signatures=function.sibling_signatures,
+            references_truncated=root in truncated_roots,
+        )
+        for root, function in enumerate(functions)
+    ]
+    for candidate in _select_references(candidates, budget):
+        getattr(graphs[candidate.root], candidate.direction).append(candidate.ref)
     return graphs
@@ -0,0 +1,73 @@
+"""Índice de intervalos das definições de um arquivo.
+
+Mapeia cada linha para a definição mais interna que a contém. As
+definições (aninhadas) são achatadas uma vez em segmentos disjuntos de
+linhas, cada um com sua definição dona; uma consulta é uma busca binária
+nos inícios dos segmentos.
+"""
+
+from bisect import bisect_right
+from collections.abc import Iterable
+from typing import Optional
+
+from .extractors import Definition
+
+
+class DefinitionIntervals:
+    """Segmentos de linhas de um arquivo com a definição mais interna de cada um."""
+
+    __slots__ = ("_starts", "_owners")
+
+    def __init__(self, definitions: Iterable[Definition]):
+        """Constrói os segmentos a partir dos intervalos das definições.
+
+        Intervalos que ultrapassam o fim da definição que os contém (comum
+        na localização textual) são limitados ao fim dela.
+
+        Args:
+            definitions: Definições com linha inicial e final (1-based)
+        """
+        self._starts: list[int] = [1]
+        self._owners: list[Optional[Definition]] = [None]
+        # Pilha de (fim efetivo, definição) das definições abertas
+        stack: list[tuple[int, Definition]] = []
+
+        for definition in sorted(definitions, key=lambda d: (d.start, -d.end)):
+            while stack and stack[-1][0] < definition.start:
+                end, _ = stack.pop()
+                self._open(end + 1, stack[-1][1] if stack else None)
+            end = min(definition.end, stack[-1][0]) if stack else definition.end
+            stack.append((end, definition))
+            self._open(definition.start, definition)
+
+        while stack:
+            end, _ = stack.pop()
+            self._open(end + 1, stack[-1][1] if stack else None)
+
+    def _open(self, line: int, owner: Optional[Definition]) -> None:
+        """Inicia um segmento na linha dada (substitui um segmento vazio)."""
+        if self._starts[-1] == line:
+            self._owners[-1] = owner
+        else:
+            self._starts.append(line)
+            self._owners.append(owner)
+
+    def enclosing(self, line: int) -> Optional[Definition]:
+        """Definição mais interna que contém a linha (None no nível do módulo)."""
+        if line < 1:
+            return None
+        return self._owners[bisect_right(self._starts, line) - 1]
+
+    def group_lines(self, lines: Iterable[int]) -> dict[Optional[Definition], list[int]]:
+        """Agrupa linhas pela definição mais interna que as contém.
+
+        Args:
+            lines: Números de linha
+
+        Returns:
+            Definição -> linhas, na ordem da primeira linha de cada grupo
+        """
+        groups: dict[Optional[Definition], list[int]] = {}
+        for line in sorted(set(lines)):
+            groups.setdefault(self.enclosing(line), []).append(line)
+        return groups
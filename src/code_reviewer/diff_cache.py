@@ -0,0 +1,183 @@
+"""Cache em disco de diffs parseados.
+
+Execuções repetidas sobre o mesmo commit (retries e matrizes de CI) reutilizam
+o diff já parseado. A chave é derivada dos SHAs do merge-base e de HEAD, do
+número de linhas de contexto e das regras de arquivos ignorados, então uma
+entrada nunca fica desatualizada: commits novos geram chaves novas.
+
+As entradas são gravadas em formato binário compacto (marshal + zlib sobre o
+estado primitivo de CompactDiffFile) e o diretório é limitado por tamanho,
+removendo as entradas usadas há mais tempo (LRU pelo mtime).
+"""
+
+import hashlib
+import marshal
+import os
+import sys
+import tempfile
+import zlib
+from array import array
+from pathlib import Path
+from typing import Optional
+
+from .compact_diff import CompactDiffFile
+from .diff_parser import DEFAULT_RENAME_THRESHOLD
+from .ignore_rules import IgnoreRules
+
+# Configurações
+CACHE_DIR = Path.home() / ".cache" / "airev" / "diffs"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+CACHE_SUFFIX = ".diff.bin"
+
+# Versão do formato: incrementar ao mudar CompactDiffFile.to_state()
+FORMAT_VERSION = 3
+
+
+def cache_key(
+    merge_base: str,
+    head: str,
+    context_lines: int,
+    ignore_rules: IgnoreRules,
+    rename_threshold: int = DEFAULT_RENAME_THRESHOLD,
+) -> str:
+    """Calcula a chave de cache de um diff.
+
+    Inclui a versão do Python e o tamanho dos inteiros dos arrays, pois o
+    formato marshal e os bytes dos arrays dependem deles.
+
+    Args:
+        merge_base: SHA do merge-base entre a base e HEAD
+        head: SHA de HEAD
+        context_lines: Linhas de contexto usadas no diff
+        ignore_rules: Regras de arquivos ignorados
+        rename_threshold: Similaridade mínima usada na detecção de renomeações
+
+    Returns:
+        Chave hexadecimal (sha256)
+    """
+    parts = [
+        f"v{FORMAT_VERSION}",
+        f"py{sys.version_info[0]}.{sys.version_info[1]}",
+        f"l{array('l').itemsize}",
+        merge_base,
+        head,
+        str(context_lines),
+        f"M{rename_threshold}",
+        ignore_rules.fingerprint(),
+    ]
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+def encode_diff(diff_files: list[CompactDiffFile]) -> bytes:
+    """Serializa arquivos do diff no formato binário do cache."""
+    state = [diff_file.to_state() for diff_file in diff_files]
+    return zlib.compress(marshal.dumps(state), 1)
+
+
+def decode_diff(data: bytes) -> list[CompactDiffFile]:
+    """Desserializa o formato binário do cache."""
+    state = marshal.loads(zlib.decompress(data))
+    return [CompactDiffFile.from_state(item) for item in state]
+
+
+class DiffCache:
+    """Cache de diffs parseados em disco com limite de tamanho (LRU)."""
+
+    def __init__(
+        self,
+        cache_dir: Path = CACHE_DIR,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        """Inicializa o cache.
+
+        Args:
+            cache_dir: Diretório das entradas
+            max_bytes: Tamanho máximo total do diretório
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}{CACHE_SUFFIX}"
+
+    def get(self, key: str) -> Optional[list[CompactDiffFile]]:
+        """Lê uma entrada do cache.
+
+        Args:
+            key: Chave calculada por cache_key
+
+        Returns:
+            Lista de arquivos ou None se ausente/corrompida
+        """
+        path = self._entry_path(key)
+
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return None
+
+        try:
+            diff_files = decode_diff(data)
+        except (zlib.error, ValueError, EOFError, TypeError):
+            # Entrada corrompida: remove para não tentar de novo
+            path.unlink(missing_ok=True)
+            return None
+
+        # Marca como usada recentemente (LRU pelo mtime)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        return diff_files
+
+    def put(self, key: str, diff_files: list[CompactDiffFile]) -> None:
+        """Grava uma entrada no cache e aplica o limite de tamanho.
+
+        Falhas de escrita são ignoradas silenciosamente.
+
+        Args:
+            key: Chave calculada por cache_key
+            diff_files: Arquivos parseados
+        """
+        data = encode_diff(diff_files)
+        if len(data) > self.max_bytes:
+            return
+
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # Escrita atômica: execuções concorrentes nunca leem arquivo parcial
+            fd, tmp_name = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        except OSError:
+            return
+
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                tmp_file.write(data)
+            os.replace(tmp_name, self._entry_path(key))
+        except OSError:
+            # Falha ao escrever cache - ignora silenciosamente
+            Path(tmp_name).unlink(missing_ok=True)
+            return
+
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove as entradas menos recentes até caber em max_bytes."""
+        entries = []
+        try:
+            for path in self.cache_dir.glob(f"*{CACHE_SUFFIX}"):
+                stat = path.stat()
+                entries.append((stat.st_mtime, stat.st_size, path))
+        except OSError:
+            return
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+                total -= size
+            except OSError:
+                continue
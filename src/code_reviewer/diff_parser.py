@@ -2,44 +2,120 @@
 
 import re
 import subprocess
+import tempfile
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Optional
-
-from .models import DiffFile, DiffHunk, DiffLine
-
-# Padrões regex para parsing do diff
-FILE_HEADER_PATTERN = re.compile(r"^diff --git a/(.+) b/(.+)$")
+from typing import NamedTuple, Optional, Union
+
+from .compact_diff import (
+    ADDED,
+    CONTEXT,
+    REMOVED,
+    CompactDiffFile,
+    CompactHunk,
+    DiffFileLike,
+)
+from .ignore_rules import DEFAULT_RULES, IgnoreRules
+
+# Padrões regex para parsing do diff (o parser trabalha sobre bytes)
+FILE_HEADER_PREFIX = b"diff --git "
+# Caminhos com aspas, barra invertida ou caracteres de controle (e não ASCII,
+# com core.quotePath) vêm entre aspas e com escapes no estilo C
+FILE_HEADER_PATTERN = re.compile(
+    rb'^diff --git (?:a/.+|"a/(?:[^"\\]|\\.)+") (?:b/(.+)|"b/((?:[^"\\]|\\.)+)")$'
+)
+QUOTED_ESCAPE_PATTERN = re.compile(rb"\\([0-7]{1,3}|.)")
+QUOTED_ESCAPES = {
+    b"a": b"\a",
+    b"b": b"\b",
+    b"f": b"\f",
+    b"n": b"\n",
+    b"r": b"\r",
+    b"t": b"\t",
+    b"v": b"\v",
+}
 HUNK_HEADER_PATTERN = re.compile(
-    r"^@@ -(\d+)(?:,\d+)? \+(\d+)(?:,\d+)? @@(?: (.+))?$"
+    rb"^@@ -(\d+)(?:,\d+)? \+(\d+)(?:,\d+)? @@(?: (.+))?$"
 )
-NEW_FILE_PATTERN = re.compile(r"^new file mode")
-DELETED_FILE_PATTERN = re.compile(r"^deleted file mode")
-
-# Arquivos a serem ignorados na análise
-IGNORED_PATTERNS = [
-    r".*\.lock$",
-    r".*-lock\.json$",
-    r".*-lock\.yaml$",
-    r"package-lock\.json$",
-    r"poetry\.lock$",
-    r"Pipfile\.lock$",
-    r"yarn\.lock$",
-    r"pnpm-lock\.yaml$",
-    r".*\.min\.js$",
-    r".*\.min\.css$",
-    r".*\.map$",
-    r".*/migrations/.*",
-    r".*/node_modules/.*",
-    r".*/__pycache__/.*",
-    r".*\.pyc$",
-    r".*/dist/.*",
-    r".*/build/.*",
-    r".*/\.git/.*",
-]
+NEW_FILE_PATTERN = re.compile(rb"^new file mode")
+DELETED_FILE_PATTERN = re.compile(rb"^deleted file mode")
+RENAME_FROM_PATTERN = re.compile(rb"^rename from (.+)$")
+RENAME_TO_PATTERN = re.compile(rb"^rename to (.+)$")
+COPY_FROM_PATTERN = re.compile(rb"^copy from (.+)$")
+COPY_TO_PATTERN = re.compile(rb"^copy to (.+)$")
+SIMILARITY_PATTERN = re.compile(rb"^similarity index (\d+)%$")
+
+# Similaridade mínima (%) para o git tratar um par remoção+criação como
+# renomeação ou cópia; 0 desativa a detecção
+DEFAULT_RENAME_THRESHOLD = 50
+
+
+class FileStat(NamedTuple):
+    """Contagem de linhas de um arquivo obtida pelo prepass --numstat."""
+
+    path: str
+    added: int
+    removed: int
+    is_binary: bool = False
+    old_path: Optional[str] = None
+
+    @property
+    def changed(self) -> int:
+        """Total de linhas alteradas (adicionadas + removidas)."""
+        return self.added + self.removed
+
+
+# Extração paralela: abaixo deste número de arquivos o diff roda em um único processo
+PARALLEL_MIN_FILES = 50
+# Máximo de arquivos por invocação do git no modo paralelo
+MAX_FILES_PER_BATCH = 200
+
+
+def _rename_args(rename_threshold: int) -> list[str]:
+    """Flags de detecção de renomeações e cópias para o git diff.
+
+    Passadas explicitamente para não depender de diff.renames do usuário.
+    """
+    if rename_threshold <= 0:
+        return ["--no-renames"]
+    return [f"-M{rename_threshold}%", f"-C{rename_threshold}%"]
+
+
+def _build_diff_command(
+    base_branch: str,
+    context_lines: int,
+    pathspecs: list[str],
+    rename_threshold: int = DEFAULT_RENAME_THRESHOLD,
+) -> list[str]:
+    """Monta o comando git diff usado tanto no modo bufferizado quanto no streaming."""
+    return [
+        "git",
+        "diff",
+        f"-U{context_lines}",
+        *_rename_args(rename_threshold),
+        f"{base_branch}...HEAD",
+        "--",
+        *pathspecs,
+    ]
+
+
+def _exclude_pathspecs(ignore_rules: Optional[IgnoreRules]) -> list[str]:
+    """Pathspecs de exclusão: o git não emite os arquivos ignorados."""
+    return (ignore_rules or DEFAULT_RULES).pathspecs()
+
+
+def _literal_pathspecs(paths: Iterable[str]) -> list[str]:
+    """Pathspecs que casam exatamente os caminhos dados (relativos à raiz)."""
+    return [f":(top,literal){path}" for path in paths]
 
 
 def get_git_diff(
-    base_branch: str, workdir: Optional[Path] = None, context_lines: int = 3
+    base_branch: str,
+    workdir: Optional[Path] = None,
+    context_lines: int = 3,
+    ignore_rules: Optional[IgnoreRules] = None,
+    rename_threshold: int = DEFAULT_RENAME_THRESHOLD,
 ) -> str:
     """Executa git diff e retorna o output.
 
@@ -47,20 +123,26 @@ def get_git_diff(
         base_branch: Branch base para comparação (ex: main, develop)
         workdir: Diretório de trabalho (default: diretório atual)
         context_lines: Número de linhas de contexto antes/depois de cada hunk (default: 3)
+        ignore_rules: Regras de arquivos ignorados (default: regras padrão)
+        rename_threshold: Similaridade mínima (%) para detectar renomeações e
+            cópias (0 desativa)
 
     Returns:
-        Output do git diff como string
+        Output do git diff como string (bytes inválidos em UTF-8 são substituídos)
 
     Raises:
         subprocess.CalledProcessError: Se o comando git falhar
         FileNotFoundError: Se git não estiver instalado
     """
-    cmd = ["git", "diff", f"-U{context_lines}", f"{base_branch}...HEAD"]
+    cmd = _build_diff_command(
+        base_branch, context_lines, _exclude_pathspecs(ignore_rules), rename_threshold
+    )
 
     result = subprocess.run(
         cmd,
         capture_output=True,
         text=True,
+        errors="replace",
         cwd=workdir,
         check=True,
     )
@@ -68,6 +150,300 @@ def get_git_diff(
     return result.stdout
 
 
+def stream_git_diff(
+    base_branch: str,
+    workdir: Optional[Path] = None,
+    context_lines: int = 3,
+    ignore_rules: Optional[IgnoreRules] = None,
+    rename_threshold: int = DEFAULT_RENAME_THRESHOLD,
+) -> Iterator[bytes]:
+    """Executa git diff via Popen e produz o output linha a linha.
+
+    Evita manter o diff inteiro em memória: cada linha é entregue assim que
+    o git a escreve, permitindo que o parser trabalhe enquanto o git ainda
+    está rodando. As linhas saem em bytes, sem decodificação: o parser só
+    decodifica o que de fato for lido.
+
+    Args:
+        base_branch: Branch base para comparação (ex: main, develop)
+        workdir: Diretório de trabalho (default: diretório atual)
+        context_lines: Número de linhas de contexto antes/depois de cada hunk (default: 3)
+        ignore_rules: Regras de arquivos ignorados (default: regras padrão)
+        rename_threshold: Similaridade mínima (%) para detectar renomeações e
+            cópias (0 desativa)
+
+    Returns:
+        Iterador sobre as linhas do diff em bytes, sem o terminador de linha
+
+    Raises:
+        subprocess.CalledProcessError: Se o comando git falhar (ao fim da leitura)
+        FileNotFoundError: Se git não estiver instalado (na primeira leitura)
+    """
+    cmd = _build_diff_command(
+        base_branch, context_lines, _exclude_pathspecs(ignore_rules), rename_threshold
+    )
+    return _stream_command(cmd, workdir)
+
+
+def _stream_command(cmd: list[str], workdir: Optional[Path]) -> Iterator[bytes]:
+    """Executa um comando git e produz o stdout linha a linha, em bytes.
+
+    O stderr vai para um arquivo temporário: um pipe lido só ao fim bloquearia
+    o git quando os avisos enchessem o buffer.
+
+    Raises:
+        subprocess.CalledProcessError: Se o comando falhar (ao fim da leitura)
+    """
+    with tempfile.TemporaryFile() as stderr_file:
+        process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=stderr_file,
+            cwd=workdir,
+        )
+
+        try:
+            assert process.stdout is not None
+            for line in process.stdout:
+                yield line[:-1] if line.endswith(b"\n") else line
+            returncode = process.wait()
+        finally:
+            # Consumidor interrompeu a iteração: encerra o git sem esperar o fim
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            if process.stdout:
+                process.stdout.close()
+
+        stderr_file.seek(0)
+        stderr = stderr_file.read().decode("utf-8", "replace")
+
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, cmd, stderr=stderr)
+
+
+def list_changed_files(
+    base_branch: str,
+    workdir: Optional[Path] = None,
+    ignore_rules: Optional[IgnoreRules] = None,
+    rename_threshold: int = DEFAULT_RENAME_THRESHOLD,
+) -> list[tuple[str, ...]]:
+    """Lista os arquivos alterados com git diff --name-status -z.
+
+    Args:
+        base_branch: Branch base para comparação
+        workdir: Diretório de trabalho
+        ignore_rules: Regras de arquivos ignorados (default: regras padrão)
+        rename_threshold: Similaridade mínima (%) para renomeações (0 desativa)
+
+    Returns:
+        Lista de tuplas (status, caminho) na ordem do git; renomeações e
+        cópias vêm como (status, caminho_antigo, caminho_novo)
+    """
+    cmd = [
+        "git",
+        "diff",
+        "--name-status",
+        "-z",
+        *_rename_args(rename_threshold),
+        f"{base_branch}...HEAD",
+        "--",
+        *_exclude_pathspecs(ignore_rules),
+    ]
+
+    # surrogateescape preserva caminhos fora de UTF-8 para os pathspecs
+    result = subprocess.run(
+        cmd,
+        capture_output=True,
+        text=True,
+        errors="surrogateescape",
+        cwd=workdir,
+        check=True,
+    )
+
+    entries: list[tuple[str, ...]] = []
+    fields = result.stdout.split("\0")
+    i = 0
+    while i < len(fields) and fields[i]:
+        status = fields[i]
+        # Renomeações (R) e cópias (C) trazem dois caminhos
+        count = 2 if status[0] in "RC" else 1
+        entries.append((status, *fields[i + 1 : i + 1 + count]))
+        i += 1 + count
+
+    return entries
+
+
+def get_diff_numstat(
+    base_branch: str,
+    workdir: Optional[Path] = None,
+    ignore_rules: Optional[IgnoreRules] = None,
+    rename_threshold: int = DEFAULT_RENAME_THRESHOLD,
+) -> list[FileStat]:
+    """Obtém contagens de linhas por arquivo com git diff --numstat -z.
+
+    É um prepass barato (nenhum patch é transferido nem parseado) usado para
+    o resumo, para sair cedo em diffs vazios e para decidir quais arquivos
+    são grandes demais antes do parse completo.
+
+    Args:
+        base_branch: Branch base para comparação
+        workdir: Diretório de trabalho
+        ignore_rules: Regras de arquivos ignorados (default: regras padrão)
+        rename_threshold: Similaridade mínima (%) para renomeações (0 desativa)
+
+    Returns:
+        Lista de FileStat na ordem do git
+    """
+    cmd = [
+        "git",
+        "diff",
+        "--numstat",
+        "-z",
+        *_rename_args(rename_threshold),
+        f"{base_branch}...HEAD",
+        "--",
+        *_exclude_pathspecs(ignore_rules),
+    ]
+
+    result = subprocess.run(
+        cmd,
+        capture_output=True,
+        text=True,
+        errors="surrogateescape",
+        cwd=workdir,
+        check=True,
+    )
+
+    stats: list[FileStat] = []
+    fields = result.stdout.split("\0")
+    i = 0
+    while i < len(fields) and fields[i]:
+        added, removed, path = fields[i].split("\t", 2)
+        old_path = None
+        i += 1
+        # Renomeações e cópias: caminho vazio seguido de caminho_antigo e caminho_novo
+        if not path:
+            old_path, path = fields[i], fields[i + 1]
+            i += 2
+
+        is_binary = added == "-"
+        stats.append(
+            FileStat(
+                path=path,
+                added=0 if is_binary else int(added),
+                removed=0 if is_binary else int(removed),
+                is_binary=is_binary,
+                old_path=old_path,
+            )
+        )
+
+    return stats
+
+
+def _parse_diff_batch(
+    base_branch: str,
+    workdir: Optional[Path],
+    context_lines: int,
+    paths: list[str],
+    ignore_rules: Optional[IgnoreRules],
+    rename_threshold: int,
+) -> list[CompactDiffFile]:
+    """Extrai e parseia o diff de um lote de arquivos (executado nos workers)."""
+    cmd = _build_diff_command(
+        base_branch, context_lines, _literal_pathspecs(paths), rename_threshold
+    )
+    return list(iter_diff_files(_stream_command(cmd, workdir), ignore_rules))
+
+
+def parallel_parse_diff(
+    base_branch: str,
+    workdir: Optional[Path] = None,
+    context_lines: int = 3,
+    ignore_rules: Optional[IgnoreRules] = None,
+    jobs: int = 4,
+    stats: Optional[list[FileStat]] = None,
+    rename_threshold: int = DEFAULT_RENAME_THRESHOLD,
+) -> list[CompactDiffFile]:
+    """Extrai e parseia o diff por arquivo em um pool de processos.
+
+    Lista os arquivos alterados com --name-status e divide-os em lotes
+    contíguos; cada lote roda seu próprio git diff e parser em um processo.
+    Os resultados são concatenados na ordem da listagem, produzindo a mesma
+    lista que o modo serial.
+
+    Renomeações e cópias levam os dois caminhos para o mesmo lote, para que
+    o git as detecte; a origem de uma cópia pode aparecer em dois lotes e é
+    mantida apenas na primeira ocorrência.
+
+    Args:
+        base_branch: Branch base para comparação
+        workdir: Diretório de trabalho
+        context_lines: Número de linhas de contexto de cada hunk
+        ignore_rules: Regras de arquivos ignorados (default: regras padrão)
+        jobs: Número máximo de processos simultâneos
+        stats: Resultado de get_diff_numstat, se já obtido (evita nova listagem)
+        rename_threshold: Similaridade mínima (%) para renomeações (0 desativa)
+
+    Returns:
+        Lista de arquivos parseados, na ordem do git diff
+
+    Raises:
+        subprocess.CalledProcessError: Se algum comando git falhar
+    """
+    # Renomeações e cópias precisam dos dois caminhos para o git detectá-las
+    if stats is not None:
+        rules = ignore_rules or DEFAULT_RULES
+        path_groups = [
+            [p for p in (stat.old_path, stat.path) if p]
+            for stat in stats
+            if not rules.matches(stat.path)
+        ]
+    else:
+        entries = list_changed_files(base_branch, workdir, ignore_rules, rename_threshold)
+        path_groups = [list(entry[1:]) for entry in entries]
+
+    if not path_groups:
+        return []
+
+    if jobs <= 1 or len(path_groups) < PARALLEL_MIN_FILES:
+        paths = [path for group in path_groups for path in group]
+        return _parse_diff_batch(
+            base_branch, workdir, context_lines, paths, ignore_rules, rename_threshold
+        )
+
+    # Lotes pequenos o bastante para distribuir carga entre os workers
+    batch_size = max(1, min(MAX_FILES_PER_BATCH, len(path_groups) // (jobs * 4)))
+    batches = [
+        [path for group in path_groups[i : i + batch_size] for path in group]
+        for i in range(0, len(path_groups), batch_size)
+    ]
+
+    files: list[CompactDiffFile] = []
+    seen: set[str] = set()
+    with ProcessPoolExecutor(max_workers=min(jobs, len(batches))) as executor:
+        futures = [
+            executor.submit(
+                _parse_diff_batch,
+                base_branch,
+                workdir,
+                context_lines,
+                batch,
+                ignore_rules,
+                rename_threshold,
+            )
+            for batch in batches
+        ]
+        # Consome na ordem de submissão para preservar a ordem do diff
+        for future in futures:
+            for diff_file in future.result():
+                if diff_file.path not in seen:
+                    seen.add(diff_file.path)
+                    files.append(diff_file)
+
+    return files
+
+
 def get_current_branch(workdir: Optional[Path] = None) -> str:
     """Retorna o nome da branch atual.
 
@@ -90,148 +466,294 @@ def get_current_branch(workdir: Optional[Path] = None) -> str:
     return result.stdout.strip()
 
 
-def is_ignored_file(path: str) -> bool:
+def get_merge_base(base_branch: str, workdir: Optional[Path] = None) -> str:
+    """Retorna o SHA do merge-base entre a branch base e HEAD.
+
+    Args:
+        base_branch: Branch base para comparação
+        workdir: Diretório de trabalho
+
+    Returns:
+        SHA completo do merge-base
+    """
+    cmd = ["git", "merge-base", base_branch, "HEAD"]
+
+    result = subprocess.run(
+        cmd,
+        capture_output=True,
+        text=True,
+        cwd=workdir,
+        check=True,
+    )
+
+    return result.stdout.strip()
+
+
+def get_head_sha(workdir: Optional[Path] = None) -> str:
+    """Retorna o SHA completo de HEAD.
+
+    Args:
+        workdir: Diretório de trabalho
+
+    Returns:
+        SHA do commit atual
+    """
+    cmd = ["git", "rev-parse", "HEAD"]
+
+    result = subprocess.run(
+        cmd,
+        capture_output=True,
+        text=True,
+        cwd=workdir,
+        check=True,
+    )
+
+    return result.stdout.strip()
+
+
+def is_ignored_file(path: str, ignore_rules: Optional[IgnoreRules] = None) -> bool:
     """Verifica se um arquivo deve ser ignorado na análise.
 
     Args:
         path: Caminho do arquivo
+        ignore_rules: Regras a aplicar (default: regras padrão)
 
     Returns:
         True se o arquivo deve ser ignorado
     """
-    for pattern in IGNORED_PATTERNS:
-        if re.match(pattern, path):
-            return True
-    return False
+    return (ignore_rules or DEFAULT_RULES).matches(path)
 
 
-def parse_diff(diff_output: str) -> list[DiffFile]:
+def parse_diff(
+    diff_output: Union[str, bytes], ignore_rules: Optional[IgnoreRules] = None
+) -> list[CompactDiffFile]:
     """Parseia o output do git diff.
 
     Extrai arquivos modificados, hunk headers (nomes de funções)
     e linhas adicionadas/removidas.
 
     Args:
-        diff_output: Output do comando git diff
+        diff_output: Output do comando git diff (bytes ou texto)
+        ignore_rules: Regras de arquivos ignorados (default: regras padrão)
 
     Returns:
-        Lista de DiffFile com informações parseadas
+        Lista de CompactDiffFile (não mais DiffFile do Pydantic): mesmos
+        atributos de leitura; use to_model() em cada arquivo para obter o
+        modelo Pydantic
+    """
+    if isinstance(diff_output, str):
+        diff_output = diff_output.encode("utf-8", "surrogateescape")
+    return list(iter_diff_files(diff_output.split(b"\n"), ignore_rules))
+
+
+def _as_bytes_lines(lines: Iterable[Union[bytes, str]]) -> Iterator[bytes]:
+    """Garante linhas em bytes; linhas de texto são codificadas em UTF-8."""
+    iterator = iter(lines)
+    first = next(iterator, None)
+    if first is None:
+        return
+    if isinstance(first, bytes):
+        yield first
+        yield from iterator
+    else:
+        yield first.encode("utf-8", "surrogateescape")
+        for line in iterator:
+            yield line.encode("utf-8", "surrogateescape")
+
+
+def _decode_text(raw: bytes) -> str:
+    """Decodifica caminhos e nomes de função do diff sem falhar."""
+    return raw.decode("utf-8", "replace")
+
+
+def _unescape(match: "re.Match[bytes]") -> bytes:
+    escaped = match.group(1)
+    if escaped[:1].isdigit():
+        return bytes([int(escaped, 8) & 0xFF])
+    return QUOTED_ESCAPES.get(escaped, escaped)
+
+
+def _decode_path(raw: bytes, quoted: bool = False) -> str:
+    """Decodifica um caminho do diff, desfazendo as aspas e escapes do git.
+
+    Args:
+        raw: Caminho como aparece no diff
+        quoted: Se ``raw`` é o conteúdo entre aspas (sem elas)
+    """
+    if not quoted and len(raw) >= 2 and raw[:1] == b'"' and raw[-1:] == b'"':
+        raw, quoted = raw[1:-1], True
+    if quoted:
+        raw = QUOTED_ESCAPE_PATTERN.sub(_unescape, raw)
+    return _decode_text(raw)
+
+
+def iter_diff_files(
+    lines: Iterable[Union[bytes, str]], ignore_rules: Optional[IgnoreRules] = None
+) -> Iterator[CompactDiffFile]:
+    """Parseia o diff de forma incremental, produzindo um DiffFile por vez.
+
+    Consome as linhas sob demanda (ex: saída de stream_git_diff): o próprio
+    parser guarda apenas o arquivo em andamento, então o pico de memória
+    fica limitado ao maior arquivo do diff enquanto o consumidor também
+    processar um arquivo por vez (``list()`` sobre o gerador guarda todos).
+
+    O parser trabalha sobre bytes: o conteúdo das linhas é guardado sem
+    decodificação e só é decodificado quando lido (ver compact_diff), e as
+    linhas de arquivos ignorados são descartadas já no header, sem parsear
+    seus hunks.
+
+    Args:
+        lines: Linhas do diff (bytes ou texto), sem o terminador de linha
+        ignore_rules: Regras de arquivos ignorados (default: regras padrão)
+
+    Yields:
+        CompactDiffFile de cada arquivo não ignorado, na ordem do diff
     """
-    files: list[DiffFile] = []
-    current_file: Optional[DiffFile] = None
-    current_hunk: Optional[DiffHunk] = None
+    rules = ignore_rules or DEFAULT_RULES
+    current_file: Optional[CompactDiffFile] = None
+    current_hunk: Optional[CompactHunk] = None
     current_line_new = 0
     current_line_old = 0
 
-    lines = diff_output.split("\n")
+    for line in _as_bytes_lines(lines):
+        first = line[:1]
+
+        # Linhas de conteúdo: o caso mais comum é decidido pelo primeiro byte.
+        # Dentro de um hunk, "---"/"+++" são conteúdo (ex: comentário SQL
+        # removido), não headers de arquivo.
+        if current_hunk is not None:
+            if first == b"+":
+                current_hunk.append(ADDED, current_line_new, line[1:])
+                current_line_new += 1
+                continue
+            if first == b"-":
+                current_hunk.append(REMOVED, current_line_old, line[1:])
+                current_line_old += 1
+                continue
+            if first == b" ":
+                # Remove o espaço inicial do diff, preserva indentação
+                current_hunk.append(CONTEXT, current_line_new, line[1:])
+                current_line_new += 1
+                current_line_old += 1
+                continue
 
-    for line in lines:
-        # Novo arquivo no diff
-        file_match = FILE_HEADER_PATTERN.match(line)
-        if file_match:
+        # Novo arquivo no diff: o header encerra o hunk anterior mesmo quando
+        # o caminho não é reconhecido, para que os "---"/"+++" seguintes não
+        # virem conteúdo do arquivo anterior
+        if first == b"d" and line.startswith(FILE_HEADER_PREFIX):
             # Salva arquivo anterior se existir
             if current_file is not None:
                 if current_hunk is not None:
+                    current_hunk.freeze()
                     current_file.hunks.append(current_hunk)
-                if not is_ignored_file(current_file.path):
-                    files.append(current_file)
-
-            # Inicia novo arquivo
-            file_path = file_match.group(2)
-            current_file = DiffFile(path=file_path)
+                yield current_file
+
+            # Inicia novo arquivo; ignorados (ou com header irreconhecível)
+            # ficam sem arquivo corrente e suas linhas são descartadas até o
+            # próximo header
+            file_path = ""
+            file_match = FILE_HEADER_PATTERN.match(line)
+            if file_match:
+                plain, quoted = file_match.groups()
+                if plain is not None:
+                    file_path = _decode_text(plain)
+                else:
+                    file_path = _decode_path(quoted, quoted=True)
+            current_file = (
+                CompactDiffFile(path=file_path)
+                if file_path and not rules.matches(file_path)
+                else None
+            )
             current_hunk = None
             continue
 
-        # Verifica se é arquivo novo ou deletado
-        if current_file is not None:
-            if NEW_FILE_PATTERN.match(line):
-                current_file.is_new = True
-                continue
-            if DELETED_FILE_PATTERN.match(line):
-                current_file.is_deleted = True
-                continue
-
-        # Novo hunk
-        hunk_match = HUNK_HEADER_PATTERN.match(line)
-        if hunk_match and current_file is not None:
-            # Salva hunk anterior se existir
-            if current_hunk is not None:
-                current_file.hunks.append(current_hunk)
-
-            start_old = int(hunk_match.group(1))
-            start_new = int(hunk_match.group(2))
-            function_name = hunk_match.group(3)
-
-            # Limpa o nome da função (remove espaços extras)
-            if function_name:
-                function_name = function_name.strip()
-                # Extrai apenas o nome da função se houver assinatura
-                func_match = re.match(
-                    r"(?:def|function|func|class|async\s+def|public|private|protected)?\s*(\w+)",
-                    function_name,
-                )
-                if func_match:
-                    function_name = func_match.group(1)
-
-            current_hunk = DiffHunk(
-                function_name=function_name if function_name else None,
-                start_line_old=start_old,
-                start_line_new=start_new,
-            )
-            current_line_new = start_new
-            current_line_old = start_old
+        if current_file is None:
             continue
 
-        # Linha adicionada
-        if line.startswith("+") and not line.startswith("+++"):
-            if current_hunk is not None:
-                current_hunk.added_lines.append(
-                    DiffLine(
-                        line_number=current_line_new,
-                        content=line[1:],  # Remove o +
-                        is_addition=True,
-                    )
-                )
-                current_line_new += 1
-            continue
+        # Novo hunk
+        if first == b"@":
+            hunk_match = HUNK_HEADER_PATTERN.match(line)
+            if hunk_match:
+                # Salva hunk anterior se existir
+                if current_hunk is not None:
+                    current_hunk.freeze()
+                    current_file.hunks.append(current_hunk)
 
-        # Linha removida
-        if line.startswith("-") and not line.startswith("---"):
-            if current_hunk is not None:
-                current_hunk.removed_lines.append(
-                    DiffLine(
-                        line_number=current_line_old,
-                        content=line[1:],  # Remove o -
-                        is_addition=False,
-                    )
+                start_old = int(hunk_match.group(1))
+                start_new = int(hunk_match.group(2))
+                current_hunk = CompactHunk(
+                    function_name=_clean_function_name(hunk_match.group(3)),
+                    start_line_old=start_old,
+                    start_line_new=start_new,
                 )
-                current_line_old += 1
-            continue
+                current_line_new = start_new
+                current_line_old = start_old
+                continue
 
-        # Linha de contexto (não modificada) - preserva indentação original
-        if line.startswith(" "):
-            if current_hunk is not None:
-                current_hunk.context_lines.append(
-                    DiffLine(
-                        line_number=current_line_new,
-                        content=line[1:],  # Remove o espaço inicial do diff, preserva indentação
-                        is_addition=False,
-                    )
-                )
-            current_line_new += 1
-            current_line_old += 1
+        # Headers estendidos: arquivo novo, deletado, renomeado ou copiado
+        if current_hunk is None:
+            _parse_extended_header(current_file, line)
 
     # Salva último arquivo e hunk
     if current_file is not None:
         if current_hunk is not None:
+            current_hunk.freeze()
             current_file.hunks.append(current_hunk)
-        if not is_ignored_file(current_file.path):
-            files.append(current_file)
+        yield current_file
 
-    return files
 
+def _clean_function_name(raw: Optional[bytes]) -> Optional[str]:
+    """Extrai o nome da função do contexto do hunk header."""
+    if not raw:
+        return None
 
-def get_modified_functions(diff_files: list[DiffFile]) -> list[tuple[str, str]]:
+    # Limpa o nome da função (remove espaços extras)
+    function_name = _decode_text(raw).strip()
+    # Extrai apenas o nome da função se houver assinatura
+    func_match = re.match(
+        r"(?:def|function|func|class|async\s+def|public|private|protected)?\s*(\w+)",
+        function_name,
+    )
+    if func_match:
+        function_name = func_match.group(1)
+
+    return function_name or None
+
+
+def _parse_extended_header(diff_file: CompactDiffFile, line: bytes) -> None:
+    """Aplica ao arquivo um header estendido do git diff (antes do primeiro hunk)."""
+    if NEW_FILE_PATTERN.match(line):
+        diff_file.is_new = True
+        return
+    if DELETED_FILE_PATTERN.match(line):
+        diff_file.is_deleted = True
+        return
+
+    similarity_match = SIMILARITY_PATTERN.match(line)
+    if similarity_match:
+        diff_file.similarity = int(similarity_match.group(1))
+        return
+
+    rename_match = RENAME_FROM_PATTERN.match(line)
+    if rename_match:
+        diff_file.old_path = _decode_path(rename_match.group(1))
+        diff_file.is_renamed = True
+        return
+
+    copy_match = COPY_FROM_PATTERN.match(line)
+    if copy_match:
+        diff_file.old_path = _decode_path(copy_match.group(1))
+        diff_file.is_copied = True
+        return
+
+    # "rename to"/"copy to" trazem o caminho sem a ambiguidade de espaços
+    # do header "diff --git"
+    to_match = RENAME_TO_PATTERN.match(line) or COPY_TO_PATTERN.match(line)
+    if to_match:
+        diff_file.path = _decode_path(to_match.group(1))
+
+
+def get_modified_functions(diff_files: list[DiffFileLike]) -> list[tuple[str, str]]:
     """Extrai lista de funções modificadas.
 
     Args:
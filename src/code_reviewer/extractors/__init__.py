@@ -0,0 +1,133 @@
+"""Extratores de símbolos - Registry plugável por extensão de arquivo.
+
+Cada linguagem fica em um módulo próprio, importado apenas quando um arquivo
+daquela extensão precisa ser analisado. Extensões sem extrator específico
+usam a extração textual genérica.
+"""
+
+import importlib
+import threading
+from pathlib import PurePosixPath
+
+from .base import Definition, FileSymbols, RegexExtractor, SymbolExtractor
+
+# Registry: extensão -> "módulo:Classe" do extrator (import sob demanda)
+EXTRACTORS: dict[str, str] = {
+    ".py": "python:PythonExtractor",
+    ".pyi": "python:PythonExtractor",
+    ".js": "javascript:JavaScriptExtractor",
+    ".jsx": "javascript:JavaScriptExtractor",
+    ".mjs": "javascript:JavaScriptExtractor",
+    ".cjs": "javascript:JavaScriptExtractor",
+    ".ts": "javascript:JavaScriptExtractor",
+    ".tsx": "javascript:JavaScriptExtractor",
+    ".java": "java:JavaExtractor",
+    ".cs": "java:CSharpExtractor",
+    ".kt": "kotlin:KotlinExtractor",
+    ".kts": "kotlin:KotlinExtractor",
+    ".go": "go:GoExtractor",
+    ".rs": "rust:RustExtractor",
+    ".rb": "ruby:RubyExtractor",
+}
+
+# Chave usada para arquivos sem extrator específico
+GENERIC = "generic"
+
+_generic = RegexExtractor()
+_loaded: dict[str, SymbolExtractor] = {GENERIC: _generic}
+_lock = threading.Lock()
+
+
+def extractor_key(path: str) -> str:
+    """Identifica o extrator de um arquivo sem importá-lo.
+
+    Args:
+        path: Caminho do arquivo
+
+    Returns:
+        Entrada do registry ("módulo:Classe") ou GENERIC
+    """
+    return EXTRACTORS.get(PurePosixPath(path).suffix.lower(), GENERIC)
+
+
+def load_extractor(key: str) -> SymbolExtractor:
+    """Obtém o extrator de uma entrada do registry, importando-o se necessário.
+
+    Args:
+        key: Entrada do registry (ver extractor_key)
+
+    Returns:
+        Instância do extrator
+    """
+    if key in _loaded:
+        return _loaded[key]
+
+    with _lock:
+        if key not in _loaded:
+            module_name, class_name = key.split(":")
+            module = importlib.import_module(f".{module_name}", __name__)
+            _loaded[key] = getattr(module, class_name)()
+        return _loaded[key]
+
+
+def get_extractor(path: str) -> SymbolExtractor:
+    """Obtém o extrator adequado ao arquivo, importando-o se necessário.
+
+    Args:
+        path: Caminho do arquivo
+
+    Returns:
+        Extrator da linguagem (ou o genérico)
+    """
+    return load_extractor(extractor_key(path))
+
+
+def extract_file(path: str, content: str) -> FileSymbols:
+    """Extrai definições e chamadas de um arquivo com o extrator da sua linguagem.
+
+    Args:
+        path: Caminho do arquivo
+        content: Conteúdo do arquivo
+
+    Returns:
+        FileSymbols com pares (símbolo, linha)
+    """
+    return get_extractor(path).extract(content)
+
+
+def definition_ranges(path: str, content: str) -> list[Definition]:
+    """Localiza o corpo de cada definição de um arquivo.
+
+    Args:
+        path: Caminho do arquivo
+        content: Conteúdo do arquivo
+
+    Returns:
+        Definições com linha inicial e final, ordenadas pela linha inicial
+    """
+    return get_extractor(path).definition_ranges(content)
+
+
+def list_extensions() -> list[str]:
+    """Lista as extensões com extrator específico.
+
+    Returns:
+        Lista de extensões (com ponto)
+    """
+    return list(EXTRACTORS.keys())
+
+
+__all__ = [
+    "EXTRACTORS",
+    "GENERIC",
+    "Definition",
+    "FileSymbols",
+    "RegexExtractor",
+    "SymbolExtractor",
+    "definition_ranges",
+    "extract_file",
+    "extractor_key",
+    "get_extractor",
+    "load_extractor",
+    "list_extensions",
+]
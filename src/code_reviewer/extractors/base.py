@@ -0,0 +1,212 @@
+"""Base dos extratores de símbolos por linguagem."""
+
+import re
+from bisect import bisect_right
+from collections.abc import Iterable
+from typing import NamedTuple, Protocol, runtime_checkable
+
+# Chamada: identificador seguido de "(" (sem espaço, como no grep dos callers)
+CALL_PATTERN = re.compile(r"\b([A-Za-z_]\w*)\(")
+IDENTIFIER = r"[A-Za-z_]\w*"
+
+# Definição genérica, usada em arquivos sem extrator específico
+GENERIC_DEFINITION = re.compile(rf"\b(?:def|class|function|func)\s+(?P<name>{IDENTIFIER})")
+GENERIC_COMMENT_PREFIXES = ("#", "//", "/*", "*", "'''", '"""')
+C_COMMENT_PREFIXES = ("//", "/*", "*")
+
+# Literais de string e comentário de linha, ignorados na contagem de chaves
+BRACE_NOISE = re.compile(r""""(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'|`[^`]*`|//.*$""")
+# Linhas após a definição em que a abertura do bloco ainda é procurada
+# (assinaturas quebradas em várias linhas)
+MAX_SIGNATURE_LINES = 5
+
+
+class FileSymbols(NamedTuple):
+    """Definições e chamadas de um arquivo, como pares (símbolo, linha)."""
+
+    definitions: list[tuple[str, int]]
+    calls: list[tuple[str, int]]
+
+
+class Definition(NamedTuple):
+    """Definição com o intervalo de linhas que ocupa (1-based, inclusivo)."""
+
+    name: str
+    start: int
+    end: int
+
+
+@runtime_checkable
+class SymbolExtractor(Protocol):
+    """Interface dos extratores de definições e chamadas de uma linguagem."""
+
+    @property
+    def language(self) -> str:
+        """Nome identificador da linguagem."""
+        ...
+
+    def extract(self, content: str) -> FileSymbols:
+        """Extrai definições e chamadas do conteúdo de um arquivo.
+
+        Args:
+            content: Conteúdo do arquivo
+
+        Returns:
+            FileSymbols com linhas numeradas a partir de 1
+        """
+        ...
+
+    def definition_ranges(self, content: str) -> list[Definition]:
+        """Localiza o corpo de cada definição do arquivo.
+
+        Args:
+            content: Conteúdo do arquivo
+
+        Returns:
+            Definições ordenadas pela linha inicial
+        """
+        ...
+
+    def grep_patterns(self, names: Iterable[str]) -> list[str]:
+        """Padrões ERE (grep -E) que encontram definições dos símbolos.
+
+        Podem incluir falsos positivos: cada linha encontrada é confirmada
+        depois com extract().
+
+        Args:
+            names: Identificadores a buscar
+
+        Returns:
+            Lista de padrões
+        """
+        ...
+
+
+class RegexExtractor:
+    """Extrator textual: definições por expressões regulares, linha a linha.
+
+    Subclasses configuram os padrões de definição (com o grupo ``name``), os
+    padrões ERE correspondentes para o grep (com ``{names}`` no lugar da
+    alternação de símbolos) e os prefixos de comentário da linguagem.
+
+    ``block_style`` define como o fim de uma definição é localizado: por
+    chaves (``"braces"``), por indentação (``"indent"``) ou, no genérico,
+    conforme a definição abra ou não uma chave (``"auto"``).
+    """
+
+    language = "generic"
+    definition_patterns: tuple[re.Pattern[str], ...] = (GENERIC_DEFINITION,)
+    grep_templates: tuple[str, ...] = (r"\b(def|class|function|func)\s+({names})\b",)
+    comment_prefixes: tuple[str, ...] = GENERIC_COMMENT_PREFIXES
+    block_style = "auto"
+
+    def extract(self, content: str) -> FileSymbols:
+        """Extrai definições e chamadas, ignorando comentários.
+
+        A linha que define um símbolo não conta como chamada a ele.
+        """
+        definitions: list[tuple[str, int]] = []
+        calls: list[tuple[str, int]] = []
+
+        # Numeração igual à do grep e do git (apenas \n quebra linha)
+        for line_number, line in enumerate(content.split("\n"), start=1):
+            stripped = line.strip()
+            if not stripped or stripped.startswith(self.comment_prefixes):
+                continue
+
+            defined: dict[str, None] = {}
+            for pattern in self.definition_patterns:
+                for match in pattern.finditer(line):
+                    defined[match.group("name")] = None
+            definitions.extend((symbol, line_number) for symbol in defined)
+
+            for symbol in dict.fromkeys(CALL_PATTERN.findall(line)):
+                if symbol not in defined:
+                    calls.append((symbol, line_number))
+
+        return FileSymbols(definitions, calls)
+
+    def definition_ranges(self, content: str) -> list[Definition]:
+        """Localiza o corpo de cada definição por chaves ou por indentação."""
+        lines = content.split("\n")
+        definitions = self.extract(content).definitions
+        starts = [start for _, start in definitions] + [len(lines) + 1]
+        ranges = []
+        for name, start in definitions:
+            # A abertura do bloco precisa vir antes da próxima definição
+            limit = starts[bisect_right(starts, start)]
+            ranges.append(Definition(name, start, self._block_end(lines, start, limit)))
+        return ranges
+
+    def _block_end(self, lines: list[str], start: int, limit: int) -> int:
+        """Última linha (1-based) do bloco que começa na linha ``start``."""
+        style = self.block_style
+        if style == "auto":
+            window = lines[start - 1 : start + 1]
+            style = "braces" if any("{" in line for line in window) else "indent"
+        if style == "braces":
+            return _brace_block_end(lines, start, limit)
+        return _indent_block_end(lines, start)
+
+    def grep_patterns(self, names: Iterable[str]) -> list[str]:
+        """Padrões ERE de definição para os símbolos dados."""
+        alternation = "|".join(sorted(names))
+        if not alternation:
+            return []
+        return [template.replace("{names}", alternation) for template in self.grep_templates]
+
+
+def _brace_block_end(lines: list[str], start: int, limit: int) -> int:
+    """Fim do bloco delimitado por chaves; a própria linha se não houver bloco.
+
+    A chave de abertura é procurada até MAX_SIGNATURE_LINES linhas adiante,
+    sem alcançar a linha ``limit`` (a próxima definição).
+    """
+    depth = 0
+    opened = False
+    for index in range(start - 1, len(lines)):
+        code = BRACE_NOISE.sub("", lines[index])
+        for char in code:
+            if char == "{":
+                depth += 1
+                opened = True
+            elif char == "}" and opened:
+                depth -= 1
+                if depth == 0:
+                    return index + 1
+        if not opened:
+            # Declaração sem corpo (abstrata, protótipo) ou expressão
+            next_line = index + 2
+            if (
+                code.rstrip().endswith(";")
+                or next_line >= limit
+                or next_line - start >= MAX_SIGNATURE_LINES
+            ):
+                return start
+    # Bloco não fechado (arquivo truncado): vai até o fim
+    return len(lines) if opened else start
+
+
+def _indent_block_end(lines: list[str], start: int) -> int:
+    """Fim do bloco indentado: última linha antes de voltar à indentação da definição.
+
+    Um ``end`` na mesma indentação (Ruby) faz parte do bloco.
+    """
+    header = lines[start - 1]
+    indent = len(header) - len(header.lstrip())
+    end = start
+    for index in range(start, len(lines)):
+        line = lines[index]
+        stripped = line.lstrip()
+        if not stripped:
+            continue
+        if len(line) - len(stripped) <= indent:
+            # Fechamento de uma assinatura quebrada em várias linhas
+            if stripped.startswith((")", "]")):
+                end = index + 1
+                continue
+            if stripped.rstrip() == "end" and len(line) - len(stripped) == indent:
+                end = index + 1
+            break
+        end = index + 1
+    return end
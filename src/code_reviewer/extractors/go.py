@@ -0,0 +1,21 @@
+"""Extrator de símbolos Go."""
+
+import re
+
+from .base import C_COMMENT_PREFIXES, IDENTIFIER, RegexExtractor
+
+
+class GoExtractor(RegexExtractor):
+    """Go: funções, métodos com receiver e tipos."""
+
+    language = "go"
+    definition_patterns = (
+        re.compile(rf"^func\s+(?:\([^)]*\)\s*)?(?P<name>{IDENTIFIER})"),
+        re.compile(rf"^type\s+(?P<name>{IDENTIFIER})\b"),
+    )
+    grep_templates = (
+        r"^func\s+(\([^)]*\)\s*)?({names})\b",
+        r"^type\s+({names})\b",
+    )
+    comment_prefixes = C_COMMENT_PREFIXES
+    block_style = "braces"
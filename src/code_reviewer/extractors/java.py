@@ -0,0 +1,40 @@
+"""Extratores de símbolos Java e C#."""
+
+import re
+
+from .base import C_COMMENT_PREFIXES, IDENTIFIER, RegexExtractor
+
+MODIFIERS = (
+    r"(?:(?:public|protected|private|internal|static|final|abstract|synchronized|native|"
+    r"default|override|virtual|async|sealed|extern|unsafe|partial|new|readonly)\s+)"
+)
+# Palavras que aparecem antes de "nome(" sem ser tipo de retorno
+NOT_A_TYPE = r"(?:return|new|else|throw|await|case|yield|goto|in|is|as)\b"
+
+
+class JavaExtractor(RegexExtractor):
+    """Java: classes, métodos (tipo de retorno + nome) e construtores."""
+
+    language = "java"
+    definition_patterns = (
+        re.compile(rf"\b(?:class|interface|enum|record|struct)\s+(?P<name>{IDENTIFIER})"),
+        # Método: [anotações] [modificadores] [<T>] Tipo nome(
+        re.compile(
+            rf"^\s*(?:@{IDENTIFIER}(?:\([^)]*\))?\s+)*{MODIFIERS}*(?:<[^>]+>\s+)?"
+            rf"(?!{NOT_A_TYPE})[\w<>\[\],.?]+\s+(?P<name>{IDENTIFIER})\s*\("
+        ),
+        # Construtor: modificador de visibilidade + Nome(
+        re.compile(r"^\s*(?:public|protected|private|internal)\s+(?P<name>[A-Z]\w*)\s*\("),
+    )
+    grep_templates = (
+        r"\b(class|interface|enum|record|struct)\s+({names})\b",
+        r"\s({names})\s*\(",
+    )
+    comment_prefixes = C_COMMENT_PREFIXES
+    block_style = "braces"
+
+
+class CSharpExtractor(JavaExtractor):
+    """C#: mesma estrutura de declarações do Java."""
+
+    language = "csharp"
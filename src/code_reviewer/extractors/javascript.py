@@ -0,0 +1,38 @@
+"""Extrator de símbolos JavaScript e TypeScript."""
+
+import re
+
+from .base import C_COMMENT_PREFIXES, RegexExtractor
+
+JS_IDENTIFIER = r"[A-Za-z_$][\w$]*"
+# Palavras que precedem "(" sem ser nome de método
+CONTROL_KEYWORDS = r"(?:if|for|while|switch|catch|function|return|with|super|new)\b"
+
+
+class JavaScriptExtractor(RegexExtractor):
+    """JavaScript/TypeScript: funções, classes, arrow functions e métodos."""
+
+    language = "javascript"
+    definition_patterns = (
+        re.compile(rf"\bfunction\s*\*?\s*(?P<name>{JS_IDENTIFIER})"),
+        re.compile(rf"\b(?:class|interface|enum|type)\s+(?P<name>{JS_IDENTIFIER})"),
+        # const nome = (args) => ..., const nome = async x => ..., const nome = function
+        re.compile(
+            rf"\b(?:const|let|var)\s+(?P<name>{JS_IDENTIFIER})\s*(?::[^=]+)?=\s*(?:async\s+)?"
+            rf"(?:function\b|\([^)]*\)\s*(?::[^=]+)?=>|{JS_IDENTIFIER}\s*=>)"
+        ),
+        # Métodos de classe: nome(args) { ... }, com modificadores opcionais
+        re.compile(
+            r"^\s*(?:(?:public|private|protected|static|async|readonly|override|get|set)\s+)*"
+            rf"(?!{CONTROL_KEYWORDS})(?P<name>{JS_IDENTIFIER})\s*(?:<[^>]*>)?\([^)]*\)"
+            r"\s*(?::\s*[^{=;]+)?\{"
+        ),
+    )
+    grep_templates = (
+        r"\bfunction\s*\*?\s*({names})\b",
+        r"\b(class|interface|enum|type)\s+({names})\b",
+        r"\b(const|let|var)\s+({names})\s*[:=]",
+        r"^\s*(public\s+|private\s+|protected\s+|static\s+|async\s+)*({names})\s*[(<]",
+    )
+    comment_prefixes = C_COMMENT_PREFIXES
+    block_style = "braces"
@@ -0,0 +1,21 @@
+"""Extrator de símbolos Kotlin."""
+
+import re
+
+from .base import C_COMMENT_PREFIXES, IDENTIFIER, RegexExtractor
+
+
+class KotlinExtractor(RegexExtractor):
+    """Kotlin: ``fun`` (inclusive extensões e genéricos) e classes/objetos."""
+
+    language = "kotlin"
+    definition_patterns = (
+        re.compile(rf"\bfun\s+(?:<[^>]+>\s*)?(?:[\w.]+\.)?(?P<name>{IDENTIFIER})\s*\("),
+        re.compile(rf"\b(?:class|object|interface)\s+(?P<name>{IDENTIFIER})"),
+    )
+    grep_templates = (
+        r"\bfun\s.*\b({names})\s*\(",
+        r"\b(class|object|interface)\s+({names})\b",
+    )
+    comment_prefixes = C_COMMENT_PREFIXES
+    block_style = "braces"
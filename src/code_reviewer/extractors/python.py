@@ -0,0 +1,30 @@
+"""Extrator de símbolos Python (árvore sintática, com fallback textual)."""
+
+import re
+
+from ..python_symbols import analyze_python
+from .base import IDENTIFIER, Definition, FileSymbols, RegexExtractor
+
+
+class PythonExtractor(RegexExtractor):
+    """Python: ``ast`` para código válido; regex para arquivos com erro de sintaxe."""
+
+    language = "python"
+    definition_patterns = (re.compile(rf"\b(?:def|class)\s+(?P<name>{IDENTIFIER})"),)
+    grep_templates = (r"\b(def|class)\s+({names})\b",)
+    comment_prefixes = ("#", "'''", '"""')
+    block_style = "indent"
+
+    def extract(self, content: str) -> FileSymbols:
+        """Extrai definições e chamadas via ast (ver python_symbols)."""
+        symbols = analyze_python(content)
+        if symbols is None:
+            return super().extract(content)
+        return FileSymbols(symbols.definitions, symbols.calls)
+
+    def definition_ranges(self, content: str) -> list[Definition]:
+        """Intervalos das definições pela árvore sintática (``end_lineno``)."""
+        symbols = analyze_python(content)
+        if symbols is None:
+            return super().definition_ranges(content)
+        return [Definition(*definition) for definition in symbols.ranges]
@@ -0,0 +1,21 @@
+"""Extrator de símbolos Ruby."""
+
+import re
+
+from .base import IDENTIFIER, RegexExtractor
+
+
+class RubyExtractor(RegexExtractor):
+    """Ruby: ``def``, ``def self.``, classes e módulos."""
+
+    language = "ruby"
+    definition_patterns = (
+        re.compile(rf"\bdef\s+(?:self\.|{IDENTIFIER}\.)?(?P<name>{IDENTIFIER})"),
+        re.compile(r"\b(?:class|module)\s+(?:\w+::)*(?P<name>[A-Z]\w*)"),
+    )
+    grep_templates = (
+        r"\bdef\s+(self\.)?({names})\b",
+        r"\b(class|module)\s+({names})\b",
+    )
+    comment_prefixes = ("#",)
+    block_style = "indent"
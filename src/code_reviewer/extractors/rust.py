@@ -0,0 +1,21 @@
+"""Extrator de símbolos Rust."""
+
+import re
+
+from .base import C_COMMENT_PREFIXES, IDENTIFIER, RegexExtractor
+
+
+class RustExtractor(RegexExtractor):
+    """Rust: ``fn`` e tipos (struct, enum, trait, type)."""
+
+    language = "rust"
+    definition_patterns = (
+        re.compile(rf"\bfn\s+(?P<name>{IDENTIFIER})"),
+        re.compile(rf"\b(?:struct|enum|trait|type|union)\s+(?P<name>{IDENTIFIER})"),
+    )
+    grep_templates = (
+        r"\bfn\s+({names})\b",
+        r"\b(struct|enum|trait|type|union)\s+({names})\b",
+    )
+    comment_prefixes = C_COMMENT_PREFIXES
+    block_style = "braces"
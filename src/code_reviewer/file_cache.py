@@ -0,0 +1,153 @@
+"""Cache de conteúdo de arquivos para a construção de contexto.
+
+Uma mesma execução lê várias vezes os mesmos arquivos (o arquivo do diff,
+os arquivos onde os símbolos foram encontrados, as janelas ao redor de cada
+referência). O cache guarda o texto decodificado com um orçamento de bytes e
+descarte LRU, e um índice de início de linhas por arquivo, construído uma
+vez, para recortar janelas sem dividir o arquivo inteiro em linhas.
+"""
+
+import threading
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+# Orçamento padrão de bytes de conteúdo mantidos em memória
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class CachedFile:
+    """Conteúdo de um arquivo com índice de linhas construído sob demanda."""
+
+    __slots__ = ("text", "size", "_offsets")
+
+    def __init__(self, text: str, size: int):
+        self.text = text
+        self.size = size
+        self._offsets: Optional[array] = None
+
+    def _line_offsets(self) -> array:
+        """Posição de início de cada linha (o índice é construído uma vez)."""
+        if self._offsets is None:
+            offsets = array("q", [0])
+            find = self.text.find
+            position = find("\n")
+            while position != -1:
+                offsets.append(position + 1)
+                position = find("\n", position + 1)
+            self._offsets = offsets
+        return self._offsets
+
+    @property
+    def line_count(self) -> int:
+        """Número de linhas (mesma contagem de ``text.split("\\n")``)."""
+        return len(self._line_offsets())
+
+    def lines(self, first: int, last: int) -> str:
+        """Recorta as linhas first..last (1-based, inclusivas), limitadas ao arquivo.
+
+        Args:
+            first: Primeira linha
+            last: Última linha
+
+        Returns:
+            Linhas unidas por ``\\n`` (vazio se o intervalo não existir)
+        """
+        offsets = self._line_offsets()
+        first = max(1, first)
+        last = min(len(offsets), last)
+        if first > last:
+            return ""
+
+        start = offsets[first - 1]
+        # Fim da última linha: antes do \n seguinte (ou fim do texto)
+        end = offsets[last] - 1 if last < len(offsets) else len(self.text)
+        return self.text[start:end]
+
+
+class FileCache:
+    """Cache LRU de arquivos de texto com orçamento de bytes.
+
+    Seguro para uso concorrente pelas threads do context_builder. Arquivos
+    maiores que o orçamento são lidos normalmente, mas não ficam em cache.
+    """
+
+    def __init__(self, workdir: Optional[Path] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        """Inicializa o cache.
+
+        Args:
+            workdir: Diretório raiz do projeto (base dos caminhos relativos)
+            max_bytes: Orçamento de bytes de conteúdo em memória
+        """
+        self._root = Path(workdir or ".")
+        self._max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Optional[CachedFile]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        """Bytes de conteúdo atualmente em cache."""
+        return self._size
+
+    def get(self, file_path: str) -> Optional[CachedFile]:
+        """Obtém um arquivo, lendo do disco apenas se não estiver em cache.
+
+        Args:
+            file_path: Caminho relativo ao workdir
+
+        Returns:
+            CachedFile, ou None se o arquivo não existir ou não for UTF-8
+        """
+        with self._lock:
+            if file_path in self._entries:
+                self._entries.move_to_end(file_path)
+                return self._entries[file_path]
+
+        cached = self._load(file_path)
+
+        with self._lock:
+            size = cached.size if cached is not None else 0
+            if size <= self._max_bytes and file_path not in self._entries:
+                self._entries[file_path] = cached
+                self._size += size
+                self._evict()
+        return cached
+
+    def _load(self, file_path: str) -> Optional[CachedFile]:
+        try:
+            data = (self._root / file_path).read_bytes()
+            text = data.decode("utf-8")
+        except (OSError, UnicodeDecodeError):
+            return None
+        # Mesmas quebras de linha da leitura em modo texto (universal newlines)
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        return CachedFile(text, len(data))
+
+    def _evict(self) -> None:
+        """Descarta os arquivos menos usados até caber no orçamento."""
+        while self._size > self._max_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            if evicted is not None:
+                self._size -= evicted.size
+
+    def read(self, file_path: str) -> Optional[str]:
+        """Conteúdo completo do arquivo (ver get)."""
+        cached = self.get(file_path)
+        return cached.text if cached is not None else None
+
+    def lines(self, file_path: str, first: int, last: int) -> str:
+        """Recorta as linhas first..last (1-based, inclusivas) do arquivo.
+
+        Args:
+            file_path: Caminho relativo ao workdir
+            first: Primeira linha
+            last: Última linha
+
+        Returns:
+            Linhas unidas por ``\\n``, ou vazio se o arquivo não puder ser lido
+        """
+        cached = self.get(file_path)
+        return cached.lines(first, last) if cached is not None else ""
@@ -0,0 +1,177 @@
+"""Varredura de arquivos em processo, alternativa ao grep.
+
+Usada quando o grep não está instalado ou estoura o tempo: os arquivos são
+mapeados em memória (mmap) e pesquisados com uma única expressão regular que
+combina todos os padrões, como no ``grep -E -f``. Listas grandes são
+divididas em lotes varridos por um pool de processos (a busca com ``re``
+não libera o GIL).
+
+Cada execução tem um orçamento de tempo (o chamador passa o que resta do
+seu prazo). Esgotado o tempo, os lotes que faltam são descartados, mas as
+linhas já encontradas são entregues e o gerador informa que o resultado
+ficou parcial.
+"""
+
+import mmap
+import multiprocessing
+import os
+import re
+import time
+from collections.abc import Generator
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Optional
+
+from .source_files import BINARY_SNIFF_BYTES, is_binary
+
+# Tempo máximo (segundos) de uma varredura sem prazo dado pelo chamador
+SCAN_TIMEOUT = 30
+# Arquivos por tarefa enviada ao pool; com um lote só, varre no processo atual
+SCAN_CHUNK_FILES = 128
+
+# Linha encontrada: (arquivo, número da linha, conteúdo)
+Match = tuple[str, int, str]
+
+
+def compile_patterns(patterns: list[str]) -> "re.Pattern[bytes]":
+    """Combina padrões ERE (ver grep_patterns) em uma expressão sobre bytes.
+
+    ``^`` e ``$`` valem em cada linha, como no grep.
+    """
+    return re.compile("|".join(f"(?:{pattern})" for pattern in patterns).encode(), re.MULTILINE)
+
+
+def _scan_data(data: "mmap.mmap | bytes", regex: "re.Pattern[bytes]") -> list[tuple[int, str]]:
+    """Linhas do conteúdo que casam com a expressão, como (número, conteúdo).
+
+    Sobre o arquivo inteiro, ``\\s`` e classes negadas podem atravessar
+    quebras de linha; uma ocorrência que passa do fim da linha só conta se
+    a própria linha casar com a expressão.
+    """
+    found: list[tuple[int, str]] = []
+    size = len(data)
+    position = 0
+    line_number, counted = 1, 0
+    while position < size:
+        match = regex.search(data, position)
+        if match is None:
+            break
+        start = data.rfind(b"\n", 0, match.start()) + 1
+        end = data.find(b"\n", match.start())
+        if end == -1:
+            end = size
+        line = data[start:end]
+        if match.end() <= end or regex.search(line):
+            line_number += data[counted:start].count(b"\n")
+            counted = start
+            found.append((line_number, line.decode("utf-8", "replace")))
+        position = end + 1
+    return found
+
+
+def scan_file(path: Path, regex: "re.Pattern[bytes]") -> list[tuple[int, str]]:
+    """Varre um arquivo mapeado em memória; binários e ilegíveis não têm linhas.
+
+    Args:
+        path: Caminho do arquivo
+        regex: Expressão combinada (ver compile_patterns)
+
+    Returns:
+        Linhas encontradas como (número, conteúdo), em ordem
+    """
+    try:
+        with open(path, "rb") as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return []
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if is_binary(data[:BINARY_SNIFF_BYTES]):
+                    return []
+                return _scan_data(data, regex)
+    except (OSError, ValueError):
+        return []
+
+
+def _scan_chunk(
+    root: str, paths: list[str], patterns: list[str], deadline: float
+) -> tuple[list[Match], bool]:
+    """Varre um lote de arquivos até o prazo (também roda nos processos do pool).
+
+    Returns:
+        Linhas encontradas e se o lote foi varrido por inteiro
+    """
+    regex = compile_patterns(patterns)
+    found: list[Match] = []
+    for path in paths:
+        if time.time() >= deadline:
+            return found, False
+        found.extend((path, number, line) for number, line in scan_file(Path(root) / path, regex))
+    return found, True
+
+
+def _process_context() -> multiprocessing.context.BaseContext:
+    """Contexto dos processos: sem fork direto, já que o chamador usa threads."""
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def scan_files(
+    patterns: list[str],
+    files: list[str],
+    workdir: Optional[Path] = None,
+    workers: int = 1,
+    timeout: Optional[float] = None,
+) -> Generator[Match, None, bool]:
+    """Busca os padrões nos arquivos e entrega as linhas encontradas.
+
+    As linhas saem na ordem dos arquivos, independente da concorrência.
+    Quando o consumidor para de iterar, os lotes pendentes são cancelados.
+
+    Args:
+        patterns: Padrões ERE; uma linha é entregue se casar com qualquer um
+        files: Caminhos relativos ao workdir
+        workdir: Diretório raiz do projeto
+        workers: Processos em paralelo
+        timeout: Orçamento de tempo em segundos (padrão: SCAN_TIMEOUT);
+            esgotado, a varredura para e o que foi encontrado até ali é mantido
+
+    Yields:
+        Tuplas (arquivo, número da linha, conteúdo)
+
+    Returns:
+        Se todos os arquivos foram varridos (False: tempo esgotado, resultado parcial)
+    """
+    if not patterns or not files:
+        return True
+
+    deadline = time.time() + (SCAN_TIMEOUT if timeout is None else timeout)
+    root = str(Path(workdir or "."))
+    chunks = [files[i : i + SCAN_CHUNK_FILES] for i in range(0, len(files), SCAN_CHUNK_FILES)]
+
+    if workers <= 1 or len(chunks) == 1:
+        for chunk in chunks:
+            found, finished = _scan_chunk(root, chunk, patterns, deadline)
+            yield from found
+            if not finished:
+                return False
+        return True
+
+    executor = ProcessPoolExecutor(
+        max_workers=min(workers, len(chunks)), mp_context=_process_context()
+    )
+    try:
+        futures = [
+            executor.submit(_scan_chunk, root, chunk, patterns, deadline) for chunk in chunks
+        ]
+        for future in futures:
+            try:
+                found, finished = future.result(timeout=max(0.0, deadline - time.time()))
+            except (FutureTimeoutError, BrokenProcessPool):
+                return False
+            yield from found
+            if not finished:
+                return False
+        return True
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
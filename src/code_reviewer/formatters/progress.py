@@ -9,10 +9,15 @@ from typing import TYPE_CHECKING
 
 from rich.console import Console
 
+from ..compact_diff import count_changes, total_changes
 from ..i18n import t
 
 if TYPE_CHECKING:
-    from code_reviewer.models import ContextGraph, DiffFile
+    from collections.abc import Mapping, Sequence
+
+    from code_reviewer.compact_diff import DiffFileLike
+    from code_reviewer.diff_parser import FileStat
+    from code_reviewer.models import ContextGraph
 
 
 def is_ci_environment() -> bool:
@@ -158,11 +163,16 @@ class ProgressReporter:
 
         self.console.print(message)
 
-    def show_diff_files(self, files: list[DiffFile]) -> None:
+    def show_diff_files(
+        self,
+        files: Sequence[DiffFileLike],
+        stats: Mapping[str, FileStat] | None = None,
+    ) -> None:
         """Exibe lista de arquivos modificados com contagem de linhas.
 
         Args:
             files: Lista de arquivos do diff
+            stats: Contagens do prepass --numstat por caminho (evita recontar)
         """
         if not self.enabled:
             return
@@ -171,11 +181,18 @@ class ProgressReporter:
         self.console.print(f"[bold]{t('progress.modified_files')}[/bold]")
         for file in files:
             # Conta linhas adicionadas e removidas
-            added = sum(len(hunk.added_lines) for hunk in file.hunks)
-            removed = sum(len(hunk.removed_lines) for hunk in file.hunks)
+            stat = stats.get(file.path) if stats else None
+            if stat is not None:
+                added, removed = stat.added, stat.removed
+            else:
+                added, removed = count_changes(file)
 
             # Define cor baseada no status do arquivo
-            if file.is_new:
+            path = file.path
+            if file.old_path:
+                status = "[cyan]R[/cyan]" if file.is_renamed else "[cyan]C[/cyan]"
+                path = f"{file.old_path} → {file.path}"
+            elif file.is_new:
                 status = "[green]+[/green]"
             elif file.is_deleted:
                 status = "[red]-[/red]"
@@ -184,23 +201,27 @@ class ProgressReporter:
 
             # Formata contagem de linhas
             changes = f"[green]+{added}[/green], [red]-{removed}[/red]"
-            self.console.print(f"  {status} {file.path} ({changes})")
+            self.console.print(f"  {status} {path} ({changes})")
 
-    def show_diff_summary(self, files: list[DiffFile]) -> None:
+    def show_diff_summary(
+        self,
+        files: Sequence[DiffFileLike],
+        stats: Mapping[str, FileStat] | None = None,
+    ) -> None:
         """Exibe resumo do diff (total de arquivos e linhas).
 
         Args:
             files: Lista de arquivos do diff
+            stats: Contagens do prepass --numstat por caminho (evita recontar)
         """
         if not self.enabled:
             return
 
-        total_added = 0
-        total_removed = 0
-
-        for file in files:
-            total_added += sum(len(hunk.added_lines) for hunk in file.hunks)
-            total_removed += sum(len(hunk.removed_lines) for hunk in file.hunks)
+        if stats:
+            total_added = sum(stats[f.path].added for f in files if f.path in stats)
+            total_removed = sum(stats[f.path].removed for f in files if f.path in stats)
+        else:
+            total_added, total_removed = total_changes(files)
 
         summary = (
             f"[bold]{t('progress.files_label')}[/bold] {len(files)} | "
@@ -0,0 +1,192 @@
+"""Regras de arquivos ignorados na análise.
+
+As regras usam sintaxe de glob no estilo .gitignore e são aplicadas em duas
+camadas: viram pathspecs ``:(exclude)`` passados ao git diff (o git nem chega
+a emitir esses arquivos) e um único regex pré-compilado para o filtro residual
+no parser.
+"""
+
+import hashlib
+import re
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Optional
+
+# Arquivo de regras adicionais definido pelo usuário (raiz do repositório)
+IGNORE_FILE_NAME = ".airevignore"
+
+# Arquivos a serem ignorados na análise (sintaxe .gitignore)
+DEFAULT_IGNORED_GLOBS = [
+    "*.lock",
+    "*-lock.json",
+    "*-lock.yaml",
+    "*.min.js",
+    "*.min.css",
+    "*.map",
+    "*.pyc",
+    "migrations/",
+    "node_modules/",
+    "__pycache__/",
+    "dist/",
+    "build/",
+    ".git/",
+]
+
+
+def normalize_glob(pattern: str) -> str:
+    """Converte um padrão estilo .gitignore em glob relativo à raiz.
+
+    - Padrão sem "/" casa com o nome em qualquer profundidade (``**/``)
+    - Padrão com "/" é ancorado na raiz do repositório
+    - "/" no final indica diretório: casa com todo o seu conteúdo
+
+    Args:
+        pattern: Padrão como escrito no .airevignore
+
+    Returns:
+        Glob equivalente para a magic ``glob`` do git
+    """
+    is_dir = pattern.endswith("/")
+    pattern = pattern.strip("/")
+
+    if "/" not in pattern and not pattern.startswith("**"):
+        pattern = f"**/{pattern}"
+    if is_dir:
+        pattern = f"{pattern}/**"
+
+    return pattern
+
+
+def glob_to_regex(glob: str) -> str:
+    """Traduz um glob normalizado (semântica da magic ``glob`` do git) em regex.
+
+    Args:
+        glob: Glob retornado por normalize_glob
+
+    Returns:
+        Expressão regular equivalente, sem âncoras
+    """
+    parts: list[str] = []
+    i = 0
+    size = len(glob)
+
+    while i < size:
+        char = glob[i]
+        if glob.startswith("**/", i):
+            parts.append("(?:.*/)?")
+            i += 3
+        elif glob.startswith("**", i):
+            parts.append(".*")
+            i += 2
+        elif char == "*":
+            parts.append("[^/]*")
+            i += 1
+        elif char == "?":
+            parts.append("[^/]")
+            i += 1
+        elif char == "[" and "]" in glob[i + 1 :]:
+            end = glob.index("]", i + 1)
+            body = glob[i + 1 : end]
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            parts.append(f"[{body}]")
+            i = end + 1
+        else:
+            parts.append(re.escape(char))
+            i += 1
+
+    return "".join(parts)
+
+
+def read_ignore_file(path: Path) -> list[str]:
+    """Lê padrões de um arquivo no formato .airevignore.
+
+    Linhas vazias e comentários (#) são descartados. Negações (!) não são
+    suportadas e também são descartadas.
+
+    Args:
+        path: Caminho do arquivo
+
+    Returns:
+        Lista de padrões (vazia se o arquivo não existir)
+    """
+    try:
+        content = path.read_text(encoding="utf-8")
+    except (FileNotFoundError, PermissionError, UnicodeDecodeError):
+        return []
+
+    patterns = []
+    for line in content.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#") or line.startswith("!"):
+            continue
+        patterns.append(line)
+    return patterns
+
+
+class IgnoreRules:
+    """Conjunto de regras de exclusão de arquivos.
+
+    Mantém os globs normalizados e um único regex compilado para todos eles.
+    """
+
+    def __init__(
+        self,
+        patterns: Iterable[str] = DEFAULT_IGNORED_GLOBS,
+        excluded_paths: Iterable[str] = (),
+    ):
+        """Inicializa as regras.
+
+        Args:
+            patterns: Padrões estilo .gitignore
+            excluded_paths: Caminhos exatos (relativos à raiz) a excluir
+        """
+        # Remove duplicatas preservando a ordem
+        self.globs: tuple[str, ...] = tuple(
+            dict.fromkeys(normalize_glob(p) for p in patterns)
+        )
+        self.excluded_paths: frozenset[str] = frozenset(excluded_paths)
+        alternatives = "|".join(f"(?:{glob_to_regex(g)})" for g in self.globs)
+        self._matcher = re.compile(f"^(?:{alternatives})$") if self.globs else None
+
+    @classmethod
+    def load(cls, workdir: Optional[Path] = None) -> "IgnoreRules":
+        """Carrega as regras padrão mais o .airevignore do repositório.
+
+        Args:
+            workdir: Diretório raiz do repositório
+
+        Returns:
+            IgnoreRules com as regras combinadas
+        """
+        extra = read_ignore_file(Path(workdir or ".") / IGNORE_FILE_NAME)
+        return cls([*DEFAULT_IGNORED_GLOBS, *extra])
+
+    def excluding(self, paths: Iterable[str]) -> "IgnoreRules":
+        """Retorna novas regras que também excluem os caminhos exatos dados."""
+        return IgnoreRules(self.globs, self.excluded_paths | frozenset(paths))
+
+    def matches(self, path: str) -> bool:
+        """Verifica se um caminho (relativo à raiz) deve ser ignorado."""
+        if path in self.excluded_paths:
+            return True
+        return self._matcher is not None and self._matcher.match(path) is not None
+
+    def pathspecs(self) -> list[str]:
+        """Retorna as regras como pathspecs de exclusão para o git.
+
+        A magic ``top`` ancora os globs na raiz mesmo quando o git roda em
+        um subdiretório; com apenas exclusões o git considera a árvore toda.
+        """
+        specs = [f":(exclude,top,glob){glob}" for glob in self.globs]
+        specs.extend(f":(exclude,top,literal){path}" for path in sorted(self.excluded_paths))
+        return specs
+
+    def fingerprint(self) -> str:
+        """Hash estável do conjunto de regras (usado em chaves de cache)."""
+        parts = [*self.globs, "", *sorted(self.excluded_paths)]
+        return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+# Regras padrão, compiladas uma única vez
+DEFAULT_RULES = IgnoreRules()
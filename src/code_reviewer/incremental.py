@@ -0,0 +1,189 @@
+"""Modo incremental - revisa apenas commits desde o último HEAD revisado.
+
+O estado de cada branch fica em ``.git/airev/reviews/``: o SHA de HEAD
+revisado e os findings acumulados. Na execução seguinte o diff cobre só
+``ultimo_sha..HEAD`` e os findings novos substituem os antigos apenas nos
+arquivos que mudaram.
+"""
+
+import subprocess
+from pathlib import Path
+from typing import Optional
+from urllib.parse import quote
+
+from pydantic import ValidationError
+
+from .models import ReviewResult, ReviewState, ReviewSummary, Severity
+
+# Subdiretório (dentro do diretório .git) com o estado das revisões
+STATE_DIR_NAME = "airev/reviews"
+
+
+def get_state_dir(workdir: Optional[Path] = None) -> Path:
+    """Retorna o diretório de estado dentro do diretório git.
+
+    Usa ``git rev-parse --git-path`` para funcionar também em worktrees.
+
+    Args:
+        workdir: Diretório do repositório
+
+    Returns:
+        Caminho absoluto do diretório de estado
+    """
+    result = subprocess.run(
+        ["git", "rev-parse", "--git-path", STATE_DIR_NAME],
+        capture_output=True,
+        text=True,
+        cwd=workdir,
+        check=True,
+    )
+    return (Path(workdir or ".") / result.stdout.strip()).resolve()
+
+
+def _state_file(workdir: Optional[Path], branch: str) -> Path:
+    """Arquivo de estado de uma branch (nome escapado para caber em um arquivo)."""
+    return get_state_dir(workdir) / f"{quote(branch, safe='')}.json"
+
+
+def load_review_state(workdir: Optional[Path], branch: str) -> Optional[ReviewState]:
+    """Carrega o estado da última revisão de uma branch.
+
+    Args:
+        workdir: Diretório do repositório
+        branch: Nome da branch
+
+    Returns:
+        ReviewState ou None se não houver estado válido
+    """
+    try:
+        content = _state_file(workdir, branch).read_text(encoding="utf-8")
+        return ReviewState.model_validate_json(content)
+    except (OSError, subprocess.CalledProcessError, ValidationError):
+        return None
+
+
+def save_review_state(workdir: Optional[Path], state: ReviewState) -> None:
+    """Grava o estado da revisão de uma branch.
+
+    Falhas de escrita são ignoradas silenciosamente.
+
+    Args:
+        workdir: Diretório do repositório
+        state: Estado a gravar
+    """
+    try:
+        path = _state_file(workdir, state.branch)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(state.model_dump_json(indent=2), encoding="utf-8")
+    except (OSError, subprocess.CalledProcessError):
+        pass
+
+
+def is_ancestor(commit: str, workdir: Optional[Path] = None) -> bool:
+    """Verifica se um commit é ancestral de HEAD.
+
+    Falha após force-push/rebase, quando o SHA revisado não está mais no histórico.
+
+    Args:
+        commit: SHA do commit
+        workdir: Diretório do repositório
+
+    Returns:
+        True se o commit é ancestral de (ou igual a) HEAD
+    """
+    result = subprocess.run(
+        ["git", "merge-base", "--is-ancestor", commit, "HEAD"],
+        capture_output=True,
+        cwd=workdir,
+    )
+    return result.returncode == 0
+
+
+def merge_review(
+    previous: Optional[ReviewState],
+    result: ReviewResult,
+    changed_files: set[str],
+) -> ReviewResult:
+    """Combina o resultado novo com os findings guardados.
+
+    Findings e boas práticas anteriores são mantidos apenas para arquivos
+    que não mudaram desde a última revisão.
+
+    Args:
+        previous: Estado anterior (None em uma revisão completa)
+        result: Resultado da análise do diff incremental
+        changed_files: Arquivos presentes no diff incremental
+
+    Returns:
+        ReviewResult com os findings combinados e sumário recalculado
+    """
+    if previous is None:
+        return result
+
+    findings = [f for f in previous.findings if f.file not in changed_files]
+    findings.extend(result.findings)
+
+    good_practices = [g for g in previous.good_practices if g.file not in changed_files]
+    good_practices.extend(result.good_practices)
+
+    critical = sum(1 for f in findings if f.severity == Severity.CRITICAL)
+    warning = sum(1 for f in findings if f.severity == Severity.WARNING)
+    info = sum(1 for f in findings if f.severity == Severity.INFO)
+
+    return result.model_copy(
+        update={
+            "files_analyzed": len(set(previous.files) | changed_files),
+            "findings": findings,
+            "good_practices": good_practices,
+            "summary": ReviewSummary(
+                total=len(findings),
+                critical=critical,
+                warning=warning,
+                info=info,
+            ),
+        }
+    )
+
+
+def build_review_state(
+    branch: str,
+    base: str,
+    head: str,
+    previous: Optional[ReviewState],
+    merged: ReviewResult,
+    changed_files: set[str],
+) -> ReviewState:
+    """Monta o estado a gravar após uma revisão.
+
+    Args:
+        branch: Branch revisada
+        base: Branch base
+        head: SHA de HEAD revisado
+        previous: Estado anterior (None em uma revisão completa)
+        merged: Resultado já combinado por merge_review (sem filtro de confidence)
+        changed_files: Arquivos analisados nesta execução
+
+    Returns:
+        Novo ReviewState
+    """
+    files = set(previous.files) if previous else set()
+    files |= changed_files
+    return ReviewState(
+        branch=branch,
+        base=base,
+        head=head,
+        files=sorted(files),
+        findings=merged.findings,
+        good_practices=merged.good_practices,
+    )
+
+
+def state_to_result(state: ReviewState) -> ReviewResult:
+    """Reconstrói o resultado a partir do estado (HEAD já revisado)."""
+    empty = ReviewResult(
+        branch=state.branch,
+        base=state.base,
+        files_analyzed=0,
+        summary=ReviewSummary(total=0),
+    )
+    return merge_review(state, empty, changed_files=set())
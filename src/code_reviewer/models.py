@@ -60,6 +60,14 @@ class DiffFile(BaseModel):
     hunks: list[DiffHunk] = Field(default_factory=list, description="Hunks do arquivo")
     is_new: bool = Field(default=False, description="True se arquivo foi criado")
     is_deleted: bool = Field(default=False, description="True se arquivo foi removido")
+    old_path: Optional[str] = Field(
+        default=None, description="Caminho anterior (renomeação ou origem da cópia)"
+    )
+    is_renamed: bool = Field(default=False, description="True se arquivo foi renomeado")
+    is_copied: bool = Field(default=False, description="True se arquivo é cópia de outro")
+    similarity: Optional[int] = Field(
+        default=None, description="Similaridade (%) com old_path detectada pelo git"
+    )
 
 
 class FunctionRef(BaseModel):
@@ -71,6 +79,10 @@ class FunctionRef(BaseModel):
     function_name: Optional[str] = Field(
         default=None, description="Nome da função, se identificado"
     )
+    depth: int = Field(default=1, description="Distância (em chamadas) da função modificada")
+    context: Optional[str] = Field(
+        default=None, description="Código ao redor da referência"
+    )
 
 
 class ContextGraph(BaseModel):
@@ -87,6 +99,21 @@ class ContextGraph(BaseModel):
     file_content: Optional[str] = Field(
         default=None, description="Conteúdo completo do arquivo"
     )
+    excerpt: Optional[str] = Field(
+        default=None, description="Código da definição que contém a alteração"
+    )
+    excerpt_start: Optional[int] = Field(
+        default=None, description="Linha inicial do trecho no arquivo"
+    )
+    excerpt_end: Optional[int] = Field(
+        default=None, description="Linha final do trecho no arquivo"
+    )
+    sibling_signatures: list[str] = Field(
+        default_factory=list, description="Assinaturas das outras definições do mesmo escopo"
+    )
+    references_truncated: bool = Field(
+        default=False, description="Busca de referências interrompida pelo tempo limite"
+    )
 
 
 class GoodPractice(BaseModel):
@@ -143,3 +170,20 @@ class ReviewResult(BaseModel):
     raw_response: Optional[str] = Field(
         default=None, description="Resposta raw da IA se parsing falhou"
     )
+
+
+class ReviewState(BaseModel):
+    """Estado da última revisão de uma branch (modo incremental)."""
+
+    branch: str = Field(description="Branch revisada")
+    base: str = Field(description="Branch base usada na revisão")
+    head: str = Field(description="SHA de HEAD no momento da revisão")
+    files: list[str] = Field(
+        default_factory=list, description="Arquivos analisados em todas as revisões"
+    )
+    findings: list[Finding] = Field(
+        default_factory=list, description="Findings acumulados (sem filtro de confidence)"
+    )
+    good_practices: list[GoodPractice] = Field(
+        default_factory=list, description="Boas práticas acumuladas"
+    )
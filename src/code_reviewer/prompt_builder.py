@@ -1,8 +1,11 @@
 """Prompt Builder - Monta o prompt para a IA."""
 
 import json
+from collections.abc import Sequence
 from pathlib import Path
-from .models import ContextGraph, DiffFile
+from typing import Optional
+from .compact_diff import DiffFileLike, as_compact
+from .models import ContextGraph, FunctionRef
 from .i18n import get_language
 
 # Mapeamento de código de idioma para nome legível
@@ -56,11 +59,12 @@ def get_prompt_template() -> str:
     return template_path.read_text(encoding="utf-8")
 
 
-def format_diff_for_prompt(diff_files: list[DiffFile]) -> str:
+def format_diff_for_prompt(diff_files: Sequence[DiffFileLike]) -> str:
     """Formata os arquivos do diff para inclusão no prompt.
 
     Inclui linhas de contexto (sem prefixo +/-) para dar visibilidade
-    da estrutura do código ao redor das mudanças.
+    da estrutura do código ao redor das mudanças. Arquivos renomeados ou
+    copiados trazem apenas as edições reais; sem edições, ocupam uma linha.
 
     Args:
         diff_files: Lista de arquivos parseados do diff
@@ -71,50 +75,81 @@ def format_diff_for_prompt(diff_files: list[DiffFile]) -> str:
     parts = []
 
     for diff_file in diff_files:
+        # Renomeação/cópia sem edições: uma única linha, sem conteúdo
+        if diff_file.old_path and not diff_file.hunks:
+            action = "renomeado" if diff_file.is_renamed else "copiado"
+            parts.append(
+                f"### {diff_file.path} ({action} de {diff_file.old_path}, sem alterações)"
+            )
+            parts.append("")
+            continue
+
         parts.append(f"### {diff_file.path}")
 
-        if diff_file.is_new:
+        if diff_file.old_path:
+            action = "renomeado" if diff_file.is_renamed else "copiado"
+            similarity = f", {diff_file.similarity}% similar" if diff_file.similarity else ""
+            parts.append(f"({action} de {diff_file.old_path}{similarity})")
+        elif diff_file.is_new:
             parts.append("(arquivo novo)")
         elif diff_file.is_deleted:
             parts.append("(arquivo removido)")
 
-        for hunk in diff_file.hunks:
+        # A representação compacta preserva a ordem original do diff;
+        # modelos Pydantic são intercalados por número de linha na conversão
+        for hunk in as_compact(diff_file).hunks:
             if hunk.function_name:
                 parts.append(f"\n#### Função: {hunk.function_name}")
 
             parts.append(f"Linhas {hunk.start_line_new}+:")
 
-            # Combina todas as linhas e ordena por número de linha para
-            # manter a ordem original do diff
-            all_lines: list[tuple[int, str, str]] = []
+            # Formata cada linha com seu prefixo (+, - ou espaço)
+            for prefix, _, content in hunk.iter_lines():
+                parts.append(f"{prefix}{content}")
 
-            # Linhas removidas (prefixo -)
-            for line in hunk.removed_lines:
-                all_lines.append((line.line_number, "-", line.content))
+        parts.append("")
 
-            # Linhas adicionadas (prefixo +)
-            for line in hunk.added_lines:
-                all_lines.append((line.line_number, "+", line.content))
+    return "\n".join(parts)
 
-            # Linhas de contexto (prefixo espaço - padrão git diff)
-            for line in hunk.context_lines:
-                all_lines.append((line.line_number, " ", line.content))
 
-            # Ordena por número de linha
-            all_lines.sort(key=lambda x: x[0])
+def _format_file_excerpts(file_path: str, graphs: list[ContextGraph]) -> list[str]:
+    """Formata os trechos das funções modificadas de um arquivo e suas vizinhas."""
+    parts = [f"### {file_path}"]
+    shown: set[Optional[int]] = set()
+    headers: set[str] = set()
+    signatures: dict[str, None] = {}
 
-            # Formata cada linha com seu prefixo
-            for _, prefix, content in all_lines:
-                parts.append(f"{prefix}{content}")
+    for graph in graphs:
+        if graph.excerpt is None or graph.excerpt_start in shown:
+            continue
+        shown.add(graph.excerpt_start)
+        headers.add(graph.excerpt.split("\n", 1)[0].strip())
+        signatures.update(dict.fromkeys(graph.sibling_signatures))
 
-        parts.append("")
+        parts.append(f"Linhas {graph.excerpt_start}-{graph.excerpt_end}:")
+        parts.append("```")
+        parts.append(graph.excerpt)
+        parts.append("```")
 
-    return "\n".join(parts)
+    # Assinaturas das definições vizinhas que não aparecem nos trechos
+    siblings = [signature for signature in signatures if signature not in headers]
+    if siblings:
+        parts.append("Outras definições no mesmo escopo:")
+        parts.append("```")
+        parts.extend(siblings)
+        parts.append("```")
+
+    parts.append("")
+    return parts
 
 
 def format_context_for_prompt(context_graphs: list[ContextGraph]) -> str:
     """Formata o contexto dos arquivos para inclusão no prompt.
 
+    Cada arquivo contribui com o código das definições que contêm as
+    alterações e as assinaturas das definições vizinhas. Grafos sem trecho
+    (montados apenas com o conteúdo completo) mostram o início do arquivo.
+
     Args:
         context_graphs: Lista de grafos de contexto
 
@@ -122,13 +157,16 @@ def format_context_for_prompt(context_graphs: list[ContextGraph]) -> str:
         String formatada com o contexto
     """
     parts = []
-    seen_files: set[str] = set()
-
+    graphs_by_file: dict[str, list[ContextGraph]] = {}
     for graph in context_graphs:
-        if graph.file in seen_files:
+        graphs_by_file.setdefault(graph.file, []).append(graph)
+
+    for file_path, graphs in graphs_by_file.items():
+        if any(graph.excerpt is not None for graph in graphs):
+            parts.extend(_format_file_excerpts(file_path, graphs))
             continue
-        seen_files.add(graph.file)
 
+        graph = graphs[0]
         if graph.file_content:
             parts.append(f"### {graph.file}")
             parts.append("```")
@@ -145,6 +183,18 @@ def format_context_for_prompt(context_graphs: list[ContextGraph]) -> str:
     return "\n".join(parts)
 
 
+def _depth_note(ref: FunctionRef) -> str:
+    """Indica referências indiretas (a mais de uma chamada da função modificada)."""
+    return f" (indireta, {ref.depth} níveis)" if ref.depth > 1 else ""
+
+
+def _reference_context(ref: FunctionRef) -> list[str]:
+    """Código ao redor de uma referência, quando incluído no contexto."""
+    if not ref.context:
+        return []
+    return ["  ```", *(f"  {line}" for line in ref.context.split("\n")), "  ```"]
+
+
 def format_references_for_prompt(context_graphs: list[ContextGraph]) -> str:
     """Formata as referências (backtracking) para inclusão no prompt.
 
@@ -163,17 +213,25 @@ def format_references_for_prompt(context_graphs: list[ContextGraph]) -> str:
         if graph.callers:
             parts.append("**Chamada por:**")
             for caller in graph.callers:
-                parts.append(f"- {caller.file}:{caller.line} → `{caller.snippet}`")
+                parts.append(
+                    f"- {caller.file}:{caller.line} → `{caller.snippet}`{_depth_note(caller)}"
+                )
+                parts.extend(_reference_context(caller))
             parts.append("")
 
         if graph.callees:
             parts.append("**Usa:**")
             for callee in graph.callees:
                 name = callee.function_name or "?"
-                parts.append(f"- `{name}` → {callee.file}:{callee.line}")
+                parts.append(f"- `{name}` → {callee.file}:{callee.line}{_depth_note(callee)}")
+                parts.extend(_reference_context(callee))
             parts.append("")
 
-        if not graph.callers and not graph.callees:
+        if graph.references_truncated:
+            # Sem o aviso, uma busca interrompida seria lida como "não há referências"
+            parts.append("(busca de referências interrompida pelo tempo limite; lista incompleta)")
+            parts.append("")
+        elif not graph.callers and not graph.callees:
             parts.append("(sem referências encontradas)")
             parts.append("")
 
@@ -249,7 +307,7 @@ no idioma **{language_name}**.
 
 
 def build_prompt(
-    diff_files: list[DiffFile],
+    diff_files: Sequence[DiffFileLike],
     context_graphs: list[ContextGraph],
     branch: str,
     base: str,
@@ -0,0 +1,163 @@
+"""Extração de definições e chamadas de arquivos Python via ``ast``.
+
+A busca textual por ``nome(`` encontra também strings, comentários dentro de
+expressões e métodos homônimos sem relação. Aqui as chamadas vêm da árvore
+sintática, com aliases de import resolvidos (``from m import f as g`` e
+``import m as n``; ``g()`` e ``n.f()`` contam como chamadas a ``f``).
+Chamadas em atributos só viram arestas quando o receptor é conhecido: um
+módulo importado (``m.f()``) ou ``self``/``cls`` chamando um método da própria
+classe. ``obj.get()``, ``dict.get()`` e afins ficam de fora, para não ligar o
+arquivo a qualquer função homônima.
+
+O resultado é guardado em cache pelo SHA do blob do conteúdo, então o mesmo
+arquivo não é reanalisado na mesma execução nem entre consultas repetidas.
+"""
+
+import ast
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import NamedTuple, Optional, Union
+
+# Número de arquivos analisados mantidos em cache
+CACHE_SIZE = 1024
+
+_cache: "OrderedDict[str, Optional[PythonSymbols]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+class PythonSymbols(NamedTuple):
+    """Definições e chamadas de um arquivo Python, como pares (símbolo, linha).
+
+    ``ranges`` traz cada definição com sua linha final: (símbolo, início, fim).
+    """
+
+    definitions: list[tuple[str, int]]
+    calls: list[tuple[str, int]]
+    ranges: list[tuple[str, int, int]]
+
+
+def blob_sha(data: bytes) -> str:
+    """Calcula o SHA do blob como o git (``git hash-object``)."""
+    header = f"blob {len(data)}\0".encode()
+    return hashlib.sha1(header + data).hexdigest()
+
+
+class _SymbolVisitor(ast.NodeVisitor):
+    """Coleta definições e chamadas com receptor resolvido.
+
+    Os imports são lidos antes da visita (ver collect_imports), então um
+    import dentro de função ou depois do uso também resolve a chamada.
+    """
+
+    def __init__(self) -> None:
+        self.definitions: list[tuple[str, int, int]] = []
+        self.calls: dict[tuple[str, int], None] = {}
+        # Nome local -> nome original (from m import f as g)
+        self.name_aliases: dict[str, str] = {}
+        # Nomes locais ligados por import (import m, import m as n, from p import m)
+        self.imported: set[str] = set()
+        # Métodos de cada classe envolvente, da mais externa para a mais interna
+        self.class_methods: list[set[str]] = []
+
+    def collect_imports(self, tree: ast.AST) -> None:
+        """Monta a tabela de nomes importados do arquivo."""
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    # import a.b liga apenas "a"; import a.b as c liga "c"
+                    self.imported.add(alias.asname or alias.name.split(".")[0])
+            elif isinstance(node, ast.ImportFrom):
+                for alias in node.names:
+                    if alias.name == "*":
+                        continue
+                    local = alias.asname or alias.name
+                    self.imported.add(local)
+                    if alias.asname:
+                        self.name_aliases[alias.asname] = alias.name
+
+    def _visit_definition(self, node: Union[ast.FunctionDef, ast.AsyncFunctionDef]) -> None:
+        self.definitions.append((node.name, node.lineno, node.end_lineno or node.lineno))
+        self.generic_visit(node)
+
+    visit_FunctionDef = _visit_definition
+    visit_AsyncFunctionDef = _visit_definition
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+        self.definitions.append((node.name, node.lineno, node.end_lineno or node.lineno))
+        self.class_methods.append(
+            {
+                item.name
+                for item in node.body
+                if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef))
+            }
+        )
+        self.generic_visit(node)
+        self.class_methods.pop()
+
+    def _resolves(self, receiver: ast.expr, attr: str) -> bool:
+        """Verifica se ``receiver.attr()`` tem um receptor conhecido."""
+        if isinstance(receiver, ast.Name) and receiver.id in ("self", "cls"):
+            return bool(self.class_methods) and attr in self.class_methods[-1]
+        # import a.b -> a.b.f(): o receptor é resolvido pela raiz do nome
+        while isinstance(receiver, ast.Attribute):
+            receiver = receiver.value
+        return isinstance(receiver, ast.Name) and receiver.id in self.imported
+
+    def visit_Call(self, node: ast.Call) -> None:
+        func = node.func
+        if isinstance(func, ast.Name):
+            self.calls[(func.id, func.lineno)] = None
+        elif isinstance(func, ast.Attribute) and self._resolves(func.value, func.attr):
+            # Vale o atributo, na linha onde ele aparece (chamadas encadeadas
+            # em várias linhas)
+            self.calls[(func.attr, func.end_lineno or func.lineno)] = None
+        self.generic_visit(node)
+
+    def resolved_calls(self) -> list[tuple[str, int]]:
+        """Chamadas com aliases de import trocados pelo nome original."""
+        return [
+            (self.name_aliases.get(symbol, symbol), line) for symbol, line in self.calls
+        ]
+
+
+def _analyze(content: str) -> Optional[PythonSymbols]:
+    try:
+        tree = ast.parse(content)
+    except (SyntaxError, ValueError):
+        return None
+
+    visitor = _SymbolVisitor()
+    visitor.collect_imports(tree)
+    visitor.visit(tree)
+    calls = sorted(dict.fromkeys(visitor.resolved_calls()), key=lambda call: call[1])
+    ranges = sorted(visitor.definitions, key=lambda d: d[1])
+    definitions = [(name, start) for name, start, _ in ranges]
+    return PythonSymbols(definitions, calls, ranges)
+
+
+def analyze_python(content: str) -> Optional[PythonSymbols]:
+    """Extrai definições e chamadas de um arquivo Python.
+
+    Args:
+        content: Código-fonte do arquivo
+
+    Returns:
+        PythonSymbols ordenado por linha, ou None se o código não for
+        Python válido (o chamador deve usar a extração textual)
+    """
+    key = blob_sha(content.encode("utf-8", "surrogateescape"))
+
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    symbols = _analyze(content)
+
+    with _cache_lock:
+        _cache[key] = symbols
+        if len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+
+    return symbols
@@ -0,0 +1,278 @@
+"""Escopo das buscas de contexto em monorepos.
+
+Em repositórios com vários pacotes, procurar callers na árvore inteira
+varre serviços sem relação com a alteração. Os limites de pacote vêm dos
+manifestos (``pyproject.toml``, ``package.json``, ``go.mod``) e de raízes
+configuradas explicitamente; cada arquivo pertence ao pacote mais interno
+que o contém.
+
+Callers de uma função são procurados primeiro no pacote dela e nos pacotes
+que declaram dependência dele; definições chamadas, no pacote e nas suas
+dependências. A busca no repositório inteiro fica para os símbolos que o
+escopo não resolveu.
+"""
+
+import json
+import re
+from collections.abc import Iterable
+from pathlib import Path, PurePosixPath
+from typing import NamedTuple, Optional
+
+try:
+    import tomllib
+except ModuleNotFoundError:  # Python 3.10: apenas o nome do pacote é lido
+    tomllib = None  # type: ignore[assignment]
+
+
+# Nome de pacote no início de uma especificação de dependência Python
+REQUIREMENT_NAME = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)")
+TOML_NAME = re.compile(r"""^\s*name\s*=\s*["']([^"']+)["']""", re.MULTILINE)
+GO_MODULE = re.compile(r"^module\s+(\S+)", re.MULTILINE)
+GO_REQUIRE = re.compile(r"^\s*(?:require\s+)?([\w.\-~/]+\.[\w.\-~/]+)\s+v\S+", re.MULTILINE)
+JS_DEPENDENCY_KEYS = (
+    "dependencies",
+    "devDependencies",
+    "peerDependencies",
+    "optionalDependencies",
+)
+
+
+class Package(NamedTuple):
+    """Pacote do monorepo: raiz (relativa, "" na raiz do repositório), nome e dependências."""
+
+    root: str
+    name: Optional[str]
+    dependencies: frozenset[str]
+
+
+def _python_name(name: str) -> str:
+    """Normaliza um nome de distribuição Python (PEP 503)."""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def _parse_pyproject(text: str) -> tuple[Optional[str], set[str]]:
+    if tomllib is None:
+        match = TOML_NAME.search(text)
+        return (_python_name(match.group(1)) if match else None), set()
+
+    try:
+        data = tomllib.loads(text)
+    except tomllib.TOMLDecodeError:
+        return None, set()
+
+    project = data.get("project", {})
+    poetry = data.get("tool", {}).get("poetry", {})
+    name = project.get("name") or poetry.get("name")
+    requirements = list(project.get("dependencies", []))
+    for extra in project.get("optional-dependencies", {}).values():
+        requirements.extend(extra)
+    requirements.extend(poetry.get("dependencies", {}).keys())
+
+    dependencies = set()
+    for requirement in requirements:
+        match = REQUIREMENT_NAME.match(str(requirement))
+        if match:
+            dependencies.add(_python_name(match.group(1)))
+    return (_python_name(name) if isinstance(name, str) else None), dependencies
+
+
+def _parse_package_json(text: str) -> tuple[Optional[str], set[str]]:
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        return None, set()
+    if not isinstance(data, dict):
+        return None, set()
+
+    dependencies = set()
+    for key in JS_DEPENDENCY_KEYS:
+        section = data.get(key)
+        if isinstance(section, dict):
+            dependencies.update(section)
+    name = data.get("name")
+    return (name if isinstance(name, str) else None), dependencies
+
+
+def _parse_go_mod(text: str) -> tuple[Optional[str], set[str]]:
+    match = GO_MODULE.search(text)
+    return (match.group(1) if match else None), set(GO_REQUIRE.findall(text))
+
+
+# Manifesto -> parser de (nome, dependências declaradas)
+_PARSERS = {
+    "pyproject.toml": _parse_pyproject,
+    "package.json": _parse_package_json,
+    "go.mod": _parse_go_mod,
+}
+
+# Manifestos que delimitam um pacote
+PACKAGE_MARKERS = tuple(_PARSERS)
+
+
+def read_package(workdir: Path, manifest: str) -> Package:
+    """Lê nome e dependências declaradas de um manifesto.
+
+    Args:
+        workdir: Diretório raiz do projeto
+        manifest: Caminho relativo do manifesto
+
+    Returns:
+        Package com raiz no diretório do manifesto (sem nome se ilegível)
+    """
+    path = PurePosixPath(manifest)
+    root = "" if str(path.parent) == "." else str(path.parent)
+    try:
+        text = (workdir / manifest).read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError):
+        return Package(root, None, frozenset())
+    name, dependencies = _PARSERS[path.name](text)
+    return Package(root, name, frozenset(dependencies))
+
+
+class SearchScopes:
+    """Pacotes de um repositório e o escopo de busca de cada arquivo."""
+
+    def __init__(self, packages: Iterable[Package], files: list[str]):
+        """Associa cada arquivo ao pacote mais interno que o contém.
+
+        Args:
+            packages: Pacotes do repositório (uma raiz pode aparecer uma vez)
+            files: Arquivos pesquisáveis (ver list_source_files)
+        """
+        self.packages: dict[str, Package] = {}
+        for package in packages:
+            known = self.packages.get(package.root)
+            # Raiz com vários manifestos (ex: pyproject.toml e package.json)
+            if known is not None:
+                package = Package(
+                    package.root,
+                    known.name or package.name,
+                    known.dependencies | package.dependencies,
+                )
+            self.packages[package.root] = package
+
+        self.files = files
+        self._owners = {path: self.package_of(path) for path in files}
+        self._scopes: set[Optional[str]] = set(self._owners.values())
+
+        self._by_name: dict[str, list[str]] = {}
+        for package in self.packages.values():
+            if package.name:
+                self._by_name.setdefault(package.name, []).append(package.root)
+
+    @property
+    def is_monorepo(self) -> bool:
+        """Há mais de um escopo de busca (pacotes, ou pacote e arquivos soltos)."""
+        return len(self._scopes) > 1
+
+    def package_of(self, path: str) -> Optional[str]:
+        """Raiz do pacote mais interno que contém o arquivo (None: fora de pacotes)."""
+        end = path.rfind("/")
+        while end != -1:
+            root = path[:end]
+            if root in self.packages:
+                return root
+            end = path.rfind("/", 0, end)
+        return "" if "" in self.packages else None
+
+    def dependents(self, root: str) -> list[str]:
+        """Pacotes que declaram dependência do pacote dado."""
+        name = self.packages[root].name
+        if not name:
+            return []
+        return [
+            other.root
+            for other in self.packages.values()
+            if other.root != root and name in other.dependencies
+        ]
+
+    def dependencies(self, root: str) -> list[str]:
+        """Pacotes do repositório dos quais o pacote dado depende."""
+        return [
+            dependency_root
+            for name in self.packages[root].dependencies
+            for dependency_root in self._by_name.get(name, [])
+            if dependency_root != root
+        ]
+
+    def caller_scope(self, path: str) -> frozenset[Optional[str]]:
+        """Escopo para callers de código em ``path``: o pacote e seus dependentes."""
+        root = self.package_of(path)
+        if root is None:
+            return frozenset([None])
+        return frozenset([root, *self.dependents(root)])
+
+    def definition_scope(self, path: str) -> frozenset[Optional[str]]:
+        """Escopo para definições usadas em ``path``: o pacote e suas dependências."""
+        root = self.package_of(path)
+        if root is None:
+            return frozenset([None])
+        return frozenset([root, *self.dependencies(root)])
+
+    def files_in(self, scope: Iterable[Optional[str]]) -> list[str]:
+        """Arquivos dos pacotes do escopo, na ordem de ``files``."""
+        selected = set(scope)
+        if self.covers_all(selected):
+            return self.files
+        return [path for path in self.files if self._owners[path] in selected]
+
+    def covers_all(self, scope: Iterable[Optional[str]]) -> bool:
+        """Verifica se o escopo inclui todos os arquivos do repositório."""
+        return set(scope) >= self._scopes
+
+
+def resolve_search_root(search_root: str, workdir: Optional[Path] = None) -> str:
+    """Converte uma raiz configurada em caminho relativo à raiz do repositório.
+
+    Caminhos relativos partem da raiz do repositório; absolutos precisam
+    estar dentro dela.
+
+    Args:
+        search_root: Diretório como passado em ``--search-root``
+        workdir: Diretório raiz do projeto
+
+    Returns:
+        Caminho POSIX relativo ("" para a própria raiz)
+
+    Raises:
+        ValueError: Se o diretório estiver fora do repositório
+    """
+    root = Path(workdir or ".").resolve()
+    path = (root / search_root).resolve()
+    try:
+        relative = path.relative_to(root).as_posix()
+    except ValueError:
+        raise ValueError(f"{search_root} está fora do repositório ({root})") from None
+    return "" if relative == "." else relative
+
+
+def load_search_scopes(
+    files: list[str],
+    workdir: Optional[Path] = None,
+    search_roots: Iterable[str] = (),
+    repository_files: Optional[list[str]] = None,
+) -> SearchScopes:
+    """Detecta os pacotes do repositório a partir dos manifestos rastreados.
+
+    Args:
+        files: Arquivos pesquisáveis (ver list_source_files)
+        workdir: Diretório raiz do projeto
+        search_roots: Diretórios adicionais tratados como limites de pacote
+            (ver resolve_search_root)
+        repository_files: Arquivos onde procurar os manifestos (padrão: ``files``)
+
+    Returns:
+        SearchScopes do repositório
+
+    Raises:
+        ValueError: Se uma raiz configurada estiver fora do repositório
+    """
+    root = Path(workdir or ".")
+    packages = [
+        read_package(root, path)
+        for path in (files if repository_files is None else repository_files)
+        if path.rsplit("/", 1)[-1] in PACKAGE_MARKERS
+    ]
+    for search_root in search_roots:
+        packages.append(Package(resolve_search_root(search_root, root), None, frozenset()))
+    return SearchScopes(packages, files)
@@ -0,0 +1,133 @@
+"""Conjunto de arquivos pesquisáveis do repositório.
+
+As buscas de contexto partem da lista de arquivos do git (``git ls-files``),
+que já respeita o ``.gitignore``: saídas de build, caches e diretórios de
+dados não rastreados ficam de fora sem depender de uma lista manual. Sobre
+ela ainda são descartados binários, arquivos grandes e os diretórios de
+EXCLUDED_DIRS (código vendorizado costuma estar versionado).
+"""
+
+import os
+import subprocess
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Optional
+
+# Diretórios excluídos do backtracking
+EXCLUDED_DIRS = [
+    "node_modules",
+    "venv",
+    ".venv",
+    "env",
+    ".env",
+    ".git",
+    "__pycache__",
+    ".pytest_cache",
+    ".mypy_cache",
+    "dist",
+    "build",
+    ".tox",
+    ".eggs",
+    "*.egg-info",
+    "vendor",
+    "third_party",
+]
+
+# Arquivos maiores que isso (geralmente gerados) não são pesquisados
+MAX_FILE_BYTES = 1024 * 1024
+# Bytes iniciais inspecionados para detectar binários
+BINARY_SNIFF_BYTES = 8192
+
+
+def is_excluded_path(path: str) -> bool:
+    """Verifica se algum diretório do caminho está em EXCLUDED_DIRS.
+
+    Args:
+        path: Caminho relativo com separador ``/``
+
+    Returns:
+        True se o arquivo estiver dentro de um diretório excluído
+    """
+    return any(
+        fnmatch(part, pattern) for part in path.split("/")[:-1] for pattern in EXCLUDED_DIRS
+    )
+
+
+def is_binary(data: bytes) -> bool:
+    """Detecta conteúdo binário pela presença de NUL no início (como o git)."""
+    return b"\0" in data[:BINARY_SNIFF_BYTES]
+
+
+def _within_size(path: Path) -> bool:
+    try:
+        return path.stat().st_size <= MAX_FILE_BYTES
+    except OSError:
+        # Removido do working tree (ou ilegível)
+        return False
+
+
+def _git_files(root: Path) -> list[str]:
+    """Arquivos rastreados e não ignorados que o git considera texto."""
+    result = subprocess.run(
+        ["git", "ls-files", "-z", "--eol", "--cached", "--others", "--exclude-standard"],
+        capture_output=True,
+        text=True,
+        errors="surrogateescape",
+        cwd=root,
+        check=True,
+    )
+
+    files: dict[str, None] = {}
+    for entry in result.stdout.split("\0"):
+        if not entry:
+            continue
+        # Formato: i/<eol> w/<eol> attr/<atributos>\t<caminho>
+        info, path = entry.split("\t", 1)
+        # w/-text: binário no working tree; w/ vazio: arquivo ausente
+        worktree = info.split()[1]
+        if worktree not in ("w/", "w/-text"):
+            files[path] = None
+    return list(files)
+
+
+def _walk_files(root: Path) -> list[str]:
+    """Fallback fora de repositórios git: percorre a árvore detectando binários."""
+    files: list[str] = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(
+            d for d in dirnames if not any(fnmatch(d, pattern) for pattern in EXCLUDED_DIRS)
+        )
+        for filename in sorted(filenames):
+            full_path = Path(dirpath) / filename
+            try:
+                with open(full_path, "rb") as file:
+                    head = file.read(BINARY_SNIFF_BYTES)
+            except OSError:
+                continue
+            if not is_binary(head):
+                files.append(full_path.relative_to(root).as_posix())
+    return files
+
+
+def list_source_files(workdir: Optional[Path] = None) -> list[str]:
+    """Lista os arquivos de texto pesquisáveis do projeto.
+
+    Deve ser chamada uma vez por execução; o resultado é reutilizado por
+    todas as buscas de símbolos.
+
+    Args:
+        workdir: Diretório raiz do projeto
+
+    Returns:
+        Caminhos relativos (com ``/``) em ordem determinística
+    """
+    root = Path(workdir or ".")
+
+    try:
+        paths = _git_files(root)
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        paths = _walk_files(root)
+
+    return [
+        path for path in paths if not is_excluded_path(path) and _within_size(root / path)
+    ]
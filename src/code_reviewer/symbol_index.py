@@ -0,0 +1,366 @@
+"""Índice persistente de símbolos do repositório.
+
+Substitui os ``grep -r`` por símbolo do context_builder: uma única varredura
+registra as definições e as chamadas (``nome(``) de todos os arquivos, com o
+extrator da linguagem de cada um (ver extractors), e as consultas passam a
+ser buscas indexadas em um banco SQLite guardado em ``.git/airev/index/``.
+
+Cada arquivo é registrado com o SHA do seu blob (``git ls-files -s``). A
+cada execução apenas os arquivos cujo blob mudou são varridos de novo, além
+dos arquivos não rastreados e das edições ainda não adicionadas ao índice do
+git (identificados por mtime e tamanho). Trocas de branch e rebases ficam
+consistentes sem reconstrução: só os blobs diferentes são reprocessados.
+"""
+
+import os
+import sqlite3
+import subprocess
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional
+
+from .extractors import FileSymbols, extract_file
+from .models import FunctionRef
+from .source_files import MAX_FILE_BYTES, is_binary, is_excluded_path
+
+# Subdiretório (dentro do diretório .git) com o índice
+INDEX_DIR_NAME = "airev/index"
+INDEX_FILE_NAME = "symbols.db"
+
+# Versão do esquema/extração: incrementar ao mudar o que é indexado
+INDEX_VERSION = 4
+
+# Tamanho máximo do trecho guardado por referência
+MAX_SNIPPET_CHARS = 300
+# Linhas inseridas por lote durante a construção
+INSERT_BATCH = 10_000
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE files (path TEXT PRIMARY KEY, blob TEXT NOT NULL);
+CREATE TABLE definitions (symbol TEXT NOT NULL, path TEXT NOT NULL,
+                          line INTEGER NOT NULL, snippet TEXT NOT NULL);
+CREATE TABLE calls (symbol TEXT NOT NULL, path TEXT NOT NULL,
+                    line INTEGER NOT NULL, snippet TEXT NOT NULL);
+CREATE INDEX definitions_symbol ON definitions (symbol, path, line);
+CREATE INDEX calls_symbol ON calls (symbol, path, line);
+CREATE INDEX definitions_path ON definitions (path);
+CREATE INDEX calls_path ON calls (path);
+"""
+
+
+def get_index_path(workdir: Optional[Path] = None) -> Path:
+    """Retorna o caminho do banco do índice dentro do diretório git.
+
+    Usa ``git rev-parse --git-path`` para funcionar também em worktrees.
+
+    Args:
+        workdir: Diretório do repositório
+
+    Returns:
+        Caminho absoluto do arquivo do índice
+    """
+    result = subprocess.run(
+        ["git", "rev-parse", "--git-path", INDEX_DIR_NAME],
+        capture_output=True,
+        text=True,
+        cwd=workdir,
+        check=True,
+    )
+    return (Path(workdir or ".") / result.stdout.strip()).resolve() / INDEX_FILE_NAME
+
+
+def _git_z(root: Path, *args: str) -> list[str]:
+    """Executa um comando git com saída -z e retorna os campos."""
+    result = subprocess.run(
+        ["git", *args, "-z"],
+        capture_output=True,
+        text=True,
+        errors="surrogateescape",
+        cwd=root,
+        check=True,
+    )
+    return [field for field in result.stdout.split("\0") if field]
+
+
+def _worktree_key(path: Path) -> Optional[str]:
+    """Chave de um arquivo ainda não commitado no índice do git (mtime e tamanho)."""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return f"wt:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def list_indexable_files(root: Path) -> dict[str, str]:
+    """Lista os arquivos indexáveis com a chave que identifica seu conteúdo.
+
+    Arquivos rastreados usam o SHA do blob em ``git ls-files -s``; arquivos
+    com edições não adicionadas e não rastreados (fora do .gitignore) usam
+    mtime e tamanho, já que não têm blob correspondente.
+
+    Args:
+        root: Raiz do repositório
+
+    Returns:
+        Dicionário caminho relativo -> chave do conteúdo
+    """
+    files: dict[str, str] = {}
+
+    for entry in _git_z(root, "ls-files", "-s"):
+        # Formato: <modo> <sha> <estágio>\t<caminho>
+        info, path = entry.split("\t", 1)
+        mode, blob, _ = info.split(" ")
+        # Submódulos (160000) e links simbólicos (120000) não têm código
+        if mode.startswith("100"):
+            files[path] = blob
+
+    dirty = _git_z(root, "diff", "--name-only")
+    untracked = _git_z(root, "ls-files", "-o", "--exclude-standard")
+    for path in (*dirty, *untracked):
+        key = _worktree_key(root / path)
+        if key is None:
+            # Removido no working tree
+            files.pop(path, None)
+        else:
+            files[path] = key
+
+    return {path: key for path, key in files.items() if not is_excluded_path(path)}
+
+
+def _read_text(path: Path) -> Optional[str]:
+    """Lê um arquivo de texto; binários e arquivos grandes retornam None."""
+    try:
+        if path.stat().st_size > MAX_FILE_BYTES:
+            return None
+        data = path.read_bytes()
+    except OSError:
+        return None
+    if is_binary(data):
+        return None
+    return data.decode("utf-8", "replace")
+
+
+Symbols = tuple[list[tuple[str, int, str]], list[tuple[str, int, str]]]
+
+
+def _with_snippets(content: str, symbols: FileSymbols) -> Symbols:
+    """Acrescenta o trecho da linha a cada par (símbolo, linha)."""
+    lines = content.split("\n")
+
+    def with_snippet(refs: list[tuple[str, int]]) -> list[tuple[str, int, str]]:
+        return [
+            (symbol, line, lines[line - 1].strip()[:MAX_SNIPPET_CHARS])
+            for symbol, line in refs
+            if line <= len(lines)
+        ]
+
+    return with_snippet(symbols.definitions), with_snippet(symbols.calls)
+
+
+def extract_file_symbols(path: str, content: str) -> Symbols:
+    """Extrai definições e chamadas usando o extrator da linguagem do arquivo.
+
+    Args:
+        path: Caminho do arquivo (a extensão escolhe o extrator)
+        content: Conteúdo do arquivo
+
+    Returns:
+        Tupla (definições, chamadas), cada uma com tuplas
+        (símbolo, linha, trecho)
+    """
+    return _with_snippets(content, extract_file(path, content))
+
+
+class SymbolIndex:
+    """Índice de definições e chamadas de símbolos em SQLite."""
+
+    def __init__(self, connection: sqlite3.Connection):
+        """Inicializa o índice sobre um banco já construído.
+
+        Args:
+            connection: Conexão com o banco do índice
+        """
+        self._connection = connection
+        # A conexão é compartilhada pelas threads do context_builder
+        self._lock = threading.Lock()
+
+    @classmethod
+    def open(cls, workdir: Optional[Path] = None) -> "SymbolIndex":
+        """Abre o índice do repositório e o atualiza com os arquivos alterados.
+
+        Args:
+            workdir: Diretório raiz do repositório
+
+        Returns:
+            SymbolIndex pronto para consultas
+
+        Raises:
+            subprocess.CalledProcessError: Se workdir não for um repositório git
+            sqlite3.Error: Se o banco não puder ser criado
+        """
+        root = Path(workdir or ".").resolve()
+        db_path = get_index_path(root)
+
+        connection = _connect_existing(db_path)
+        if connection is None:
+            create_index(db_path)
+            connection = sqlite3.connect(db_path, check_same_thread=False)
+
+        index = cls(connection)
+        index.refresh(root)
+        return index
+
+    def refresh(self, root: Path) -> tuple[int, int]:
+        """Reindexa apenas os arquivos cujo conteúdo mudou desde a última execução.
+
+        A atualização roda em uma única transação: leitores concorrentes veem
+        o índice anterior ou o novo, nunca um estado intermediário.
+
+        Args:
+            root: Raiz do repositório
+
+        Returns:
+            Tupla (arquivos varridos, arquivos removidos do índice)
+        """
+        current = list_indexable_files(root)
+        stored = dict(self._connection.execute("SELECT path, blob FROM files"))
+
+        changed = [path for path, key in current.items() if stored.get(path) != key]
+        removed = [path for path in stored if path not in current]
+        if not changed and not removed:
+            return 0, 0
+
+        with self._connection:
+            stale = [(path,) for path in (*changed, *removed)]
+            self._connection.executemany("DELETE FROM definitions WHERE path = ?", stale)
+            self._connection.executemany("DELETE FROM calls WHERE path = ?", stale)
+            self._connection.executemany("DELETE FROM files WHERE path = ?", stale)
+
+            definitions: list[tuple[str, str, int, str]] = []
+            calls: list[tuple[str, str, int, str]] = []
+            for path in changed:
+                content = _read_text(root / path)
+                if content is not None:
+                    file_defs, file_calls = extract_file_symbols(path, content)
+                    definitions.extend((s, path, n, t) for s, n, t in file_defs)
+                    calls.extend((s, path, n, t) for s, n, t in file_calls)
+                if len(calls) >= INSERT_BATCH:
+                    _insert(self._connection, definitions, calls)
+                    definitions, calls = [], []
+            _insert(self._connection, definitions, calls)
+
+            # Binários e arquivos grandes também são registrados, para não
+            # serem lidos de novo enquanto o blob não mudar
+            self._connection.executemany(
+                "INSERT INTO files (path, blob) VALUES (?, ?)",
+                [(path, current[path]) for path in changed],
+            )
+
+        return len(changed), len(removed)
+
+    def close(self) -> None:
+        """Fecha a conexão com o banco."""
+        self._connection.close()
+
+    def _query(self, table: str, symbol: str, limit: int) -> list[tuple[str, int, str]]:
+        with self._lock:
+            cursor = self._connection.execute(
+                f"SELECT path, line, snippet FROM {table} WHERE symbol = ? "
+                "ORDER BY path, line LIMIT ?",
+                (symbol, limit),
+            )
+            return cursor.fetchall()
+
+    def find_callers(self, symbol: str, limit: int) -> list[FunctionRef]:
+        """Retorna os locais onde o símbolo é chamado.
+
+        Args:
+            symbol: Nome da função
+            limit: Número máximo de referências
+
+        Returns:
+            Lista de FunctionRef ordenada por arquivo e linha
+        """
+        return [
+            FunctionRef(file=path, line=line, snippet=snippet)
+            for path, line, snippet in self._query("calls", symbol, limit)
+        ]
+
+    def find_definition(self, symbol: str) -> Optional[FunctionRef]:
+        """Retorna a primeira definição do símbolo, se houver.
+
+        Args:
+            symbol: Nome da função ou classe
+
+        Returns:
+            FunctionRef da definição ou None
+        """
+        rows = self._query("definitions", symbol, 1)
+        if not rows:
+            return None
+        path, line, snippet = rows[0]
+        return FunctionRef(file=path, line=line, snippet=snippet, function_name=symbol)
+
+
+def _meta(connection: sqlite3.Connection, key: str) -> Optional[str]:
+    row = connection.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+
+def _connect_existing(db_path: Path) -> Optional[sqlite3.Connection]:
+    """Abre um índice existente da versão atual; None se ausente ou inválido."""
+    if not db_path.exists():
+        return None
+    try:
+        connection = sqlite3.connect(db_path, check_same_thread=False)
+        if _meta(connection, "version") == str(INDEX_VERSION):
+            return connection
+        connection.close()
+    except sqlite3.Error:
+        pass
+    return None
+
+
+def create_index(db_path: Path) -> None:
+    """Cria um índice vazio em db_path.
+
+    O banco é criado em um arquivo temporário e movido atomicamente, então
+    execuções concorrentes nunca veem um banco sem esquema.
+
+    Args:
+        db_path: Caminho final do banco
+    """
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=db_path.parent, suffix=".tmp")
+    os.close(fd)
+
+    try:
+        connection = sqlite3.connect(tmp_name)
+        try:
+            connection.executescript(SCHEMA)
+            connection.execute(
+                "INSERT INTO meta (key, value) VALUES (?, ?)", ("version", str(INDEX_VERSION))
+            )
+            connection.commit()
+        finally:
+            connection.close()
+        os.replace(tmp_name, db_path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def _insert(
+    connection: sqlite3.Connection,
+    definitions: list[tuple[str, str, int, str]],
+    calls: list[tuple[str, str, int, str]],
+) -> None:
+    connection.executemany(
+        "INSERT INTO definitions (symbol, path, line, snippet) VALUES (?, ?, ?, ?)",
+        definitions,
+    )
+    connection.executemany(
+        "INSERT INTO calls (symbol, path, line, snippet) VALUES (?, ?, ?, ?)", calls
+    )
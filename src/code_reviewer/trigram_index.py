@@ -0,0 +1,459 @@
+"""Índice de trigramas para restringir as buscas textuais de símbolos.
+
+Quando o índice de símbolos não está disponível, cada busca de contexto
+varre o repositório inteiro com grep. O índice de trigramas guarda, para
+cada sequência de três bytes, os arquivos em que ela aparece; um arquivo só
+pode conter ``nome(`` se contiver todos os trigramas do termo, então o grep
+roda apenas nos arquivos candidatos (a confirmação continua sendo dele e dos
+extratores).
+
+Só trigramas dentro de identificadores (seguidos ou não de ``(``) são
+indexados, o que basta para os termos buscados e reduz muito o índice.
+
+O índice fica em ``.git/airev/trigrams/`` como segmentos binários somente
+leitura, mapeados em memória (mmap) nas consultas. Cada segmento registra o
+SHA do blob de cada arquivo (ver list_indexable_files): a cada execução só
+os arquivos cujo blob não está em nenhum segmento são lidos, e formam um
+segmento novo. Entradas de blobs que não existem mais são ignoradas; quando
+os segmentos acumulam, eles são fundidos sem reler os arquivos.
+"""
+
+import contextlib
+import json
+import mmap
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable, Iterator
+from heapq import merge
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+from .source_files import MAX_FILE_BYTES, is_binary
+from .symbol_index import list_indexable_files
+
+# Subdiretório (dentro do diretório .git) com o índice
+INDEX_DIR_NAME = "airev/trigrams"
+MANIFEST_NAME = "manifest.json"
+
+# Versão do formato: incrementar ao mudar o que é indexado
+INDEX_VERSION = 1
+
+# Segmentos acumulados antes de serem fundidos em um só
+MAX_SEGMENTS = 8
+
+# Cabeçalho do segmento: assinatura e três contadores de 32 bits
+# (arquivos, trigramas, postings), na ordem de bytes da máquina
+SEGMENT_MAGIC = b"ATRI"
+HEADER_BYTES = 16
+ITEM_BYTES = array("I").itemsize
+
+# Identificadores e a chamada que pode segui-los
+TOKEN_PATTERN = re.compile(rb"[A-Za-z0-9_]+\(?")
+
+
+def get_index_dir(workdir: Optional[Path] = None) -> Path:
+    """Retorna o diretório do índice de trigramas dentro do diretório git.
+
+    Args:
+        workdir: Diretório do repositório
+
+    Returns:
+        Caminho absoluto do diretório do índice
+    """
+    result = subprocess.run(
+        ["git", "rev-parse", "--git-path", INDEX_DIR_NAME],
+        capture_output=True,
+        text=True,
+        cwd=workdir,
+        check=True,
+    )
+    return (Path(workdir or ".") / result.stdout.strip()).resolve()
+
+
+def _trigram(gram: bytes) -> int:
+    return int.from_bytes(gram, "big")
+
+
+def file_trigrams(data: bytes) -> set[int]:
+    """Trigramas dos identificadores de um arquivo.
+
+    Args:
+        data: Conteúdo do arquivo
+
+    Returns:
+        Trigramas codificados como inteiros de 24 bits
+    """
+    grams: set[bytes] = set()
+    for token in set(TOKEN_PATTERN.findall(data)):
+        grams.update(token[i : i + 3] for i in range(len(token) - 2))
+    return {_trigram(gram) for gram in grams}
+
+
+def query_trigrams(term: str) -> list[int]:
+    """Trigramas de um termo de busca (vazio se o termo for curto demais)."""
+    data = term.encode("utf-8")
+    return sorted({_trigram(data[i : i + 3]) for i in range(len(data) - 2)})
+
+
+def _read_data(path: Path) -> Optional[bytes]:
+    """Lê um arquivo indexável; binários e arquivos grandes retornam None."""
+    try:
+        if path.stat().st_size > MAX_FILE_BYTES:
+            return None
+        data = path.read_bytes()
+    except OSError:
+        return None
+    return None if is_binary(data) else data
+
+
+def _write_segment(
+    file: BinaryIO, entries: list[tuple[str, str]], postings: Iterable[tuple[int, list[int]]]
+) -> None:
+    """Escreve um segmento: postings, tabela de trigramas, offsets e arquivos.
+
+    Args:
+        file: Arquivo binário aberto para escrita
+        entries: Pares (caminho, chave do conteúdo); o id é a posição
+        postings: Pares (trigrama, ids crescentes) em ordem de trigrama
+    """
+    file.write(bytes(HEADER_BYTES))
+    trigrams = array("I")
+    offsets = array("I", [0])
+    for gram, ids in postings:
+        array("I", ids).tofile(file)
+        trigrams.append(gram)
+        offsets.append(offsets[-1] + len(ids))
+    trigrams.tofile(file)
+    offsets.tofile(file)
+    file.write(json.dumps(entries).encode("utf-8"))
+
+    file.seek(0)
+    file.write(SEGMENT_MAGIC)
+    array("I", [len(entries), len(trigrams), offsets[-1]]).tofile(file)
+
+
+class _Segment:
+    """Segmento mapeado em memória."""
+
+    def __init__(self, path: Path):
+        """Mapeia um segmento existente.
+
+        Raises:
+            OSError, ValueError: Se o arquivo não existir ou estiver corrompido
+        """
+        with open(path, "rb") as file:
+            self._mm = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            view = memoryview(self._mm)
+            if view[:4] != SEGMENT_MAGIC:
+                raise ValueError(f"segmento inválido: {path}")
+            n_files, n_trigrams, n_postings = view[4:HEADER_BYTES].cast("I")
+            trigrams_at = HEADER_BYTES + n_postings * ITEM_BYTES
+            offsets_at = trigrams_at + n_trigrams * ITEM_BYTES
+            files_at = offsets_at + (n_trigrams + 1) * ITEM_BYTES
+            if files_at > len(view):
+                raise ValueError(f"segmento truncado: {path}")
+            self._postings = view[HEADER_BYTES:trigrams_at].cast("I")
+            self._trigrams = view[trigrams_at:offsets_at].cast("I")
+            self._offsets = view[offsets_at:files_at].cast("I")
+            self.entries: list[tuple[str, str]] = [
+                (entry_path, key) for entry_path, key in json.loads(bytes(view[files_at:]))
+            ]
+            view.release()
+            if len(self.entries) != n_files:
+                raise ValueError(f"segmento inválido: {path}")
+        except (TypeError, ValueError):
+            view.release()
+            self.close()
+            raise
+
+    @property
+    def trigram_count(self) -> int:
+        return len(self._trigrams)
+
+    def postings(self, position: int) -> memoryview:
+        """Ids dos arquivos do trigrama na posição dada da tabela."""
+        return self._postings[self._offsets[position] : self._offsets[position + 1]]
+
+    def trigram_at(self, position: int) -> int:
+        return self._trigrams[position]
+
+    def matching(self, grams: list[int]) -> set[int]:
+        """Ids dos arquivos que contêm todos os trigramas."""
+        lists = []
+        for gram in grams:
+            position = bisect_left(self._trigrams, gram)
+            if position == len(self._trigrams) or self._trigrams[position] != gram:
+                return set()
+            lists.append(self.postings(position))
+
+        lists.sort(key=len)
+        ids = set(lists[0])
+        for ids_with_gram in lists[1:]:
+            if not ids:
+                break
+            ids.intersection_update(ids_with_gram)
+        return ids
+
+    def close(self) -> None:
+        for name in ("_postings", "_trigrams", "_offsets"):
+            view = getattr(self, name, None)
+            if view is not None:
+                view.release()
+        self._mm.close()
+
+
+class TrigramIndex:
+    """Índice de trigramas do repositório, em segmentos mapeados em memória."""
+
+    def __init__(self, directory: Path):
+        """Inicializa o índice sem segmentos (ver open).
+
+        Args:
+            directory: Diretório do índice
+        """
+        self._directory = directory
+        self._names: list[str] = []
+        self._segments: list[_Segment] = []
+        # Por segmento: caminho de cada id, ou None se a entrada não vale mais
+        self._alive: list[list[Optional[str]]] = []
+        self._known: set[str] = set()
+        # Segmentos do manifesto lido, inclusive os ilegíveis
+        self._listed: list[str] = []
+
+    @classmethod
+    def open(cls, workdir: Optional[Path] = None) -> "TrigramIndex":
+        """Abre o índice do repositório e o atualiza com os arquivos alterados.
+
+        Args:
+            workdir: Diretório raiz do repositório
+
+        Returns:
+            TrigramIndex pronto para consultas
+
+        Raises:
+            subprocess.CalledProcessError: Se workdir não for um repositório git
+            OSError: Se o índice não puder ser gravado
+        """
+        root = Path(workdir or ".").resolve()
+        index = cls(get_index_dir(root))
+        index._load()
+        index.refresh(root)
+        return index
+
+    def _load(self) -> None:
+        """Mapeia os segmentos do manifesto; ilegíveis são descartados."""
+        try:
+            manifest = json.loads((self._directory / MANIFEST_NAME).read_text())
+        except (OSError, ValueError):
+            return
+        if not isinstance(manifest, dict) or manifest.get("version") != INDEX_VERSION:
+            return
+        if manifest.get("byteorder") != sys.byteorder:
+            return
+
+        self._listed = [str(name) for name in manifest.get("segments", [])]
+        for name in self._listed:
+            try:
+                segment = _Segment(self._directory / name)
+            except (OSError, ValueError):
+                continue
+            self._names.append(name)
+            self._segments.append(segment)
+
+    def refresh(self, root: Path) -> int:
+        """Indexa os arquivos cujo blob ainda não está em nenhum segmento.
+
+        Args:
+            root: Raiz do repositório
+
+        Returns:
+            Número de arquivos lidos
+        """
+        current = list_indexable_files(root)
+        self._resolve(current)
+        changed = [path for path in current if path not in self._known]
+
+        if changed:
+            self._add_segment(self._build(root, changed, current))
+        merged = list(self._names)
+        dead = sum(alive.count(None) for alive in self._alive)
+        if len(self._segments) > MAX_SEGMENTS or dead > len(self._known):
+            self._add_segment(self._merged(), replace=True)
+
+        if self._names != self._listed:
+            obsolete = set(self._listed + merged) - set(self._names)
+            self._save_manifest()
+            for name in obsolete:
+                # Outra execução pode estar com o segmento aberto
+                with contextlib.suppress(OSError):
+                    (self._directory / name).unlink(missing_ok=True)
+        return len(changed)
+
+    def _resolve(self, current: dict[str, str]) -> None:
+        """Escolhe a entrada válida de cada arquivo (a do segmento mais novo)."""
+        self._alive = [[None] * len(segment.entries) for segment in self._segments]
+        self._known = set()
+        for s in reversed(range(len(self._segments))):
+            alive = self._alive[s]
+            for file_id, (path, key) in enumerate(self._segments[s].entries):
+                if path not in self._known and current.get(path) == key:
+                    alive[file_id] = path
+                    self._known.add(path)
+
+    def _build(self, root: Path, paths: list[str], current: dict[str, str]) -> Path:
+        """Cria um segmento lendo os arquivos dados."""
+        postings: dict[int, list[int]] = {}
+        for file_id, path in enumerate(paths):
+            data = _read_data(root / path)
+            # Binários e arquivos grandes são registrados sem trigramas, para
+            # não serem lidos de novo enquanto o blob não mudar
+            for gram in file_trigrams(data) if data is not None else ():
+                postings.setdefault(gram, []).append(file_id)
+
+        entries = [(path, current[path]) for path in paths]
+        return self._write(entries, ((gram, postings[gram]) for gram in sorted(postings)))
+
+    def _merged(self) -> Path:
+        """Funde as entradas válidas de todos os segmentos em um novo segmento.
+
+        As postings são combinadas direto dos segmentos mapeados, em ordem de
+        trigrama, sem reler os arquivos.
+        """
+        entries: list[tuple[str, str]] = []
+        remaps: list[list[int]] = []
+        for segment, alive in zip(self._segments, self._alive):
+            remap = []
+            for file_id, path in enumerate(alive):
+                if path is None:
+                    remap.append(-1)
+                else:
+                    remap.append(len(entries))
+                    entries.append(segment.entries[file_id])
+            remaps.append(remap)
+
+        def grams_of(s: int) -> Iterator[tuple[int, int, int]]:
+            segment = self._segments[s]
+            return ((segment.trigram_at(i), s, i) for i in range(segment.trigram_count))
+
+        def postings() -> Iterator[tuple[int, list[int]]]:
+            gram, ids = -1, []
+            for next_gram, s, position in merge(*map(grams_of, range(len(self._segments)))):
+                if next_gram != gram:
+                    if ids:
+                        yield gram, ids
+                    gram, ids = next_gram, []
+                remap = remaps[s]
+                # Segmentos em ordem e ids crescentes: a lista sai ordenada
+                ids.extend(
+                    remap[file_id]
+                    for file_id in self._segments[s].postings(position)
+                    if remap[file_id] >= 0
+                )
+            if ids:
+                yield gram, ids
+
+        return self._write(entries, postings())
+
+    def _write(
+        self, entries: list[tuple[str, str]], postings: Iterable[tuple[int, list[int]]]
+    ) -> Path:
+        """Grava um segmento com nome único no diretório do índice."""
+        self._directory.mkdir(parents=True, exist_ok=True)
+        fd, name = tempfile.mkstemp(dir=self._directory, prefix="segment-", suffix=".tri")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                _write_segment(file, entries, postings)
+        except BaseException:
+            Path(name).unlink(missing_ok=True)
+            raise
+        return Path(name)
+
+    def _add_segment(self, path: Path, replace: bool = False) -> None:
+        """Passa a consultar o segmento (no lugar de todos, se ``replace``)."""
+        segment = _Segment(path)
+        if replace:
+            self.close()
+            self._names, self._segments, self._alive = [], [], []
+        self._names.append(path.name)
+        self._segments.append(segment)
+        paths = [entry_path for entry_path, _ in segment.entries]
+        self._alive.append(list(paths))
+        self._known.update(paths)
+
+    def _save_manifest(self) -> None:
+        """Grava o manifesto atomicamente (leitores veem o anterior ou o novo)."""
+        self._listed = list(self._names)
+        manifest = {
+            "version": INDEX_VERSION,
+            "byteorder": sys.byteorder,
+            "segments": self._names,
+        }
+        fd, name = tempfile.mkstemp(dir=self._directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as file:
+                json.dump(manifest, file)
+            os.replace(name, self._directory / MANIFEST_NAME)
+        except BaseException:
+            Path(name).unlink(missing_ok=True)
+            raise
+
+    def candidates(
+        self, caller_symbols: Iterable[str], definition_symbols: Iterable[str]
+    ) -> Optional[set[str]]:
+        """Arquivos que podem conter chamadas ou definições dos símbolos.
+
+        Args:
+            caller_symbols: Funções cujas chamadas (``nome(``) serão buscadas
+            definition_symbols: Símbolos cuja definição será buscada
+
+        Returns:
+            Caminhos candidatos, ou None se algum termo for curto demais para
+            ser filtrado pelos trigramas
+        """
+        terms = [f"{symbol}(" for symbol in caller_symbols] + list(definition_symbols)
+        queries = [query_trigrams(term) for term in terms]
+        if not all(queries):
+            return None
+
+        paths: set[str] = set()
+        for segment, alive in zip(self._segments, self._alive):
+            for grams in queries:
+                for file_id in segment.matching(grams):
+                    path = alive[file_id]
+                    if path is not None:
+                        paths.add(path)
+        return paths
+
+    def narrow(
+        self,
+        files: list[str],
+        caller_symbols: Iterable[str],
+        definition_symbols: Iterable[str],
+    ) -> list[str]:
+        """Restringe os arquivos de uma busca aos candidatos do índice.
+
+        Arquivos que o índice não conhece são mantidos.
+
+        Args:
+            files: Arquivos da busca
+            caller_symbols: Funções cujas chamadas serão buscadas
+            definition_symbols: Símbolos cuja definição será buscada
+
+        Returns:
+            Subconjunto de ``files``, na mesma ordem
+        """
+        paths = self.candidates(caller_symbols, definition_symbols)
+        if paths is None:
+            return files
+        return [path for path in files if path in paths or path not in self._known]
+
+    def close(self) -> None:
+        """Libera os segmentos mapeados."""
+        for segment in self._segments:
+            segment.close()
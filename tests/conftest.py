@@ -0,0 +1,88 @@
+"""Utilitários e fixtures compartilhados pelos testes."""
+
+import subprocess
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Optional, Union
+
+import pytest
+
+from code_reviewer import context_builder
+from code_reviewer.compact_diff import CompactDiffFile
+from code_reviewer.models import DiffFile
+
+
+def git(repo: Path, *args: str) -> str:
+    """Executa um comando git no repositório de teste e retorna a saída."""
+    return subprocess.run(
+        ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com", *args],
+        cwd=repo,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.strip()
+
+
+def commit_files(repo: Path, files: dict[str, Union[str, bytes]], message: str) -> None:
+    """Grava os arquivos (caminhos relativos ao repositório) e os commita."""
+    for name, content in files.items():
+        path = repo / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if isinstance(content, bytes):
+            path.write_bytes(content)
+        else:
+            path.write_text(content)
+    git(repo, "add", *files)
+    git(repo, "commit", "-q", "-m", message)
+
+
+def init_repo(
+    path: Path, files: Optional[dict[str, Union[str, bytes]]] = None, message: str = "inicial"
+) -> Path:
+    """Cria um repositório git na branch main, com um commit dos arquivos dados."""
+    git(path, "init", "-q", "-b", "main")
+    if files:
+        commit_files(path, files, message)
+    return path
+
+
+def as_models(diff_files: Iterable[CompactDiffFile]) -> list[DiffFile]:
+    """Converte arquivos compactos em modelos Pydantic, comparáveis por igualdade."""
+    return [diff_file.to_model() for diff_file in diff_files]
+
+
+# Definições e chamadas em arquivos diferentes (ver fixture repo)
+PAYMENT_FILES = {
+    "payment.py": (
+        "def process_payment(amount):\n    return charge(amount)\n\n\n"
+        "def charge(amount):\n    return amount\n"
+    ),
+    "checkout.py": (
+        "from payment import process_payment\n\n\n"
+        "def checkout(cart):\n"
+        "    # process_payment(cart) em comentário\n"
+        "    return process_payment(cart.total)\n"
+    ),
+    "notes.md": "process payment manually\n",
+}
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """Repositório com uma definição e chamadas em outros arquivos."""
+    return init_repo(tmp_path, PAYMENT_FILES)
+
+
+@pytest.fixture
+def grep_calls(monkeypatch):
+    """Registra os comandos de cada execução do grep."""
+    calls = []
+    real_popen = subprocess.Popen
+
+    def _popen(cmd, *args, **kwargs):
+        if cmd[0] == "grep":
+            calls.append(cmd)
+        return real_popen(cmd, *args, **kwargs)
+
+    monkeypatch.setattr(context_builder.subprocess, "Popen", _popen)
+    return calls
@@ -0,0 +1,79 @@
+"""Testes para os geradores de diff sintético dos benchmarks."""
+
+from benchmarks.bench_diff import StageResult, Threshold, check_regression, main
+from benchmarks.synthetic import DiffShape, create_repository, generate_diff
+from code_reviewer.diff_parser import (
+    is_ignored_file,
+    iter_diff_files,
+    parse_diff,
+    stream_git_diff,
+)
+
+SMALL = DiffShape("small", files=10, hunks_per_file=3, lines_per_hunk=2, line_length=60)
+
+
+class TestGenerateDiff:
+    """Testes para generate_diff."""
+
+    def test_formato_parseavel(self):
+        files = parse_diff(generate_diff(SMALL))
+
+        # 10% dos caminhos são ignorados
+        assert len(files) == 9
+        assert all(len(f.hunks) == 3 for f in files)
+        assert files[0].hunks[0].added_count == 2
+        assert files[0].hunks[0].function_name == "func_0"
+
+    def test_total_de_linhas(self):
+        text = generate_diff(SMALL.scaled(1))
+        hunk_lines = [line for line in text.splitlines() if line[:1] in "+- "]
+        header_lines = [line for line in hunk_lines if line.startswith(("---", "+++"))]
+
+        assert len(hunk_lines) - len(header_lines) == SMALL.total_lines
+
+    def test_linhas_longas(self):
+        shape = DiffShape(
+            "long", files=1, hunks_per_file=1, lines_per_hunk=1, line_length=500, ignored_ratio=0
+        )
+        text = generate_diff(shape)
+        added = [line for line in text.splitlines() if line.startswith("+ ")]
+
+        assert len(added[0]) == 501
+
+    def test_caminhos_ignorados(self):
+        files = {f.path for f in parse_diff(generate_diff(SMALL))}
+
+        assert not any(is_ignored_file(path) for path in files)
+
+
+class TestCreateRepository:
+    """Testes para create_repository."""
+
+    def test_diff_igual_ao_sintetico(self, tmp_path):
+        shape = DiffShape("repo", files=3, hunks_per_file=2, lines_per_hunk=2, ignored_ratio=0)
+        repo = create_repository(shape, tmp_path)
+
+        from_git = list(iter_diff_files(stream_git_diff("main", repo)))
+
+        assert [f.path for f in from_git] == [f.path for f in parse_diff(generate_diff(shape))]
+        assert sum(f.added_count for f in from_git) == 3 * 2 * 2
+
+
+class TestRegressao:
+    """Testes para os limites de regressão."""
+
+    def test_vazao_abaixo_do_limite(self):
+        result = StageResult("s", "parse", units=100, unit="linhas", seconds=1.0, peak_bytes=0)
+
+        assert "vazão" in check_regression(result, Threshold(min_rate=1000, max_bytes_per_unit=1))
+
+    def test_memoria_acima_do_limite(self):
+        result = StageResult(
+            "s", "parse", units=100, unit="linhas", seconds=0.01, peak_bytes=10**6
+        )
+
+        assert "memória" in check_regression(result, Threshold(min_rate=1, max_bytes_per_unit=10))
+
+    def test_execucao_reduzida(self, capsys):
+        assert main(["--shape", "many-files", "--scale", "0.01", "--repeat", "1", "--json"]) == 0
+        assert '"stage": "parse"' in capsys.readouterr().out
@@ -1,8 +1,15 @@
 """Testes para o CLI."""
 
+from unittest.mock import MagicMock, patch
+
+import pytest
 from click.testing import CliRunner
 
 from code_reviewer.cli import review
+from code_reviewer.diff_parser import iter_diff_files
+from code_reviewer.incremental import get_state_dir
+
+from .conftest import commit_files, git, init_repo
 
 
 class TestReviewCommand:
@@ -103,3 +110,148 @@ class TestReviewCommand:
 
         assert result.exit_code == 0
         assert "-D" in result.output
+
+    def test_flag_incremental_reconhecida(self):
+        """Verifica que a flag --incremental é aceita pelo CLI."""
+        runner = CliRunner()
+
+        result = runner.invoke(review, ["--help"])
+
+        assert result.exit_code == 0
+        assert "--incremental" in result.output
+
+    def test_flag_rename_threshold_reconhecida(self):
+        """Verifica que a flag --rename-threshold é aceita pelo CLI."""
+        runner = CliRunner()
+
+        result = runner.invoke(review, ["--help"])
+
+        assert result.exit_code == 0
+        assert "--rename-threshold" in result.output
+
+    def test_flag_no_symbol_index_reconhecida(self):
+        """Verifica que a flag --no-symbol-index é aceita pelo CLI."""
+        runner = CliRunner()
+
+        result = runner.invoke(review, ["--help"])
+
+        assert result.exit_code == 0
+        assert "--no-symbol-index" in result.output
+
+    def test_flag_trigram_index_reconhecida(self):
+        """Verifica que a flag --trigram-index é aceita pelo CLI."""
+        runner = CliRunner()
+
+        result = runner.invoke(review, ["--help"])
+
+        assert result.exit_code == 0
+        assert "--trigram-index" in result.output
+
+    def test_flag_max_file_lines_reconhecida(self):
+        """Verifica que a flag --max-file-lines é aceita pelo CLI."""
+        runner = CliRunner()
+
+        result = runner.invoke(review, ["--help"])
+
+        assert result.exit_code == 0
+        assert "--max-file-lines" in result.output
+
+
+class TestReviewNumstat:
+    """Testes do prepass --numstat no comando review."""
+
+    @pytest.fixture
+    def repo(self, tmp_path):
+        init_repo(tmp_path, {"app.py": "x = 1\n"})
+        git(tmp_path, "checkout", "-q", "-b", "feature")
+        commit_files(
+            tmp_path,
+            {"app.py": "x = 2\n", "gerado.py": "".join(f"v{i} = {i}\n" for i in range(50))},
+            "feature",
+        )
+        return tmp_path
+
+    def _invoke(self, repo, *extra):
+        fake_runner = MagicMock()
+        fake_runner.check_availability.return_value = True
+        fake_runner.run.return_value = '{"review": {"findings": [], "good_practices": []}}'
+        args = ["--base", "main", "-w", str(repo), "-j", "--no-cache", "--no-interactive"]
+        with patch("code_reviewer.cli.get_runner", return_value=fake_runner):
+            result = CliRunner().invoke(review, [*args, *extra])
+        return fake_runner, result
+
+    def test_arquivo_grande_fica_fora_do_prompt(self, repo):
+        runner, result = self._invoke(repo, "--max-file-lines", "10")
+
+        assert result.exit_code == 0, result.output
+        prompt = runner.run.call_args[0][0]
+        assert "### app.py" in prompt
+        assert "gerado.py" not in prompt
+
+    def test_sem_indice_de_simbolos(self, repo):
+        runner, result = self._invoke(repo, "--no-symbol-index")
+
+        assert result.exit_code == 0, result.output
+        assert not (repo / ".git" / "airev" / "index").exists()
+
+    def test_limite_zero_desabilita(self, repo):
+        runner, result = self._invoke(repo, "--max-file-lines", "0")
+
+        assert result.exit_code == 0, result.output
+        assert "### gerado.py" in runner.run.call_args[0][0]
+
+    def test_arquivo_grande_renomeado_exclui_caminho_antigo(self, repo):
+        git(repo, "checkout", "-q", "main")
+        commit_files(repo, {"big.txt": "".join(f"linha {i}\n" for i in range(8000))}, "big")
+        git(repo, "checkout", "-q", "-b", "rename")
+        git(repo, "mv", "big.txt", "moved.txt")
+        with open(repo / "moved.txt", "a") as file:
+            file.write("".join(f"nova {i}\n" for i in range(6000)))
+        (repo / "app.py").write_text("x = 3\n")
+        git(repo, "add", ".")
+        git(repo, "commit", "-q", "-m", "rename")
+        parsed = []
+
+        def _iter(lines, ignore_rules):
+            parsed.extend(iter_diff_files(lines, ignore_rules))
+            return iter(parsed)
+
+        with patch("code_reviewer.cli.iter_diff_files", _iter):
+            _, result = self._invoke(repo, "--max-file-lines", "5000")
+
+        assert result.exit_code == 0, result.output
+        assert [diff_file.path for diff_file in parsed] == ["app.py"]
+
+    def test_diff_vazio_sai_antes_do_parse(self, repo):
+        with patch("code_reviewer.cli._load_diff_files") as load:
+            _, result = self._invoke(repo, "--base", "HEAD")
+
+        assert result.exit_code == 0
+        load.assert_not_called()
+
+    def test_incremental_em_head_destacado_nao_salva_estado(self, repo):
+        git(repo, "checkout", "-q", "--detach")
+
+        runner, result = self._invoke(repo, "--incremental")
+
+        assert result.exit_code == 0, result.output
+        runner.run.assert_called_once()
+        assert not get_state_dir(repo).exists()
+
+    def test_indice_fechado_quando_contexto_falha(self, repo):
+        with (
+            patch("code_reviewer.cli.SymbolIndex.close") as close,
+            patch("code_reviewer.cli.build_context_graph", side_effect=RuntimeError("falha")),
+        ):
+            _, result = self._invoke(repo)
+
+        assert isinstance(result.exception, RuntimeError)
+        close.assert_called_once()
+
+    def test_search_root_fora_do_repositorio(self, repo, tmp_path_factory):
+        outside = tmp_path_factory.mktemp("fora")
+
+        runner, result = self._invoke(repo, "--search-root", str(outside))
+
+        assert result.exit_code == 1
+        runner.run.assert_not_called()
@@ -0,0 +1,133 @@
+"""Testes para a representação compacta do diff."""
+
+from code_reviewer.compact_diff import (
+    ADDED,
+    CONTEXT,
+    REMOVED,
+    CompactDiffFile,
+    CompactHunk,
+    as_compact,
+    count_changes,
+    total_changes,
+)
+from code_reviewer.models import DiffFile, DiffHunk, DiffLine
+
+
+def _sample_hunk() -> CompactHunk:
+    hunk = CompactHunk("process", start_line_old=10, start_line_new=10)
+    hunk.append(CONTEXT, 10, "    inicio()")
+    hunk.append(REMOVED, 11, "    antigo()")
+    hunk.append(ADDED, 11, "    novo()")
+    hunk.append(ADDED, 12, "    outro()")
+    hunk.append(CONTEXT, 13, "    fim()")
+    hunk.freeze()
+    return hunk
+
+
+class TestCompactHunk:
+    """Testes para CompactHunk."""
+
+    def test_preserva_ordem_do_diff(self):
+        lines = list(_sample_hunk().iter_lines())
+
+        assert [prefix for prefix, _, _ in lines] == [" ", "-", "+", "+", " "]
+        assert lines[2] == ("+", 11, "    novo()")
+
+    def test_acessores_compativeis_com_diffline(self):
+        hunk = _sample_hunk()
+
+        assert [line.content for line in hunk.added_lines] == ["    novo()", "    outro()"]
+        assert hunk.added_lines[0].line_number == 11
+        assert hunk.added_lines[0].is_addition is True
+        assert hunk.removed_lines[0].is_addition is False
+        assert len(hunk.context_lines) == 2
+
+    def test_contadores_sem_materializar(self):
+        hunk = _sample_hunk()
+
+        assert hunk.added_count == 2
+        assert hunk.removed_count == 1
+        assert len(hunk) == 5
+
+    def test_conteudo_vazio(self):
+        hunk = CompactHunk(None, 1, 1)
+        hunk.append(ADDED, 1, "")
+        hunk.append(ADDED, 2, "x")
+
+        assert [line.content for line in hunk.added_lines] == ["", "x"]
+
+    def test_append_apos_freeze(self):
+        hunk = _sample_hunk()
+        hunk.append(ADDED, 14, "    extra()")
+
+        assert hunk.added_lines[-1].content == "    extra()"
+        assert hunk.context_lines[-1].content == "    fim()"
+
+
+class TestConversaoModelos:
+    """Testes para a conversão entre compacto e Pydantic."""
+
+    def test_round_trip(self):
+        compact = CompactDiffFile("a.py", hunks=[_sample_hunk()], is_new=True)
+
+        model = compact.to_model()
+        back = CompactDiffFile.from_model(model)
+
+        assert isinstance(model, DiffFile)
+        assert back.to_model() == model
+
+    def test_round_trip_renomeacao(self):
+        compact = CompactDiffFile(
+            "novo.py", old_path="antigo.py", is_renamed=True, similarity=90
+        )
+
+        model = compact.to_model()
+        state = CompactDiffFile.from_state(compact.to_state())
+
+        assert (model.old_path, model.is_renamed, model.similarity) == ("antigo.py", True, 90)
+        assert CompactDiffFile.from_model(model).to_model() == model
+        assert state.to_model() == model
+
+    def test_from_model_intercala_por_numero_de_linha(self):
+        hunk = DiffHunk(
+            start_line_old=10,
+            start_line_new=10,
+            added_lines=[DiffLine(line_number=12, content="b", is_addition=True)],
+            removed_lines=[DiffLine(line_number=11, content="r", is_addition=False)],
+            context_lines=[DiffLine(line_number=10, content="a", is_addition=False)],
+        )
+
+        compact = CompactHunk.from_model(hunk)
+
+        assert [(p, c) for p, _, c in compact.iter_lines()] == [
+            (" ", "a"),
+            ("-", "r"),
+            ("+", "b"),
+        ]
+
+    def test_as_compact_reutiliza_objeto(self):
+        compact = CompactDiffFile("a.py")
+        assert as_compact(compact) is compact
+
+    def test_to_model_serializa_json(self):
+        model = CompactDiffFile("a.py", hunks=[_sample_hunk()]).to_model()
+
+        assert '"path":"a.py"' in model.model_dump_json()
+
+
+class TestContagem:
+    """Testes para count_changes e total_changes."""
+
+    def test_conta_compacto_e_pydantic(self):
+        compact = CompactDiffFile("a.py", hunks=[_sample_hunk()])
+
+        assert count_changes(compact) == (2, 1)
+        assert count_changes(compact.to_model()) == (2, 1)
+
+    def test_total(self):
+        files = [
+            CompactDiffFile("a.py", hunks=[_sample_hunk()]),
+            CompactDiffFile("b.py", hunks=[_sample_hunk(), _sample_hunk()]),
+        ]
+
+        assert total_changes(files) == (6, 3)
@@ -1,9 +1,44 @@
 """Testes para o context_builder."""
 
+import os
+import threading
+import time
+
+import pytest
+
+from code_reviewer import context_builder, file_scanner
 from code_reviewer.context_builder import (
+    _grep_lookup,
     _is_comment_line,
+    build_context_graph,
     find_callees,
+    find_callers,
+    get_context_around_line,
+    search_symbols,
 )
+from code_reviewer.diff_parser import parse_diff
+from code_reviewer.file_cache import FileCache
+from code_reviewer.models import FunctionRef
+from code_reviewer.search_scope import load_search_scopes
+from code_reviewer.source_files import list_source_files
+
+from .conftest import git
+
+
+@pytest.fixture
+def project(tmp_path):
+    """Projeto com definições e chamadas em arquivos diferentes."""
+    (tmp_path / "payment.py").write_text(
+        "def process_payment(amount):\n    return charge(amount)\n\n\n"
+        "def charge(amount):\n    return amount\n"
+    )
+    (tmp_path / "checkout.py").write_text(
+        "def checkout(cart):\n"
+        "    # process_payment(cart) em comentário\n"
+        "    return process_payment(cart.total)\n"
+    )
+    (tmp_path / "refund.py").write_text("def refund(p):\n    return charge(-p)\n")
+    return tmp_path
 
 
 class TestIsCommentLine:
@@ -73,3 +108,609 @@ class TestFindCallees:
     def test_lista_vazia(self):
         callees = find_callees([], workdir=None)
         assert callees == []
+
+
+class TestSearchSymbols:
+    """Testes para a busca em lote search_symbols."""
+
+    def test_busca_varios_simbolos_em_uma_execucao(self, project, grep_calls):
+        matches = search_symbols(["process_payment", "charge"], ["charge", "refund"], project)
+
+        assert len(grep_calls) == 1
+        assert [ref.file for ref in matches.callers["process_payment"]] == ["checkout.py"]
+        assert sorted(ref.file for ref in matches.callers["charge"]) == [
+            "payment.py",
+            "refund.py",
+        ]
+        assert (matches.definitions["charge"].file, matches.definitions["charge"].line) == (
+            "payment.py",
+            5,
+        )
+        assert matches.definitions["refund"].function_name == "refund"
+
+    def test_ignora_comentarios_e_definicoes(self, project):
+        callers = find_callers("process_payment", project)
+
+        assert [(ref.file, ref.line) for ref in callers] == [("checkout.py", 3)]
+
+    def test_python_usa_arvore_sintatica(self, project):
+        (project / "notes.py").write_text('MESSAGE = "use process_payment(x)"\n')
+        (project / "notes.js").write_text('const m = "process_payment(x)";\n')
+
+        callers = find_callers("process_payment", project)
+
+        assert sorted(ref.file for ref in callers) == ["checkout.py", "notes.js"]
+
+    def test_simbolos_invalidos_nao_executam_grep(self, project, grep_calls):
+        matches = search_symbols(["a.b", ""], ["x y"], project)
+
+        assert matches.callers == {}
+        assert matches.definitions == {}
+        assert grep_calls == []
+
+    def test_build_context_graph_faz_uma_busca_por_nivel(self, project, grep_calls):
+        diff = (
+            "diff --git a/payment.py b/payment.py\n"
+            "@@ -2 +2 @@ def process_payment(amount):\n"
+            "-    return amount\n"
+            "+    return charge(amount)\n"
+            "diff --git a/refund.py b/refund.py\n"
+            "@@ -2 +2 @@ def refund(p):\n"
+            "-    return p\n"
+            "+    return charge(-p)\n"
+        )
+
+        graphs = build_context_graph(parse_diff(diff), project, max_depth=1)
+
+        assert len(grep_calls) == 1
+        assert [g.function_name for g in graphs] == ["process_payment", "refund"]
+        assert [ref.file for ref in graphs[0].callers] == ["checkout.py"]
+        assert graphs[0].callers[0].function_name == "checkout"
+        assert [ref.function_name for ref in graphs[1].callees] == ["charge"]
+
+
+class TestSourceFiles:
+    """Testes para o conjunto de arquivos pesquisáveis."""
+
+    def test_usa_arquivos_do_git(self, project):
+        git(project, "init", "-q")
+        (project / ".gitignore").write_text("out/\n")
+        (project / "out").mkdir()
+        (project / "out" / "gen.py").write_text("process_payment(1)\n")
+        (project / "pkg.egg-info").mkdir()
+        (project / "pkg.egg-info" / "x.py").write_text("process_payment(2)\n")
+        (project / "image.bin").write_bytes(b"\0process_payment(3)")
+
+        files = list_source_files(project)
+
+        assert sorted(files) == [".gitignore", "checkout.py", "payment.py", "refund.py"]
+        assert [ref.file for ref in find_callers("process_payment", project)] == ["checkout.py"]
+
+    def test_ignora_arquivos_grandes(self, project, monkeypatch):
+        monkeypatch.setattr("code_reviewer.source_files.MAX_FILE_BYTES", 40)
+
+        assert list_source_files(project) == ["refund.py"]
+
+    def test_fora_de_repositorio_percorre_a_arvore(self, project):
+        (project / "node_modules").mkdir()
+        (project / "node_modules" / "lib.js").write_text("process_payment(1)\n")
+
+        assert list_source_files(project) == ["checkout.py", "payment.py", "refund.py"]
+
+
+class TestExtractorsInContext:
+    """Testes do context_builder com os extratores por linguagem."""
+
+    def test_hunk_usa_definicao_do_extrator(self, tmp_path):
+        (tmp_path / "Billing.java").write_text(
+            "public class Billing {\n"
+            "    public int total(int value) {\n"
+            "        return round(value);\n"
+            "    }\n"
+            "    private int round(int value) {\n"
+            "        return value;\n"
+            "    }\n"
+            "}\n"
+        )
+        (tmp_path / "Cart.java").write_text(
+            "class Cart {\n    int sum() {\n        return billing.total(1);\n    }\n}\n"
+        )
+        (tmp_path / "total.py").write_text("def total():\n    return total()\n")
+        diff = (
+            "diff --git a/Billing.java b/Billing.java\n"
+            "@@ -3 +3 @@ public class Billing {\n"
+            "-        return value;\n"
+            "+        return round(value);\n"
+        )
+
+        graphs = build_context_graph(parse_diff(diff), tmp_path)
+
+        assert [g.function_name for g in graphs] == ["total"]
+        # Apenas arquivos Java são pesquisados
+        assert [ref.file for ref in graphs[0].callers] == ["Cart.java"]
+        assert [(ref.function_name, ref.line) for ref in graphs[0].callees] == [("round", 5)]
+
+
+class TestEnclosingFunction:
+    """Testes do trecho de código enviado para cada função modificada."""
+
+    @pytest.fixture
+    def service(self, tmp_path):
+        imports = "".join(f"import mod_{i}\n" for i in range(300))
+        (tmp_path / "service.py").write_text(
+            imports
+            + "\n\nclass Service:\n"
+            "    def load(self, key):\n"
+            "        return key\n\n"
+            "    def save(self, key, value):\n"
+            "        self.store(key)\n"
+            "        return value\n\n"
+            "    def delete(self, key):\n"
+            "        return None\n\n\n"
+            "def helper():\n"
+            "    return 1\n"
+        )
+        return tmp_path
+
+    def test_envia_apenas_a_funcao_e_assinaturas_vizinhas(self, service):
+        diff = (
+            "diff --git a/service.py b/service.py\n"
+            "@@ -308 +308 @@ class Service:\n"
+            "-        self.put(key)\n"
+            "+        self.store(key)\n"
+        )
+
+        (graph,) = build_context_graph(parse_diff(diff), service)
+
+        assert graph.function_name == "save"
+        assert graph.file_content is None
+        assert graph.excerpt == (
+            "    def save(self, key, value):\n        self.store(key)\n        return value"
+        )
+        assert (graph.excerpt_start, graph.excerpt_end) == (307, 309)
+        assert graph.sibling_signatures == ["def load(self, key):", "def delete(self, key):"]
+
+    def test_alteracao_fora_de_definicoes_usa_janela_do_hunk(self, service):
+        diff = (
+            "diff --git a/service.py b/service.py\n"
+            "@@ -150 +150 @@ import mod_148\n"
+            "-import old\n"
+            "+import mod_149\n"
+        )
+
+        (graph,) = build_context_graph(parse_diff(diff), service, index=_SlowIndex())
+
+        assert (graph.excerpt_start, graph.excerpt_end) == (145, 155)
+        assert graph.excerpt.split("\n")[0] == "import mod_144"
+        assert graph.sibling_signatures == ["class Service:", "def helper():"]
+
+    def test_funcao_longa_recortada_ao_redor_da_alteracao(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(context_builder, "MAX_EXCERPT_LINES", 5)
+        body = "".join(f"    x{i} = {i}\n" for i in range(1, 21))
+        (tmp_path / "long.py").write_text("def long():\n" + body)
+        diff = "diff --git a/long.py b/long.py\n@@ -11 +11 @@\n-    x = 0\n+    x10 = 10\n"
+
+        (graph,) = build_context_graph(parse_diff(diff), tmp_path, index=_SlowIndex())
+
+        assert graph.excerpt.split("\n") == [
+            "def long():",
+            "... (7 linhas omitidas)",
+            "    x8 = 8",
+            "    x9 = 9",
+            "    x10 = 10",
+            "    x11 = 11",
+            "... (9 linhas omitidas)",
+        ]
+        assert (graph.excerpt_start, graph.excerpt_end) == (1, 21)
+
+
+class TestChangedFunctions:
+    """Testes do mapeamento de linhas alteradas para as funções que as contêm."""
+
+    @pytest.fixture
+    def orders(self, tmp_path):
+        (tmp_path / "orders.py").write_text(
+            "LIMIT = 10\n"
+            "\n"
+            "\n"
+            "def create(order):\n"
+            "    return validate(order)\n"
+            "\n"
+            "\n"
+            "def cancel(order):\n"
+            "    notify(order)\n"
+            "    return None\n"
+        )
+        (tmp_path / "helpers.py").write_text(
+            "def validate(order):\n    return order\n\n\ndef notify(order):\n    pass\n"
+        )
+        return tmp_path
+
+    def test_hunk_com_varias_funcoes_gera_varios_nos(self, orders):
+        diff = (
+            "diff --git a/orders.py b/orders.py\n"
+            "@@ -5,5 +5,5 @@ def create(order):\n"
+            "-    return order\n"
+            "+    return validate(order)\n"
+            " \n"
+            " \n"
+            " def cancel(order):\n"
+            "-    pass\n"
+            "+    notify(order)\n"
+        )
+
+        graphs = build_context_graph(parse_diff(diff), orders, max_depth=1)
+
+        assert [g.function_name for g in graphs] == ["create", "cancel"]
+        assert [[r.function_name for r in g.callees] for g in graphs] == [
+            ["validate"],
+            ["notify"],
+        ]
+        assert graphs[1].excerpt.startswith("def cancel(order):")
+
+    def test_nome_do_header_nao_e_buscado(self, orders, monkeypatch):
+        # O header aponta a função anterior; a alteração está em cancel
+        diff = (
+            "diff --git a/orders.py b/orders.py\n"
+            "@@ -10 +10 @@ def create(order):\n"
+            "-    return order\n"
+            "+    return None\n"
+        )
+        searched = []
+        real_search = context_builder.search_symbols
+
+        def _search(callers, definitions, *args, **kwargs):
+            searched.append(set(callers))
+            return real_search(callers, definitions, *args, **kwargs)
+
+        monkeypatch.setattr(context_builder, "search_symbols", _search)
+
+        (graph,) = build_context_graph(parse_diff(diff), orders, max_depth=1)
+
+        assert graph.function_name == "cancel"
+        assert searched == [{"cancel"}]
+
+    def test_remocao_pura_pertence_a_funcao_anterior(self, orders):
+        diff = (
+            "diff --git a/orders.py b/orders.py\n"
+            "@@ -9,3 +9,2 @@ def cancel(order):\n"
+            "     notify(order)\n"
+            "-    log(order)\n"
+            "     return None\n"
+        )
+
+        (graph,) = build_context_graph(parse_diff(diff), orders, max_depth=1)
+
+        assert graph.function_name == "cancel"
+
+    def test_alteracao_no_modulo_nao_busca_callers(self, orders, grep_calls):
+        diff = "diff --git a/orders.py b/orders.py\n@@ -1 +1 @@\n-LIMIT = 5\n+LIMIT = 10\n"
+
+        (graph,) = build_context_graph(parse_diff(diff), orders)
+
+        assert graph.function_name == context_builder.MODULE_SCOPE
+        assert graph.excerpt.startswith("LIMIT = 10")
+        assert graph.callers == []
+        assert grep_calls == []
+
+
+class TestContextExpansion:
+    """Testes da expansão transitiva de callers/callees com orçamento de tokens."""
+
+    @pytest.fixture
+    def layers(self, tmp_path):
+        """Cadeia routes -> handler -> service -> repo -> db_query."""
+        (tmp_path / "app").mkdir()
+        (tmp_path / "app" / "routes.py").write_text("def route():\n    return handler()\n")
+        (tmp_path / "app" / "api.py").write_text("def handler():\n    return service()\n")
+        (tmp_path / "app" / "service.py").write_text("def service():\n    return repo()\n")
+        (tmp_path / "app" / "repo.py").write_text("def repo():\n    return db_query()\n")
+        (tmp_path / "db.py").write_text("def db_query():\n    return 1\n")
+        return tmp_path
+
+    @pytest.fixture
+    def diff(self):
+        return (
+            "diff --git a/app/service.py b/app/service.py\n"
+            "@@ -2 +2 @@\n"
+            "-    return None\n"
+            "+    return repo()\n"
+        )
+
+    def test_segue_callers_e_callees_ate_a_profundidade(self, layers, diff):
+        (graph,) = build_context_graph(parse_diff(diff), layers, token_budget=0)
+
+        assert [(r.function_name, r.depth) for r in graph.callers] == [
+            ("handler", 1),
+            ("route", 2),
+        ]
+        assert [(r.function_name, r.depth) for r in graph.callees] == [
+            ("repo", 1),
+            ("db_query", 2),
+        ]
+        assert graph.callers[0].context == "def handler():\n    return service()\n"
+        assert graph.callees[1].context == "def db_query():\n    return 1"
+
+    def test_profundidade_um_mantem_apenas_vizinhos_diretos(self, layers, diff):
+        (graph,) = build_context_graph(parse_diff(diff), layers, max_depth=1)
+
+        assert [r.function_name for r in graph.callers] == ["handler"]
+        assert [r.function_name for r in graph.callees] == ["repo"]
+
+    def test_orcamento_prioriza_referencias_relevantes(self, layers, diff):
+        graphs = build_context_graph(parse_diff(diff), layers, token_budget=0)
+        excerpt = context_builder.estimate_tokens(graphs[0].excerpt)
+        repo = graphs[0].callees[0]
+        # Cabe o trecho, o callee chamado na linha alterada e apenas a linha dos demais
+        budget = (
+            excerpt
+            + context_builder.estimate_tokens(repo.snippet)
+            + context_builder.estimate_tokens(repo.context)
+            + 3 * 4
+        )
+
+        (graph,) = build_context_graph(parse_diff(diff), layers, token_budget=budget)
+
+        assert graph.excerpt is not None
+        assert graph.callees[0].function_name == "repo"
+        assert graph.callees[0].context is not None
+        assert all(ref.context is None for ref in graph.callers + graph.callees[1:])
+
+    def test_orcamento_minimo_descarta_contexto(self, layers, diff):
+        (graph,) = build_context_graph(parse_diff(diff), layers, token_budget=1)
+
+        assert graph.function_name == "service"
+        assert graph.excerpt is None
+        assert graph.callers == []
+        assert graph.callees == []
+
+
+class _SlowIndex:
+    """Índice falso que conta consultas e responde fora de ordem."""
+
+    def __init__(self):
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def find_callers(self, symbol, limit):
+        with self._lock:
+            self.calls.append(("callers", symbol))
+        # Os primeiros símbolos demoram mais para responder
+        time.sleep(0.02 if symbol == "first" else 0)
+        return [FunctionRef(file=f"{symbol}_caller.py", line=1, snippet=f"{symbol}()")]
+
+    def find_definition(self, symbol):
+        with self._lock:
+            self.calls.append(("definition", symbol))
+        return FunctionRef(file="lib.py", line=1, snippet="", function_name=symbol)
+
+
+class TestMonorepoScope:
+    """Testes das buscas limitadas aos pacotes de um monorepo."""
+
+    @pytest.fixture
+    def monorepo(self, tmp_path):
+        """core <- api (dependente); billing sem relação com core."""
+        packages = {
+            "core": ("[project]\nname = \"core\"\n", "def normalize(x):\n    return x\n"),
+            "api": (
+                "[project]\nname = \"api\"\ndependencies = [\"core>=1\"]\n",
+                "def view():\n    return normalize(1)\n",
+            ),
+            "billing": (
+                "[project]\nname = \"billing\"\n",
+                "def invoice():\n    return normalize(2)\n\n\ndef helper():\n    return 3\n",
+            ),
+        }
+        for name, (manifest, code) in packages.items():
+            root = tmp_path / "packages" / name
+            (root / name).mkdir(parents=True)
+            (root / "pyproject.toml").write_text(manifest)
+            (root / name / "main.py").write_text(code)
+        return tmp_path
+
+    @staticmethod
+    def _scanned(grep_calls):
+        return [sorted(arg for arg in cmd if arg.endswith(".py")) for cmd in grep_calls]
+
+    def test_callers_buscados_no_pacote_e_dependentes(self, monorepo, grep_calls):
+        diff = (
+            "diff --git a/packages/core/core/main.py b/packages/core/core/main.py\n"
+            "@@ -2 +2 @@\n-    return None\n+    return x\n"
+        )
+
+        (graph,) = build_context_graph(parse_diff(diff), monorepo, max_depth=1)
+
+        assert [(r.file, r.function_name) for r in graph.callers] == [
+            ("packages/api/api/main.py", "view")
+        ]
+        # Encontrado no escopo: o pacote billing não é varrido
+        assert self._scanned(grep_calls) == [
+            ["packages/api/api/main.py", "packages/core/core/main.py"]
+        ]
+
+    def test_repositorio_inteiro_so_para_simbolos_nao_resolvidos(self, monorepo, grep_calls):
+        diff = (
+            "diff --git a/packages/api/api/main.py b/packages/api/api/main.py\n"
+            "@@ -2 +2 @@\n-    return normalize(1)\n+    return helper()\n"
+        )
+        (monorepo / "packages" / "api" / "api" / "main.py").write_text(
+            "def view():\n    return helper()\n"
+        )
+
+        (graph,) = build_context_graph(parse_diff(diff), monorepo, max_depth=1)
+
+        # helper não é dependência declarada: só aparece na varredura completa
+        assert [(r.file, r.function_name) for r in graph.callees] == [
+            ("packages/billing/billing/main.py", "helper")
+        ]
+        # Callers de view: api; definição de helper: api e core; depois tudo
+        assert self._scanned(grep_calls) == [
+            ["packages/api/api/main.py"],
+            ["packages/api/api/main.py", "packages/core/core/main.py"],
+            [
+                "packages/api/api/main.py",
+                "packages/billing/billing/main.py",
+                "packages/core/core/main.py",
+            ],
+        ]
+
+    def test_raiz_configurada_sem_manifesto(self, monorepo, grep_calls):
+        (monorepo / "tools").mkdir()
+        (monorepo / "tools" / "script.py").write_text("def run():\n    return normalize(3)\n")
+        diff = (
+            "diff --git a/packages/core/core/main.py b/packages/core/core/main.py\n"
+            "@@ -2 +2 @@\n-    return None\n+    return x\n"
+        )
+
+        build_context_graph(parse_diff(diff), monorepo, max_depth=1, search_roots=["tools"])
+
+        assert "tools/script.py" not in self._scanned(grep_calls)[0]
+
+    def test_memo_separa_escopos_do_mesmo_simbolo(self, monorepo):
+        files = list_source_files(monorepo)
+        lookup = _grep_lookup(
+            lambda: files,
+            lambda: load_search_scopes(files, monorepo),
+            monorepo,
+            1,
+            FileCache(monorepo),
+        )
+
+        from_core = lookup({"normalize": {"packages/core/core/main.py"}}, {})
+        from_billing = lookup({"normalize": {"packages/billing/billing/main.py"}}, {})
+
+        assert [r.file for r in from_core.callers["normalize"]] == ["packages/api/api/main.py"]
+        assert [r.file for r in from_billing.callers["normalize"]] == [
+            "packages/billing/billing/main.py"
+        ]
+
+
+class TestConcurrentContext:
+    """Testes da construção concorrente do grafo de contexto."""
+
+    def test_consulta_cada_simbolo_uma_vez(self, tmp_path):
+        (tmp_path / "a.py").write_text(
+            "def first():\n    get_session()\n\n\n"
+            "def second():\n    get_session()\n\n\n"
+            "def third():\n    get_session()\n"
+        )
+        diff = (
+            "diff --git a/a.py b/a.py\n"
+            "@@ -2 +2 @@\n-    pass\n+    get_session()\n"
+            "@@ -6 +6 @@\n-    pass\n+    get_session()\n"
+            "@@ -10 +10 @@\n-    pass\n+    get_session()\n"
+        )
+        index = _SlowIndex()
+
+        graphs = build_context_graph(parse_diff(diff), tmp_path, index, workers=4)
+
+        assert [g.function_name for g in graphs] == ["first", "second", "third"]
+        assert [g.callers[0].file for g in graphs] == [
+            "first_caller.py",
+            "second_caller.py",
+            "third_caller.py",
+        ]
+        assert index.calls.count(("definition", "get_session")) == 1
+
+    def test_grep_em_paralelo_e_deterministico(self, project, monkeypatch):
+        for i in range(20):
+            (project / f"user_{i:02d}.py").write_text(f"def use_{i}():\n    return charge({i})\n")
+        monkeypatch.setattr(context_builder, "GREP_ARGS_BYTES", 30)
+
+        serial = search_symbols(["charge"], ["charge"], project, workers=1)
+        parallel = search_symbols(["charge"], ["charge"], project, workers=8)
+
+        assert parallel == serial
+        assert len(parallel.callers["charge"]) == context_builder.MAX_REFS_PER_SYMBOL
+
+
+class TestGetContextAroundLine:
+    """Testes para get_context_around_line."""
+
+    def test_janela_ao_redor_da_linha(self, tmp_path):
+        (tmp_path / "big.py").write_text("\n".join(f"line {i}" for i in range(1, 101)))
+        cache = FileCache(tmp_path)
+
+        context = get_context_around_line("big.py", 50, tmp_path, cache)
+
+        assert context.split("\n") == [f"line {i}" for i in range(45, 56)]
+        assert get_context_around_line("big.py", 1, tmp_path).split("\n")[0] == "line 1"
+        assert get_context_around_line("missing.py", 1, tmp_path) == ""
+
+
+class TestStreamingGrep:
+    """Testes do consumo em streaming da saída do grep."""
+
+    @pytest.fixture
+    def many_callers(self, project, monkeypatch):
+        for i in range(40):
+            (project / f"user_{i:02d}.py").write_text(f"def use_{i}():\n    return charge({i})\n")
+        # Um lote por arquivo
+        monkeypatch.setattr(context_builder, "GREP_ARGS_BYTES", 1)
+        return project
+
+    def test_encerra_ao_completar_referencias(self, many_callers, grep_calls):
+        matches = search_symbols(["charge"], [], many_callers, workers=2)
+
+        assert len(matches.callers["charge"]) == context_builder.MAX_REFS_PER_SYMBOL
+        assert len(grep_calls) < 20
+
+    def test_definicao_encontrada_encerra_busca(self, many_callers, grep_calls):
+        matches = search_symbols([], ["use_3"], many_callers, workers=1)
+
+        assert matches.definitions["use_3"].file == "user_03.py"
+        assert len(grep_calls) < 20
+
+    def test_tempo_esgotado_no_grep_nao_renova_prazo(self, project, tmp_path_factory, monkeypatch):
+        bin_dir = tmp_path_factory.mktemp("bin")
+        fake_grep = bin_dir / "grep"
+        fake_grep.write_text("#!/bin/sh\nexec sleep 10\n")
+        fake_grep.chmod(0o755)
+        monkeypatch.setenv("PATH", f"{bin_dir}:{os.environ['PATH']}")
+        monkeypatch.setattr(context_builder, "GREP_TIMEOUT", 0.2)
+        # O scanner recebe só o que resta do prazo, não um orçamento próprio
+        monkeypatch.setattr(file_scanner, "SCAN_TIMEOUT", 60)
+
+        start = time.monotonic()
+        matches = search_symbols(["charge"], [], project)
+
+        assert time.monotonic() - start < 5
+        assert matches.truncated == {"charge"}
+
+    def test_grep_ausente_usa_scanner(self, project, monkeypatch):
+        monkeypatch.setenv("PATH", "")
+
+        matches = search_symbols(["charge"], ["charge"], project)
+
+        assert [(ref.file, ref.line) for ref in matches.callers["charge"]] == [
+            ("payment.py", 2),
+            ("refund.py", 2),
+        ]
+        assert matches.definitions["charge"].line == 5
+
+    def test_scanner_sem_tempo_marca_busca_truncada(self, project, monkeypatch):
+        monkeypatch.setenv("PATH", "")
+        monkeypatch.setattr(context_builder, "GREP_TIMEOUT", 0)
+
+        assert search_symbols(["charge"], [], project) == ({}, {}, {"charge"})
+
+    def test_busca_completa_nao_e_truncada(self, project, monkeypatch):
+        monkeypatch.setenv("PATH", "")
+
+        assert search_symbols(["charge"], [], project).truncated == frozenset()
+
+    def test_grafo_marca_referencias_incompletas(self, project, monkeypatch):
+        monkeypatch.setenv("PATH", "")
+        monkeypatch.setattr(context_builder, "GREP_TIMEOUT", 0)
+        diff = (
+            "diff --git a/payment.py b/payment.py\n"
+            "@@ -6 +6 @@ def charge(amount):\n"
+            "-    return 0\n"
+            "+    return amount\n"
+        )
+
+        graphs = build_context_graph(parse_diff(diff), project)
+
+        assert graphs[0].callers == []
+        assert graphs[0].references_truncated
@@ -0,0 +1,50 @@
+"""Testes para o índice de intervalos das definições."""
+
+from code_reviewer.definition_intervals import DefinitionIntervals
+from code_reviewer.extractors import Definition
+
+CLASS = Definition("Cart", 3, 20)
+ADD = Definition("add", 5, 9)
+HELPER = Definition("helper", 7, 8)
+TOTAL = Definition("total", 12, 20)
+MAIN = Definition("main", 25, 30)
+
+
+class TestDefinitionIntervals:
+    """Testes para DefinitionIntervals."""
+
+    def test_definicao_mais_interna(self):
+        intervals = DefinitionIntervals([TOTAL, CLASS, MAIN, HELPER, ADD])
+
+        assert intervals.enclosing(1) is None
+        assert intervals.enclosing(3) == CLASS
+        assert intervals.enclosing(5) == ADD
+        assert intervals.enclosing(8) == HELPER
+        assert intervals.enclosing(9) == ADD
+        assert intervals.enclosing(10) == CLASS
+        assert intervals.enclosing(20) == TOTAL
+        assert intervals.enclosing(22) is None
+        assert intervals.enclosing(30) == MAIN
+        assert intervals.enclosing(31) is None
+
+    def test_intervalo_que_ultrapassa_o_pai_e_limitado(self):
+        outer = Definition("outer", 1, 10)
+        inner = Definition("inner", 5, 15)
+
+        intervals = DefinitionIntervals([outer, inner])
+
+        assert intervals.enclosing(10) == inner
+        assert intervals.enclosing(11) is None
+
+    def test_agrupa_linhas_por_definicao(self):
+        intervals = DefinitionIntervals([CLASS, ADD, TOTAL])
+
+        groups = intervals.group_lines([14, 6, 1, 13, 6, 8])
+
+        assert list(groups.items()) == [(None, [1]), (ADD, [6, 8]), (TOTAL, [13, 14])]
+
+    def test_sem_definicoes(self):
+        intervals = DefinitionIntervals([])
+
+        assert intervals.enclosing(1) is None
+        assert intervals.enclosing(0) is None
@@ -0,0 +1,119 @@
+"""Testes para o cache de diffs parseados."""
+
+import os
+
+from code_reviewer.diff_cache import (
+    CACHE_SUFFIX,
+    DiffCache,
+    cache_key,
+    decode_diff,
+    encode_diff,
+)
+from code_reviewer.diff_parser import parse_diff
+from code_reviewer.ignore_rules import IgnoreRules
+
+from .conftest import as_models
+
+SAMPLE_DIFF = """diff --git a/app.py b/app.py
+index 1234567..abcdefg 100644
+--- a/app.py
++++ b/app.py
+@@ -1,3 +1,4 @@ def main():
+     inicio()
+-    antigo()
++    novo()
++    outro("ação")
+     fim()
+diff --git a/novo.py b/novo.py
+new file mode 100644
+--- /dev/null
++++ b/novo.py
+@@ -0,0 +1 @@
++x = 1
+"""
+
+
+class TestCacheKey:
+    """Testes para cache_key."""
+
+    def test_chave_estavel(self):
+        rules = IgnoreRules()
+        assert cache_key("a", "b", 3, rules) == cache_key("a", "b", 3, IgnoreRules())
+
+    def test_chave_muda_com_cada_componente(self):
+        rules = IgnoreRules()
+        base = cache_key("a", "b", 3, rules)
+
+        assert cache_key("x", "b", 3, rules) != base
+        assert cache_key("a", "x", 3, rules) != base
+        assert cache_key("a", "b", 5, rules) != base
+        assert cache_key("a", "b", 3, IgnoreRules(["*.md"])) != base
+
+
+class TestSerializacao:
+    """Testes para encode_diff/decode_diff."""
+
+    def test_round_trip(self):
+        files = parse_diff(SAMPLE_DIFF)
+
+        restored = decode_diff(encode_diff(files))
+
+        assert as_models(restored) == as_models(files)
+        assert restored[0].hunks[0].added_count == 2
+        assert restored[1].is_new is True
+
+
+class TestDiffCache:
+    """Testes para DiffCache."""
+
+    def test_miss_retorna_none(self, tmp_path):
+        assert DiffCache(tmp_path).get("nao-existe") is None
+
+    def test_put_e_get(self, tmp_path):
+        cache = DiffCache(tmp_path)
+        files = parse_diff(SAMPLE_DIFF)
+
+        cache.put("chave", files)
+
+        assert as_models(cache.get("chave")) == as_models(files)
+
+    def test_entrada_corrompida_e_removida(self, tmp_path):
+        cache = DiffCache(tmp_path)
+        path = tmp_path / f"ruim{CACHE_SUFFIX}"
+        path.write_bytes(b"lixo")
+
+        assert cache.get("ruim") is None
+        assert not path.exists()
+
+    def test_diretorio_inexistente_e_criado(self, tmp_path):
+        cache = DiffCache(tmp_path / "a" / "b")
+        cache.put("k", parse_diff(SAMPLE_DIFF))
+
+        assert cache.get("k") is not None
+
+    def test_evicao_remove_menos_recentes(self, tmp_path):
+        files = parse_diff(SAMPLE_DIFF)
+        entry_size = len(encode_diff(files))
+        cache = DiffCache(tmp_path, max_bytes=entry_size * 2)
+
+        cache.put("antiga", files)
+        cache.put("media", files)
+        # Garante ordem de mtime determinística
+        os.utime(tmp_path / f"antiga{CACHE_SUFFIX}", (1, 1))
+        os.utime(tmp_path / f"media{CACHE_SUFFIX}", (2, 2))
+        cache.put("nova", files)
+
+        assert cache.get("antiga") is None
+        assert cache.get("media") is not None
+        assert cache.get("nova") is not None
+
+    def test_hit_atualiza_recencia(self, tmp_path):
+        files = parse_diff(SAMPLE_DIFF)
+        cache = DiffCache(tmp_path)
+        cache.put("k", files)
+        path = tmp_path / f"k{CACHE_SUFFIX}"
+        os.utime(path, (1, 1))
+
+        cache.get("k")
+
+        assert path.stat().st_mtime > 1
@@ -1,11 +1,47 @@
 """Testes para o diff_parser."""
 
+import subprocess
+import sys
+import types
+
+import pytest
+
+from code_reviewer.ignore_rules import IgnoreRules
+from code_reviewer import diff_parser
 from code_reviewer.diff_parser import (
+    FileStat,
+    get_diff_numstat,
+    get_git_diff,
+    get_head_sha,
+    get_merge_base,
     get_modified_functions,
     is_ignored_file,
+    iter_diff_files,
+    list_changed_files,
+    parallel_parse_diff,
     parse_diff,
+    stream_git_diff,
 )
 
+from .conftest import as_models, commit_files, git, init_repo
+
+
+@pytest.fixture
+def git_repo(tmp_path):
+    """Repositório git com branch main e um commit de feature sobre ela."""
+    init_repo(tmp_path, {"app.py": "def soma(a, b):\n    return a + b\n"})
+    git(tmp_path, "checkout", "-q", "-b", "feature")
+    commit_files(
+        tmp_path,
+        {
+            "app.py": "def soma(a, b):\n    return a + b\n\n\ndef sub(a, b):\n    return a - b\n",
+            "poetry.lock": "lock\n",
+        },
+        "feature",
+    )
+    return tmp_path
+
+
 # Exemplo de diff para testes
 SAMPLE_DIFF = """diff --git a/services/payment.py b/services/payment.py
 index 1234567..abcdefg 100644
@@ -131,6 +167,11 @@ class TestParseDiff:
         assert len(first_hunk.removed_lines) == 1
         assert "result = charge(amount)" in first_hunk.removed_lines[0].content
 
+    def test_filtra_com_regras_customizadas(self):
+        files = parse_diff(SAMPLE_DIFF, IgnoreRules(["routes/"]))
+
+        assert [f.path for f in files] == ["services/payment.py"]
+
     def test_filtra_arquivos_ignorados(self):
         files = parse_diff(SAMPLE_DIFF_WITH_LOCK)
 
@@ -218,3 +259,380 @@ index 1234567..abcdefg 100644
         # Verifica que as linhas de contexto têm números de linha válidos
         for line in second_hunk.context_lines:
             assert line.line_number > 0
+
+
+class TestIterDiffFiles:
+    """Testes para o parser incremental iter_diff_files."""
+
+    def test_retorna_gerador(self):
+        result = iter_diff_files(SAMPLE_DIFF.split("\n"))
+        assert isinstance(result, types.GeneratorType)
+
+    def test_produz_arquivos_antes_de_consumir_todas_as_linhas(self):
+        consumed = []
+
+        def lines():
+            for line in SAMPLE_DIFF.split("\n"):
+                consumed.append(line)
+                yield line
+
+        first = next(iter_diff_files(lines()))
+
+        assert first.path == "services/payment.py"
+        # O segundo arquivo ainda não foi lido quando o primeiro é entregue
+        assert len(consumed) < len(SAMPLE_DIFF.split("\n"))
+
+    def test_equivalente_a_parse_diff(self):
+        streamed = as_models(iter_diff_files(SAMPLE_DIFF.split("\n")))
+        assert streamed == as_models(parse_diff(SAMPLE_DIFF))
+
+
+class TestStreamGitDiff:
+    """Testes para stream_git_diff."""
+
+    def test_linhas_iguais_ao_modo_bufferizado(self, git_repo):
+        streamed = list(stream_git_diff("main", git_repo))
+        buffered = get_git_diff("main", git_repo)
+
+        assert all(isinstance(line, bytes) for line in streamed)
+        assert b"\n".join(streamed).decode() + "\n" == buffered
+
+    def test_stream_alimenta_parser(self, git_repo):
+        files = list(iter_diff_files(stream_git_diff("main", git_repo)))
+
+        assert [f.path for f in files] == ["app.py"]
+        assert any("def sub" in line.content for line in files[0].hunks[0].added_lines)
+
+    def test_git_nao_emite_arquivos_ignorados(self, git_repo):
+        output = b"\n".join(stream_git_diff("main", git_repo))
+
+        assert b"poetry.lock" not in output
+        assert b"app.py" in output
+
+    def test_regras_customizadas_viram_pathspecs(self, git_repo):
+        rules = IgnoreRules(["app.py"])
+
+        output = get_git_diff("main", git_repo, ignore_rules=rules)
+
+        assert "app.py" not in output
+        assert "poetry.lock" in output
+
+    def test_branch_inexistente_levanta_erro(self, git_repo):
+        with pytest.raises(subprocess.CalledProcessError):
+            list(stream_git_diff("nao-existe", git_repo))
+
+    def test_interrupcao_encerra_processo(self, git_repo, monkeypatch):
+        commit_files(
+            git_repo, {"big.py": "".join(f"x_{i} = {i}\n" for i in range(50000))}, "grande"
+        )
+        processes = []
+        real_popen = subprocess.Popen
+
+        def _popen(*args, **kwargs):
+            processes.append(real_popen(*args, **kwargs))
+            return processes[-1]
+
+        monkeypatch.setattr(diff_parser.subprocess, "Popen", _popen)
+
+        lines = stream_git_diff("main", git_repo)
+        next(lines)
+        lines.close()
+
+        assert len(processes) == 1
+        assert processes[0].poll() is not None
+        assert processes[0].stdout.closed
+
+    def test_stderr_volumoso_nao_bloqueia(self, tmp_path):
+        # Mais avisos que o buffer de um pipe, antes de qualquer saída
+        script = "import sys; sys.stderr.write('w' * 200000); print('fim')"
+
+        lines = list(diff_parser._stream_command([sys.executable, "-c", script], tmp_path))
+
+        assert lines == [b"fim"]
+
+
+@pytest.fixture
+def large_repo(git_repo):
+    """Repositório com muitos arquivos alterados, incluindo uma renomeação."""
+    git(git_repo, "checkout", "-q", "main")
+    files = {f"mod_{i:02d}.py": f"def f{i}():\n    return {i}\n" for i in range(30)}
+    files["antigo.py"] = "".join(f"linha_{i} = {i}\n" for i in range(20))
+    commit_files(git_repo, files, "base")
+    git(git_repo, "checkout", "-q", "feature")
+    git(git_repo, "rebase", "-q", "main")
+    for i in range(30):
+        (git_repo / f"mod_{i:02d}.py").write_text(f"def f{i}():\n    return {i} + 1\n")
+    git(git_repo, "mv", "antigo.py", "novo.py")
+    git(git_repo, "commit", "-q", "-am", "muitos")
+    return git_repo
+
+
+class TestListChangedFiles:
+    """Testes para list_changed_files."""
+
+    def test_lista_status_e_caminhos(self, large_repo):
+        entries = list_changed_files("main", large_repo)
+
+        assert ("M", "app.py") in entries
+        assert ("M", "mod_00.py") in entries
+
+    def test_renomeacao_traz_dois_caminhos(self, large_repo):
+        entries = list_changed_files("main", large_repo)
+
+        renames = [e for e in entries if e[0].startswith("R")]
+        assert renames == [(renames[0][0], "antigo.py", "novo.py")]
+
+    def test_exclui_ignorados(self, large_repo):
+        paths = {e[-1] for e in list_changed_files("main", large_repo)}
+        assert "poetry.lock" not in paths
+
+
+RENAME_DIFF = """diff --git a/old dir/util.py b/new dir/util.py
+similarity index 100%
+rename from old dir/util.py
+rename to new dir/util.py
+diff --git a/core.py b/core_v2.py
+similarity index 90%
+rename from core.py
+rename to core_v2.py
+index 1234567..abcdefg 100644
+--- a/core.py
++++ b/core_v2.py
+@@ -1,2 +1,2 @@ def run():
+ def run():
+-    return 1
++    return 2
+diff --git a/base.py b/base_copy.py
+similarity index 95%
+copy from base.py
+copy to base_copy.py
+"""
+
+
+class TestRenameDetection:
+    """Testes para detecção de renomeações e cópias."""
+
+    def test_renomeacao_pura_sem_hunks(self):
+        files = parse_diff(RENAME_DIFF)
+
+        assert files[0].path == "new dir/util.py"
+        assert files[0].old_path == "old dir/util.py"
+        assert files[0].is_renamed is True
+        assert files[0].similarity == 100
+        assert files[0].hunks == []
+
+    def test_renomeacao_com_edicoes(self):
+        renamed = parse_diff(RENAME_DIFF)[1]
+
+        assert (renamed.old_path, renamed.path) == ("core.py", "core_v2.py")
+        assert renamed.similarity == 90
+        assert [line.content for line in renamed.hunks[0].added_lines] == ["    return 2"]
+
+    def test_copia(self):
+        copied = parse_diff(RENAME_DIFF)[2]
+
+        assert copied.is_copied is True
+        assert copied.is_renamed is False
+        assert copied.old_path == "base.py"
+
+    def test_mover_diretorio_nao_gera_linhas(self, large_repo):
+        files = {f.path: f for f in iter_diff_files(stream_git_diff("main", large_repo))}
+
+        assert files["novo.py"].is_renamed is True
+        assert files["novo.py"].hunks == []
+        assert "antigo.py" not in files
+
+    def test_threshold_zero_desativa(self, large_repo):
+        files = {
+            f.path: f
+            for f in iter_diff_files(stream_git_diff("main", large_repo, rename_threshold=0))
+        }
+
+        assert files["antigo.py"].is_deleted is True
+        assert files["novo.py"].is_new is True
+        assert files["novo.py"].added_count == 20
+
+
+class TestBytesParsing:
+    """Testes para o parser sobre bytes com decodificação tardia."""
+
+    def test_byte_invalido_nao_interrompe(self):
+        diff = (
+            b"diff --git a/dados.txt b/dados.txt\n"
+            b"--- a/dados.txt\n"
+            b"+++ b/dados.txt\n"
+            b"@@ -1 +1 @@\n"
+            b"-antigo\n"
+            b"+valor \xff\xfe fim\n"
+        )
+
+        files = parse_diff(diff)
+
+        assert files[0].hunks[0].added_lines[0].content == "valor \ufffd\ufffd fim"
+
+    def test_utf8_valido_preservado(self):
+        diff = "diff --git a/a.py b/a.py\n@@ -1 +1 @@\n+texto = 'ação'\n".encode()
+
+        assert parse_diff(diff)[0].hunks[0].added_lines[0].content == "texto = 'ação'"
+
+    def test_texto_e_bytes_equivalentes(self):
+        assert as_models(parse_diff(SAMPLE_DIFF.encode())) == as_models(parse_diff(SAMPLE_DIFF))
+
+    def test_linha_removida_com_tracos_nao_e_header(self):
+        diff = (
+            "diff --git a/schema.sql b/schema.sql\n"
+            "--- a/schema.sql\n"
+            "+++ b/schema.sql\n"
+            "@@ -1,2 +1,1 @@\n"
+            "--- comentário antigo\n"
+            "+++ novo\n"
+            " SELECT 1;\n"
+        )
+
+        hunk = parse_diff(diff)[0].hunks[0]
+
+        assert [line.content for line in hunk.removed_lines] == ["-- comentário antigo"]
+        assert [line.content for line in hunk.added_lines] == ["++ novo"]
+
+    def test_header_com_aspas_apos_hunk_inicia_novo_arquivo(self):
+        diff = (
+            "diff --git a/app.py b/app.py\n"
+            "@@ -1 +1 @@\n"
+            "-x = 1\n"
+            "+x = 2\n"
+            'diff --git "a/docs/caf\\303\\251 \\"v1\\".py" "b/docs/caf\\303\\251 \\"v1\\".py"\n'
+            "index 1234567..89abcde 100644\n"
+            '--- "a/docs/caf\\303\\251 \\"v1\\".py"\n'
+            '+++ "b/docs/caf\\303\\251 \\"v1\\".py"\n'
+            "@@ -1 +1 @@\n"
+            "-y = 1\n"
+            "+y = 2\n"
+        )
+
+        app, doc = parse_diff(diff)
+
+        assert [line.content for line in app.hunks[0].removed_lines] == ["x = 1"]
+        assert [line.content for line in app.hunks[0].added_lines] == ["x = 2"]
+        assert doc.path == 'docs/café "v1".py'
+        assert [line.content for line in doc.hunks[0].added_lines] == ["y = 2"]
+
+    def test_header_irreconhecivel_encerra_hunk_anterior(self):
+        diff = (
+            "diff --git a/app.py b/app.py\n"
+            "@@ -1 +1 @@\n"
+            "+x = 2\n"
+            "diff --git formato-desconhecido\n"
+            "--- a/outro.py\n"
+            "+++ b/outro.py\n"
+        )
+
+        (app,) = parse_diff(diff)
+
+        assert [line.content for line in app.hunks[0].added_lines] == ["x = 2"]
+        assert app.hunks[0].removed_lines == []
+
+    def test_caminhos_com_espaco_e_aspas_do_git(self, git_repo):
+        commit_files(
+            git_repo,
+            {"com espaço.py": "a = 1\n", 'aspas "x".py': "b = 2\n", "app.py": "c = 3\n"},
+            "nomes",
+        )
+
+        files = {f.path: f for f in iter_diff_files(stream_git_diff("main", git_repo))}
+
+        assert sorted(files) == ["app.py", 'aspas "x".py', "com espaço.py"]
+        assert [line.content for line in files["app.py"].hunks[0].added_lines] == ["c = 3"]
+
+    def test_stream_de_arquivo_com_bytes_invalidos(self, git_repo):
+        commit_files(git_repo, {"latin1.txt": "olá mundo\n".encode("latin-1")}, "latin1")
+
+        files = {f.path: f for f in iter_diff_files(stream_git_diff("main", git_repo))}
+
+        assert files["latin1.txt"].hunks[0].added_lines[0].content == "ol\ufffd mundo"
+
+
+class TestGetDiffNumstat:
+    """Testes para o prepass get_diff_numstat."""
+
+    def test_contagens_por_arquivo(self, git_repo):
+        stats = get_diff_numstat("main", git_repo)
+
+        assert stats == [FileStat("app.py", 4, 0)]
+        assert stats[0].changed == 4
+
+    def test_renomeacao_traz_caminho_antigo(self, large_repo):
+        stats = {s.path: s for s in get_diff_numstat("main", large_repo)}
+
+        assert stats["novo.py"].old_path == "antigo.py"
+        assert stats["novo.py"].changed == 0
+
+    def test_threshold_zero_desativa(self, large_repo):
+        stats = {s.path: s for s in get_diff_numstat("main", large_repo, rename_threshold=0)}
+
+        assert stats["novo.py"].old_path is None
+        assert stats["antigo.py"].removed == 20
+
+    def test_arquivo_binario(self, git_repo):
+        commit_files(git_repo, {"logo.png": b"\x89PNG\x00\x01\x02"}, "binario")
+
+        stats = {s.path: s for s in get_diff_numstat("main", git_repo)}
+
+        assert stats["logo.png"].is_binary is True
+        assert stats["logo.png"].changed == 0
+
+    def test_diff_vazio(self, git_repo):
+        assert get_diff_numstat("HEAD", git_repo) == []
+
+    def test_caminhos_excluidos(self, large_repo):
+        rules = IgnoreRules().excluding(["app.py"])
+
+        paths = {s.path for s in get_diff_numstat("main", large_repo, rules)}
+
+        assert "app.py" not in paths
+        assert "mod_00.py" in paths
+
+
+class TestParallelParseDiff:
+    """Testes para parallel_parse_diff."""
+
+    def _serial(self, repo):
+        return as_models(iter_diff_files(stream_git_diff("main", repo)))
+
+    def test_resultado_igual_ao_serial(self, large_repo, monkeypatch):
+        monkeypatch.setattr(diff_parser, "PARALLEL_MIN_FILES", 2)
+
+        parallel = parallel_parse_diff("main", large_repo, jobs=3)
+
+        assert as_models(parallel) == self._serial(large_repo)
+
+    def test_poucos_arquivos_roda_sem_pool(self, large_repo):
+        result = parallel_parse_diff("main", large_repo, jobs=4)
+
+        assert as_models(result) == self._serial(large_repo)
+
+    def test_diff_vazio(self, git_repo):
+        assert parallel_parse_diff("HEAD", git_repo, jobs=2) == []
+
+    def test_reutiliza_numstat(self, large_repo, monkeypatch):
+        monkeypatch.setattr(diff_parser, "PARALLEL_MIN_FILES", 2)
+        stats = get_diff_numstat("main", large_repo)
+
+        def _fail(*args, **kwargs):
+            raise AssertionError("list_changed_files não deveria ser chamado")
+
+        monkeypatch.setattr(diff_parser, "list_changed_files", _fail)
+        parallel = parallel_parse_diff("main", large_repo, jobs=3, stats=stats)
+
+        assert as_models(parallel) == self._serial(large_repo)
+
+
+class TestRevisionHelpers:
+    """Testes para get_merge_base e get_head_sha."""
+
+    def test_merge_base_e_head(self, git_repo):
+        head = get_head_sha(git_repo)
+        merge_base = get_merge_base("main", git_repo)
+
+        assert len(head) == 40
+        assert merge_base == git(git_repo, "rev-parse", "main")
+        assert merge_base != head
@@ -0,0 +1,163 @@
+"""Testes para os extratores de símbolos por linguagem."""
+
+import sys
+
+import pytest
+
+from code_reviewer import extractors
+from code_reviewer.extractors import (
+    GENERIC,
+    definition_ranges,
+    extract_file,
+    extractor_key,
+    get_extractor,
+)
+
+
+def _definitions(path, content):
+    return [symbol for symbol, _ in extract_file(path, content).definitions]
+
+
+class TestRegistry:
+    """Testes para o registry de extratores."""
+
+    def test_chave_por_extensao(self):
+        assert extractor_key("src/app.py") == "python:PythonExtractor"
+        assert extractor_key("web/App.TSX") == "javascript:JavaScriptExtractor"
+        assert extractor_key("README.md") == GENERIC
+
+    def test_extensao_desconhecida_usa_generico(self):
+        assert get_extractor("script.lua").language == "generic"
+
+    def test_carrega_modulo_sob_demanda(self, monkeypatch):
+        monkeypatch.setattr(extractors, "_loaded", {GENERIC: extractors._generic})
+        monkeypatch.delitem(sys.modules, "code_reviewer.extractors.rust", raising=False)
+
+        get_extractor("a.py")
+        assert "code_reviewer.extractors.rust" not in sys.modules
+
+        assert get_extractor("a.rs").language == "rust"
+        assert "code_reviewer.extractors.rust" in sys.modules
+
+
+class TestLanguages:
+    """Testes das definições reconhecidas por linguagem."""
+
+    @pytest.mark.parametrize(
+        "path,content,expected",
+        [
+            (
+                "Service.java",
+                "public class Service {\n"
+                "    @Override\n"
+                "    public List<String> findAll(int limit) {\n"
+                "        return repository.load(limit);\n"
+                "    }\n"
+                "    public Service(Repo repo) {\n"
+                "        this.repo = new Repo(repo);\n"
+                "    }\n"
+                "}\n",
+                ["Service", "findAll", "Service"],
+            ),
+            (
+                "Service.cs",
+                "public sealed class Service {\n"
+                "    public async Task<int> Handle(Request r) {\n",
+                ["Service", "Handle"],
+            ),
+            (
+                "app.kt",
+                "class Repo {\n"
+                "    fun <T> String.parse(x: T): T = x\n"
+                "    suspend fun load(id: Int) {\n",
+                ["Repo", "parse", "load"],
+            ),
+            (
+                "main.rs",
+                "pub struct Config;\nimpl Config {\n    pub async fn load(path: &str) -> Self {\n",
+                ["Config", "load"],
+            ),
+            (
+                "main.go",
+                "type Server struct {}\nfunc (s *Server) Start() error {\nfunc main() {\n",
+                ["Server", "Start", "main"],
+            ),
+            (
+                "user.rb",
+                "module Billing\n  class User\n    def self.find(id)\n    def save\n",
+                ["Billing", "User", "find", "save"],
+            ),
+            (
+                "app.ts",
+                "export const fetchUser = async (id: number): Promise<User> => {\n"
+                "const handler = e => e.id\n"
+                "class Api {\n"
+                "  private async load(id: string): Promise<void> {\n"
+                "    if (id) {\n",
+                ["fetchUser", "handler", "Api", "load"],
+            ),
+        ],
+    )
+    def test_definicoes(self, path, content, expected):
+        assert _definitions(path, content) == expected
+
+    def test_chamadas_ignoram_comentarios_e_definicao(self):
+        content = "func run() {\n    // skip(x)\n    exec(task)\n}\n"
+
+        symbols = extract_file("main.go", content)
+
+        assert symbols.definitions == [("run", 1)]
+        assert symbols.calls == [("exec", 3)]
+
+    def test_python_usa_arvore_sintatica(self):
+        symbols = extract_file("a.py", 'def a():\n    return b("c(x)")\n')
+
+        assert symbols.calls == [("b", 2)]
+
+    def test_padroes_grep_substituem_nomes(self):
+        patterns = get_extractor("main.go").grep_patterns(["Start", "main"])
+
+        assert patterns == [r"^func\s+(\([^)]*\)\s*)?(Start|main)\b", r"^type\s+(Start|main)\b"]
+        assert get_extractor("main.go").grep_patterns([]) == []
+
+
+class TestDefinitionRanges:
+    """Testes da localização do corpo das definições."""
+
+    def test_python_usa_fim_da_arvore_sintatica(self):
+        content = "class A:\n    def b(self):\n        return 1\n\n    x = 2\n\n\ny = 3\n"
+
+        ranges = definition_ranges("a.py", content)
+
+        assert [tuple(r) for r in ranges] == [("A", 1, 5), ("b", 2, 3)]
+
+    def test_chaves_ignoram_strings_e_declaracoes_sem_corpo(self):
+        content = (
+            "abstract class Shape {\n"
+            "    abstract int area();\n"
+            "    String open() {\n"
+            '        return "{";\n'
+            "    }\n"
+            "}\n"
+        )
+
+        ranges = definition_ranges("Shape.java", content)
+
+        assert [tuple(r) for r in ranges] == [("Shape", 1, 6), ("area", 2, 2), ("open", 3, 5)]
+
+    def test_assinatura_em_varias_linhas(self):
+        content = "func Run(\n\tctx context.Context,\n) error {\n\treturn nil\n}\n"
+
+        assert [tuple(r) for r in definition_ranges("main.go", content)] == [("Run", 1, 5)]
+
+    def test_indentacao_inclui_end_do_ruby(self):
+        content = "class Cart\n  def total\n    1\n  end\n\n  def empty?; end\nend\n"
+
+        ranges = definition_ranges("cart.rb", content)
+
+        assert [tuple(r) for r in ranges] == [("Cart", 1, 7), ("total", 2, 4), ("empty", 6, 6)]
+
+    def test_python_invalido_usa_indentacao(self):
+        content = "def a(:\n    return 1\n\nb = 2\n"
+
+        assert [tuple(r) for r in definition_ranges("a.py", content)] == [("a", 1, 2)]
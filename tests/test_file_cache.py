@@ -0,0 +1,72 @@
+"""Testes para o cache de arquivos do context_builder."""
+
+import pytest
+
+from code_reviewer.file_cache import CachedFile, FileCache
+
+
+@pytest.fixture
+def files(tmp_path):
+    """Arquivos de 100 bytes cada."""
+    for name in ("a.py", "b.py", "c.py"):
+        (tmp_path / name).write_text("x" * 99 + "\n")
+    return tmp_path
+
+
+class TestCachedFile:
+    """Testes para o recorte de linhas de CachedFile."""
+
+    @pytest.mark.parametrize("text", ["a\nb\nc\nd", "a\nb\nc\nd\n", "", "\n\n"])
+    @pytest.mark.parametrize("first,last", [(1, 1), (2, 3), (0, 10), (3, 2), (5, 9), (-4, 2)])
+    def test_recorte_igual_ao_split(self, text, first, last):
+        lines = text.split("\n")
+        expected = "\n".join(lines[max(0, first - 1) : max(0, last)])
+
+        assert CachedFile(text, len(text)).lines(first, last) == expected
+
+    def test_numero_de_linhas(self):
+        assert CachedFile("a\nb\n", 4).line_count == 3
+
+
+class TestFileCache:
+    """Testes para FileCache."""
+
+    def test_le_arquivo_uma_vez(self, files, monkeypatch):
+        cache = FileCache(files)
+        loads = []
+        real_load = cache._load
+        monkeypatch.setattr(cache, "_load", lambda path: loads.append(path) or real_load(path))
+
+        cache.read("a.py")
+        cache.lines("a.py", 1, 1)
+
+        assert loads == ["a.py"]
+
+    def test_descarta_menos_usado_ao_exceder_orcamento(self, files):
+        cache = FileCache(files, max_bytes=250)
+        cache.read("a.py")
+        cache.read("b.py")
+        cache.read("a.py")
+        cache.read("c.py")
+
+        assert cache.size == 200
+        assert list(cache._entries) == ["a.py", "c.py"]
+
+    def test_arquivo_maior_que_orcamento_nao_fica_em_cache(self, files):
+        cache = FileCache(files, max_bytes=50)
+
+        assert cache.read("a.py") == "x" * 99 + "\n"
+        assert cache.size == 0
+
+    def test_arquivo_inexistente_ou_binario(self, files):
+        (files / "image.png").write_bytes(b"\xff\xd8\xff")
+        cache = FileCache(files)
+
+        assert cache.read("missing.py") is None
+        assert cache.read("image.png") is None
+        assert cache.lines("missing.py", 1, 5) == ""
+
+    def test_normaliza_quebras_de_linha(self, tmp_path):
+        (tmp_path / "win.py").write_bytes(b"a\r\nb\rc\n")
+
+        assert FileCache(tmp_path).read("win.py") == "a\nb\nc\n"
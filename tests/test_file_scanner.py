@@ -0,0 +1,91 @@
+"""Testes para o scanner de arquivos em processo."""
+
+import pytest
+
+from code_reviewer import file_scanner
+from code_reviewer.extractors import get_extractor
+from code_reviewer.file_scanner import compile_patterns, scan_file, scan_files
+
+CALL = r"\b(charge|refund)\("
+
+
+@pytest.fixture
+def files(tmp_path):
+    """Arquivos com chamadas, um binário e um vazio."""
+    for i in range(6):
+        (tmp_path / f"user_{i}.py").write_text(f"def use_{i}():\n    return charge({i})\n")
+    (tmp_path / "image.bin").write_bytes(b"\0charge(1)")
+    (tmp_path / "empty.py").write_text("")
+    return tmp_path
+
+
+class TestScanFile:
+    """Testes da varredura de um arquivo."""
+
+    def test_linhas_e_numeros(self, tmp_path):
+        (tmp_path / "a.py").write_text("x = 1\ny = charge(x)\n\nrefund(y); charge(y)\n")
+
+        found = scan_file(tmp_path / "a.py", compile_patterns([CALL]))
+
+        assert found == [(2, "y = charge(x)"), (4, "refund(y); charge(y)")]
+
+    def test_ocorrencia_nao_atravessa_linhas(self, tmp_path):
+        # \s casaria com a quebra de linha antes de "charge" no arquivo inteiro
+        (tmp_path / "A.java").write_text("int total =\ncharge(1);\nvoid charge(int x) {\n")
+        patterns = get_extractor("A.java").grep_patterns(["charge"])
+
+        found = scan_file(tmp_path / "A.java", compile_patterns(patterns))
+
+        assert found == [(3, "void charge(int x) {")]
+
+    def test_ancora_vale_por_linha(self, tmp_path):
+        (tmp_path / "a.go").write_text("// x\nfunc (s *S) charge() {}\n  func charge() {}\n")
+        patterns = get_extractor("a.go").grep_patterns(["charge"])
+
+        found = scan_file(tmp_path / "a.go", compile_patterns(patterns))
+
+        assert found == [(2, "func (s *S) charge() {}")]
+
+    def test_binario_vazio_e_ausente(self, files):
+        regex = compile_patterns([CALL])
+
+        assert scan_file(files / "image.bin", regex) == []
+        assert scan_file(files / "empty.py", regex) == []
+        assert scan_file(files / "missing.py", regex) == []
+
+
+class TestScanFiles:
+    """Testes da varredura de vários arquivos."""
+
+    def test_ordem_dos_arquivos(self, files):
+        paths = ["user_3.py", "image.bin", "empty.py", "user_1.py"]
+
+        found = list(scan_files([CALL], paths, files))
+
+        assert found == [
+            ("user_3.py", 2, "    return charge(3)"),
+            ("user_1.py", 2, "    return charge(1)"),
+        ]
+
+    def test_pool_de_processos_igual_ao_serial(self, files, monkeypatch):
+        monkeypatch.setattr(file_scanner, "SCAN_CHUNK_FILES", 2)
+        paths = sorted(path.name for path in files.iterdir())
+
+        serial = list(scan_files([CALL], paths, files, workers=1))
+        parallel = list(scan_files([CALL], paths, files, workers=2))
+
+        assert parallel == serial
+        assert len(serial) == 6
+
+    def test_tempo_esgotado_entrega_resultado_parcial(self, files, monkeypatch):
+        clock = iter(range(100))
+        monkeypatch.setattr(file_scanner.time, "time", lambda: next(clock))
+        paths = [f"user_{i}.py" for i in range(6)]
+
+        # Prazo no instante 3: dois arquivos são varridos antes de esgotar
+        found = list(scan_files([CALL], paths, files, timeout=3))
+
+        assert [path for path, _, _ in found] == ["user_0.py", "user_1.py"]
+
+    def test_sem_padroes(self, files):
+        assert list(scan_files([], ["user_0.py"], files)) == []
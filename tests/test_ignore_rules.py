@@ -0,0 +1,114 @@
+"""Testes para as regras de arquivos ignorados."""
+
+from code_reviewer.ignore_rules import (
+    IGNORE_FILE_NAME,
+    IgnoreRules,
+    glob_to_regex,
+    normalize_glob,
+    read_ignore_file,
+)
+
+
+class TestNormalizeGlob:
+    """Testes para normalize_glob."""
+
+    def test_padrao_sem_barra_casa_em_qualquer_nivel(self):
+        assert normalize_glob("*.lock") == "**/*.lock"
+
+    def test_padrao_com_barra_ancorado_na_raiz(self):
+        assert normalize_glob("/docs/*.md") == "docs/*.md"
+        assert normalize_glob("vendor/lib") == "vendor/lib"
+
+    def test_diretorio(self):
+        assert normalize_glob("node_modules/") == "**/node_modules/**"
+        assert normalize_glob("third_party/generated/") == "third_party/generated/**"
+
+
+class TestGlobToRegex:
+    """Testes para glob_to_regex."""
+
+    def test_asterisco_nao_atravessa_diretorios(self):
+        rules = IgnoreRules(["docs/*.md"])
+
+        assert rules.matches("docs/a.md") is True
+        assert rules.matches("docs/sub/a.md") is False
+
+    def test_classe_de_caracteres(self):
+        assert glob_to_regex("[!a]") == "[^a]"
+
+
+class TestIgnoreRules:
+    """Testes para IgnoreRules."""
+
+    def test_regras_padrao(self):
+        rules = IgnoreRules()
+
+        assert rules.matches("package-lock.json") is True
+        assert rules.matches("web/pnpm-lock.yaml") is True
+        assert rules.matches("app/migrations/0001_initial.py") is True
+        assert rules.matches("src/main.py") is False
+
+    def test_pathspecs_de_exclusao(self):
+        rules = IgnoreRules(["*.lock", "gen/"])
+
+        assert rules.pathspecs() == [
+            ":(exclude,top,glob)**/*.lock",
+            ":(exclude,top,glob)**/gen/**",
+        ]
+
+    def test_remove_duplicatas(self):
+        rules = IgnoreRules(["*.lock", "*.lock"])
+        assert rules.globs == ("**/*.lock",)
+
+    def test_sem_regras(self):
+        rules = IgnoreRules([])
+
+        assert rules.matches("qualquer.py") is False
+        assert rules.pathspecs() == []
+
+    def test_load_inclui_airevignore(self, tmp_path):
+        (tmp_path / IGNORE_FILE_NAME).write_text("# gerados\nfixtures/\n*.snap\n")
+
+        rules = IgnoreRules.load(tmp_path)
+
+        assert rules.matches("tests/fixtures/big.json") is True
+        assert rules.matches("ui/__snapshots__/a.snap") is True
+        assert rules.matches("yarn.lock") is True
+
+    def test_load_sem_airevignore(self, tmp_path):
+        assert IgnoreRules.load(tmp_path).globs == IgnoreRules().globs
+
+
+class TestExcluding:
+    """Testes para IgnoreRules.excluding."""
+
+    def test_exclui_caminhos_exatos(self):
+        rules = IgnoreRules().excluding(["src/gerado.py"])
+
+        assert rules.matches("src/gerado.py")
+        assert rules.matches("poetry.lock")
+        assert not rules.matches("outro/src/gerado.py")
+
+    def test_pathspecs_literais(self):
+        rules = IgnoreRules([]).excluding(["a[1].py"])
+
+        assert rules.pathspecs() == [":(exclude,top,literal)a[1].py"]
+
+    def test_fingerprint_muda(self):
+        rules = IgnoreRules()
+
+        assert rules.excluding(["a.py"]).fingerprint() != rules.fingerprint()
+        assert rules.excluding([]).fingerprint() == rules.fingerprint()
+
+
+class TestReadIgnoreFile:
+    """Testes para read_ignore_file."""
+
+    def test_descarta_comentarios_vazios_e_negacoes(self, tmp_path):
+        path = tmp_path / IGNORE_FILE_NAME
+        path.write_text("# comentário\n\n*.csv\n!keep.csv\n  data/  \n")
+
+        assert read_ignore_file(path) == ["*.csv", "data/"]
+
+    def test_arquivo_inexistente(self, tmp_path):
+        assert read_ignore_file(tmp_path / "nao-existe") == []
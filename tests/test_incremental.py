@@ -0,0 +1,196 @@
+"""Testes para o modo incremental."""
+
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+from click.testing import CliRunner
+
+from code_reviewer.cli import review
+from code_reviewer.incremental import (
+    build_review_state,
+    get_state_dir,
+    is_ancestor,
+    load_review_state,
+    merge_review,
+    save_review_state,
+    state_to_result,
+)
+from code_reviewer.models import (
+    Category,
+    Finding,
+    GoodPractice,
+    ReviewResult,
+    ReviewState,
+    ReviewSummary,
+    Severity,
+)
+
+from .conftest import commit_files, git, init_repo
+
+
+@pytest.fixture
+def git_repo(tmp_path):
+    """Repositório com main e uma branch feature com um commit."""
+    init_repo(tmp_path, {"a.py": "def a():\n    return 1\n", "b.py": "def b():\n    return 2\n"})
+    git(tmp_path, "checkout", "-q", "-b", "feature")
+    commit_files(tmp_path, {"a.py": "def a():\n    return 10\n"}, "muda a")
+    return tmp_path
+
+
+def _finding(file: str, title: str = "Problema") -> Finding:
+    return Finding(
+        file=file,
+        line=1,
+        severity=Severity.WARNING,
+        category=Category.BUG,
+        title=title,
+        description="desc",
+    )
+
+
+def _result(findings: list[Finding]) -> ReviewResult:
+    return ReviewResult(
+        branch="feature",
+        base="main",
+        files_analyzed=1,
+        findings=findings,
+        summary=ReviewSummary(total=len(findings)),
+    )
+
+
+class TestEstado:
+    """Testes para persistência do estado."""
+
+    def test_diretorio_dentro_do_git(self, git_repo):
+        assert get_state_dir(git_repo) == (git_repo / ".git" / "airev" / "reviews").resolve()
+
+    def test_save_e_load(self, git_repo):
+        state = ReviewState(
+            branch="feature/x", base="main", head="abc", findings=[_finding("a.py")]
+        )
+
+        save_review_state(git_repo, state)
+
+        assert load_review_state(git_repo, "feature/x") == state
+
+    def test_load_sem_estado(self, git_repo):
+        assert load_review_state(git_repo, "feature") is None
+
+    def test_load_estado_corrompido(self, git_repo):
+        save_review_state(git_repo, ReviewState(branch="feature", base="main", head="x"))
+        (get_state_dir(git_repo) / "feature.json").write_text("{quebrado")
+
+        assert load_review_state(git_repo, "feature") is None
+
+    def test_is_ancestor(self, git_repo):
+        main_sha = git(git_repo, "rev-parse", "main")
+
+        assert is_ancestor(main_sha, git_repo) is True
+        assert is_ancestor("0" * 40, git_repo) is False
+
+
+class TestMergeReview:
+    """Testes para merge_review."""
+
+    def test_sem_estado_retorna_resultado(self):
+        result = _result([_finding("a.py")])
+        assert merge_review(None, result, {"a.py"}) is result
+
+    def test_substitui_apenas_arquivos_alterados(self):
+        previous = ReviewState(
+            branch="feature",
+            base="main",
+            head="x",
+            files=["a.py", "b.py"],
+            findings=[_finding("a.py", "velho"), _finding("b.py", "mantido")],
+            good_practices=[GoodPractice(file="a.py", line=1, description="ok")],
+        )
+
+        merged = merge_review(previous, _result([_finding("a.py", "novo")]), {"a.py"})
+
+        assert sorted(f.title for f in merged.findings) == ["mantido", "novo"]
+        assert merged.good_practices == []
+        assert merged.summary.total == 2
+        assert merged.summary.warning == 2
+        assert merged.files_analyzed == 2
+
+    def test_build_review_state_acumula_arquivos(self):
+        previous = ReviewState(branch="f", base="main", head="x", files=["b.py"])
+        merged = _result([_finding("a.py")])
+
+        state = build_review_state("f", "main", "y", previous, merged, {"a.py"})
+
+        assert state.files == ["a.py", "b.py"]
+        assert state.head == "y"
+
+    def test_state_to_result(self):
+        state = ReviewState(
+            branch="f", base="main", head="x", files=["a.py"], findings=[_finding("a.py")]
+        )
+
+        result = state_to_result(state)
+
+        assert result.files_analyzed == 1
+        assert result.summary.total == 1
+
+
+def _response(findings: list[dict]) -> str:
+    return json.dumps({"review": {"findings": findings, "good_practices": []}})
+
+
+def _finding_json(file: str, title: str) -> dict:
+    return {
+        "file": file,
+        "line": 1,
+        "severity": "WARNING",
+        "category": "bug",
+        "title": title,
+        "description": "desc",
+        "confidence": 9,
+    }
+
+
+class TestReviewIncremental:
+    """Testes de ponta a ponta do comando review --incremental."""
+
+    def _invoke(self, repo, response):
+        fake_runner = MagicMock()
+        fake_runner.check_availability.return_value = True
+        fake_runner.run.return_value = response
+        args = ["--base", "main", "-w", str(repo), "-i", "-j", "--no-cache", "--no-interactive"]
+        with patch("code_reviewer.cli.get_runner", return_value=fake_runner):
+            result = CliRunner().invoke(review, args)
+        assert result.exit_code == 0, result.output
+        return fake_runner, json.loads(result.output)
+
+    def test_segunda_execucao_revisa_apenas_commits_novos(self, git_repo):
+        _, first = self._invoke(git_repo, _response([_finding_json("a.py", "em a")]))
+        assert [f["title"] for f in first["findings"]] == ["em a"]
+
+        commit_files(git_repo, {"b.py": "def b():\n    return 20\n"}, "muda b")
+
+        runner, second = self._invoke(git_repo, _response([_finding_json("b.py", "em b")]))
+
+        prompt = runner.run.call_args[0][0]
+        assert "### b.py" in prompt
+        assert "### a.py" not in prompt
+        assert sorted(f["title"] for f in second["findings"]) == ["em a", "em b"]
+
+    def test_head_ja_revisado_nao_chama_runner(self, git_repo):
+        self._invoke(git_repo, _response([_finding_json("a.py", "em a")]))
+
+        runner, again = self._invoke(git_repo, _response([]))
+
+        runner.run.assert_not_called()
+        assert [f["title"] for f in again["findings"]] == ["em a"]
+
+    def test_historico_reescrito_faz_revisao_completa(self, git_repo):
+        self._invoke(git_repo, _response([_finding_json("a.py", "em a")]))
+        (git_repo / "a.py").write_text("def a():\n    return 11\n")
+        git(git_repo, "commit", "-q", "--amend", "-am", "amend")
+
+        runner, result = self._invoke(git_repo, _response([_finding_json("a.py", "novo a")]))
+
+        assert "### a.py" in runner.run.call_args[0][0]
+        assert [f["title"] for f in result["findings"]] == ["novo a"]
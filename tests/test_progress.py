@@ -369,6 +369,38 @@ class TestProgressReporterShowDiffFiles:
 
         assert output.getvalue() == ""
 
+    def test_exibe_renomeacao(self):
+        """Arquivos renomeados exibem caminho antigo e novo."""
+        from code_reviewer.models import DiffFile
+
+        output = io.StringIO()
+        console = Console(file=output, force_terminal=False)
+        reporter = ProgressReporter(console=console)
+
+        files = [DiffFile(path="novo.py", old_path="antigo.py", is_renamed=True)]
+
+        reporter.show_diff_files(files)
+
+        assert "antigo.py → novo.py" in output.getvalue()
+
+    def test_usa_contagens_do_numstat(self):
+        """Com stats do prepass, as contagens vêm do numstat."""
+        from code_reviewer.diff_parser import FileStat
+        from code_reviewer.models import DiffFile
+
+        output = io.StringIO()
+        console = Console(file=output, force_terminal=False)
+        reporter = ProgressReporter(console=console)
+
+        files = [DiffFile(path="a.py", hunks=[])]
+        stats = {"a.py": FileStat("a.py", 7, 3)}
+
+        reporter.show_diff_files(files, stats)
+
+        result = output.getvalue()
+        assert "+7" in result
+        assert "-3" in result
+
 
 class TestProgressReporterShowDiffSummary:
     """Testes para método show_diff_summary() do ProgressReporter."""
@@ -433,6 +465,28 @@ class TestProgressReporterShowDiffSummary:
 
         assert output.getvalue() == ""
 
+    def test_totais_do_numstat(self):
+        """Com stats do prepass, os totais somam o numstat dos arquivos exibidos."""
+        from code_reviewer.diff_parser import FileStat
+        from code_reviewer.models import DiffFile
+
+        output = io.StringIO()
+        console = Console(file=output, force_terminal=False)
+        reporter = ProgressReporter(console=console)
+
+        files = [DiffFile(path="a.py", hunks=[]), DiffFile(path="b.py", hunks=[])]
+        stats = {
+            "a.py": FileStat("a.py", 5, 1),
+            "b.py": FileStat("b.py", 2, 4),
+            "c.py": FileStat("c.py", 100, 100),
+        }
+
+        reporter.show_diff_summary(files, stats)
+
+        result = output.getvalue()
+        assert "+7" in result
+        assert "-5" in result
+
 
 class TestProgressReporterShowDependencies:
     """Testes para método show_dependencies() do ProgressReporter."""
@@ -69,6 +69,35 @@ class TestFormatDiffForPrompt:
         assert "removido.py" in result
         assert "(arquivo removido)" in result
 
+    def test_renomeacao_pura_em_uma_linha(self):
+        diff_file = DiffFile(
+            path="novo/util.py", old_path="antigo/util.py", is_renamed=True, similarity=100
+        )
+
+        result = format_diff_for_prompt([diff_file])
+
+        assert result.strip() == "### novo/util.py (renomeado de antigo/util.py, sem alterações)"
+
+    def test_renomeacao_com_edicoes_envia_apenas_hunks(self):
+        diff_file = DiffFile(
+            path="core_v2.py",
+            old_path="core.py",
+            is_renamed=True,
+            similarity=90,
+            hunks=[
+                DiffHunk(
+                    start_line_old=1,
+                    start_line_new=1,
+                    added_lines=[DiffLine(line_number=2, content="x = 2", is_addition=True)],
+                )
+            ],
+        )
+
+        result = format_diff_for_prompt([diff_file])
+
+        assert "(renomeado de core.py, 90% similar)" in result
+        assert "+x = 2" in result
+
     def test_formata_linhas_contexto_com_espaco(self):
         """Verifica que linhas de contexto são formatadas com espaço inicial."""
         diff_file = DiffFile(
@@ -194,6 +223,37 @@ class TestFormatContextForPrompt:
 
         assert "linhas omitidas" in result
 
+    def test_formata_trechos_das_funcoes_e_assinaturas(self):
+        graphs = [
+            ContextGraph(
+                function_name="save",
+                file="service.py",
+                excerpt="    def save(self):\n        return 1",
+                excerpt_start=10,
+                excerpt_end=11,
+                sibling_signatures=["def load(self):", "def delete(self):"],
+            ),
+            ContextGraph(
+                function_name="delete",
+                file="service.py",
+                excerpt="    def delete(self):\n        return 2",
+                excerpt_start=20,
+                excerpt_end=21,
+                sibling_signatures=["def load(self):", "def save(self):"],
+            ),
+        ]
+
+        result = format_context_for_prompt(graphs)
+
+        assert result.count("### service.py") == 1
+        assert "Linhas 10-11:" in result
+        assert "Linhas 20-21:" in result
+        # Apenas a vizinha que não aparece nos trechos é listada como assinatura
+        signatures = result.split("Outras definições no mesmo escopo:")[1]
+        assert "def load(self):" in signatures
+        assert "def save(self):" not in signatures
+        assert "def delete(self):" not in signatures
+
 
 class TestFormatReferencesForPrompt:
     """Testes para função format_references_for_prompt."""
@@ -244,6 +304,39 @@ class TestFormatReferencesForPrompt:
 
         assert "sem referências encontradas" in result
 
+    def test_busca_truncada_nao_e_lida_como_sem_referencias(self):
+        graph = ContextGraph(
+            function_name="charge",
+            file="payment.py",
+            references_truncated=True,
+        )
+
+        result = format_references_for_prompt([graph])
+
+        assert "interrompida pelo tempo limite" in result
+        assert "sem referências encontradas" not in result
+
+    def test_referencias_indiretas_com_codigo(self):
+        graph = ContextGraph(
+            function_name="service",
+            file="app/service.py",
+            callers=[
+                FunctionRef(
+                    file="app/routes.py",
+                    line=2,
+                    snippet="return handler()",
+                    function_name="route",
+                    depth=2,
+                    context="def route():\n    return handler()",
+                )
+            ],
+        )
+
+        result = format_references_for_prompt([graph])
+
+        assert "app/routes.py:2 → `return handler()` (indireta, 2 níveis)" in result
+        assert "  def route():\n      return handler()" in result
+
 
 class TestBuildPrompt:
     """Testes para função build_prompt."""
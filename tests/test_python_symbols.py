@@ -0,0 +1,99 @@
+"""Testes para a extração de símbolos Python via ast."""
+
+import subprocess
+
+from code_reviewer import python_symbols
+from code_reviewer.python_symbols import analyze_python, blob_sha
+
+SOURCE = """from payment import process_payment as pay
+import billing as b
+
+
+class Checkout:
+    def run(self, cart):
+        label = "charge(cart)"
+        self.validate(cart)  # notify(cart)
+        return pay(b.total(
+            cart))
+
+    def validate(self, cart):
+        return cart.charge(self.limits.get("x"))
+"""
+
+
+class TestAnalyzePython:
+    """Testes para analyze_python."""
+
+    def test_definicoes(self):
+        symbols = analyze_python(SOURCE)
+
+        assert symbols.definitions == [("Checkout", 5), ("run", 6), ("validate", 12)]
+
+    def test_chamadas_resolvem_aliases_e_atributos(self):
+        symbols = analyze_python(SOURCE)
+
+        assert symbols.calls == [("validate", 8), ("process_payment", 9), ("total", 9)]
+
+    def test_receptor_desconhecido_nao_vira_chamada(self):
+        called = {symbol for symbol, _ in analyze_python(SOURCE).calls}
+
+        # cart.charge() e self.limits.get() não se ligam a charge/get de outro arquivo
+        assert "get" not in called
+        assert called == {"validate", "process_payment", "total"}
+
+    def test_self_resolve_apenas_metodos_da_classe(self):
+        content = (
+            "class Repo:\n"
+            "    def save(self):\n"
+            "        self.flush()\n"
+            "        return self.charge()\n"
+            "\n"
+            "    def charge(self):\n"
+            "        return session.get(1)\n"
+        )
+
+        assert analyze_python(content).calls == [("charge", 4)]
+
+    def test_modulos_importados(self):
+        content = (
+            "def run(d):\n"
+            "    import payment.gateway as gw\n"
+            "    from billing import invoices\n"
+            "    import os.path\n"
+            "    gw.charge(1)\n"
+            "    invoices.charge(2)\n"
+            "    os.path.join('a')\n"
+            "    d.charge(3)\n"
+            "    dict.get(d, 'x')\n"
+        )
+
+        assert analyze_python(content).calls == [("charge", 5), ("charge", 6), ("join", 7)]
+
+    def test_ignora_strings_e_comentarios(self):
+        called = {symbol for symbol, _ in analyze_python(SOURCE).calls}
+
+        assert "charge" not in called
+        assert "notify" not in called
+
+    def test_codigo_invalido_retorna_none(self):
+        assert analyze_python("def quebrado(:\n") is None
+
+    def test_cache_por_blob(self, monkeypatch):
+        content = "def cached():\n    return other()\n"
+        first = analyze_python(content)
+
+        def _fail(content):
+            raise AssertionError("conteúdo já analisado")
+
+        monkeypatch.setattr(python_symbols, "_analyze", _fail)
+
+        assert analyze_python(content) is first
+
+
+def test_blob_sha_igual_ao_git():
+    data = b"print('ok')\n"
+    result = subprocess.run(
+        ["git", "hash-object", "--stdin"], input=data, capture_output=True, check=True
+    )
+
+    assert blob_sha(data) == result.stdout.decode().strip()
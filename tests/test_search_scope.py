@@ -0,0 +1,180 @@
+"""Testes para o escopo das buscas em monorepos."""
+
+import json
+
+import pytest
+
+from code_reviewer.search_scope import (
+    Package,
+    SearchScopes,
+    load_search_scopes,
+    read_package,
+    resolve_search_root,
+)
+
+
+def _scopes(*packages, files=()):
+    """SearchScopes a partir de tuplas (raiz, nome, dependências)."""
+    return SearchScopes(
+        [Package(root, name, frozenset(deps)) for root, name, deps in packages], list(files)
+    )
+
+
+class TestReadPackage:
+    """Testes da leitura dos manifestos."""
+
+    def test_pyproject_pep621_e_poetry(self, tmp_path):
+        (tmp_path / "a").mkdir()
+        (tmp_path / "a" / "pyproject.toml").write_text(
+            '[project]\nname = "My_Lib"\n'
+            'dependencies = ["Core.Utils>=1", "requests[socks]"]\n'
+            '[project.optional-dependencies]\ndev = ["pytest"]\n'
+        )
+        (tmp_path / "pyproject.toml").write_text(
+            '[tool.poetry]\nname = "root"\n[tool.poetry.dependencies]\npython = "^3.10"\n'
+        )
+
+        assert read_package(tmp_path, "a/pyproject.toml") == Package(
+            "a", "my-lib", frozenset({"core-utils", "requests", "pytest"})
+        )
+        assert read_package(tmp_path, "pyproject.toml") == Package(
+            "", "root", frozenset({"python"})
+        )
+
+    def test_package_json(self, tmp_path):
+        (tmp_path / "web").mkdir()
+        (tmp_path / "web" / "package.json").write_text(
+            json.dumps(
+                {
+                    "name": "@acme/web",
+                    "dependencies": {"@acme/ui": "*"},
+                    "devDependencies": {"jest": "29"},
+                }
+            )
+        )
+
+        package = read_package(tmp_path, "web/package.json")
+
+        assert package == Package("web", "@acme/web", frozenset({"@acme/ui", "jest"}))
+
+    def test_go_mod(self, tmp_path):
+        (tmp_path / "svc").mkdir()
+        (tmp_path / "svc" / "go.mod").write_text(
+            "module example.com/svc\n\ngo 1.21\n\n"
+            "require example.com/lib v0.1.0\n"
+            "require (\n\tgithub.com/pkg/errors v0.9.1 // indirect\n)\n"
+        )
+
+        package = read_package(tmp_path, "svc/go.mod")
+
+        assert package.name == "example.com/svc"
+        assert package.dependencies == {"example.com/lib", "github.com/pkg/errors"}
+
+    def test_manifesto_invalido_ou_ausente(self, tmp_path):
+        (tmp_path / "package.json").write_text("{invalido")
+
+        assert read_package(tmp_path, "package.json") == Package("", None, frozenset())
+        assert read_package(tmp_path, "x/go.mod") == Package("x", None, frozenset())
+
+
+class TestSearchScopes:
+    """Testes dos escopos de busca."""
+
+    FILES = ["libs/core/a.py", "libs/core/sub/b.py", "apps/api/c.py", "apps/web/d.py", "e.py"]
+
+    def test_pacote_mais_interno(self):
+        scopes = _scopes(
+            ("libs/core", "core", ()), ("libs/core/sub", "sub", ()), files=self.FILES
+        )
+
+        assert scopes.package_of("libs/core/a.py") == "libs/core"
+        assert scopes.package_of("libs/core/sub/b.py") == "libs/core/sub"
+        assert scopes.package_of("apps/api/c.py") is None
+        assert scopes.is_monorepo
+
+    def test_pacote_na_raiz_contem_arquivos_soltos(self):
+        scopes = _scopes(("", "root", ()), files=self.FILES)
+
+        assert scopes.package_of("apps/api/c.py") == ""
+        assert not scopes.is_monorepo
+
+    def test_dependentes_e_dependencias(self):
+        scopes = _scopes(
+            ("libs/core", "core", ()),
+            ("apps/api", "api", ("core", "requests")),
+            ("apps/web", "web", ()),
+            files=self.FILES,
+        )
+
+        assert scopes.dependents("libs/core") == ["apps/api"]
+        assert scopes.dependencies("apps/api") == ["libs/core"]
+        assert scopes.caller_scope("libs/core/a.py") == {"libs/core", "apps/api"}
+        assert scopes.definition_scope("apps/api/c.py") == {"apps/api", "libs/core"}
+        assert scopes.caller_scope("e.py") == {None}
+
+    def test_arquivos_do_escopo(self):
+        scopes = _scopes(
+            ("libs/core", "core", ()), ("apps/api", "api", ("core",)), files=self.FILES
+        )
+
+        assert scopes.files_in({"libs/core", "apps/api"}) == [
+            "libs/core/a.py",
+            "libs/core/sub/b.py",
+            "apps/api/c.py",
+        ]
+        assert scopes.files_in({None}) == ["apps/web/d.py", "e.py"]
+        assert not scopes.covers_all({"libs/core", "apps/api"})
+        assert scopes.files_in({"libs/core", "apps/api", None}) == self.FILES
+
+    def test_mesma_raiz_com_varios_manifestos(self):
+        scopes = SearchScopes(
+            [
+                Package("app", "app", frozenset({"a"})),
+                Package("app", None, frozenset({"b"})),
+            ],
+            ["app/x.py"],
+        )
+
+        assert scopes.packages["app"] == Package("app", "app", frozenset({"a", "b"}))
+
+
+class TestLoadSearchScopes:
+    """Testes da detecção de pacotes."""
+
+    def test_manifestos_e_raizes_configuradas(self, tmp_path):
+        (tmp_path / "core").mkdir()
+        (tmp_path / "core" / "package.json").write_text('{"name": "core"}')
+        files = ["core/index.js", "tools/run.js", "other/x.js"]
+
+        scopes = load_search_scopes(
+            files, tmp_path, search_roots=["tools/"], repository_files=["core/package.json", *files]
+        )
+
+        assert scopes.package_of("core/index.js") == "core"
+        assert scopes.package_of("tools/run.js") == "tools"
+        assert scopes.package_of("other/x.js") is None
+        assert scopes.files == files
+
+    def test_raiz_absoluta_dentro_do_repositorio(self, tmp_path):
+        (tmp_path / "tools").mkdir()
+        files = ["tools/run.js"]
+
+        scopes = load_search_scopes(files, tmp_path, search_roots=[str(tmp_path / "tools")])
+
+        assert scopes.package_of("tools/run.js") == "tools"
+
+
+class TestResolveSearchRoot:
+    """Testes da normalização das raízes configuradas."""
+
+    def test_relativas_e_absolutas(self, tmp_path):
+        assert resolve_search_root("tools/", tmp_path) == "tools"
+        assert resolve_search_root("./a/../b", tmp_path) == "b"
+        assert resolve_search_root(".", tmp_path) == ""
+        assert resolve_search_root(str(tmp_path / "libs" / "core"), tmp_path) == "libs/core"
+
+    def test_fora_do_repositorio(self, tmp_path):
+        with pytest.raises(ValueError):
+            resolve_search_root("/", tmp_path / "repo")
+        with pytest.raises(ValueError):
+            resolve_search_root("../outro", tmp_path)
@@ -0,0 +1,178 @@
+"""Testes para o índice persistente de símbolos."""
+
+import subprocess
+
+import pytest
+
+from code_reviewer.context_builder import build_context_graph, find_callees, find_callers
+from code_reviewer.diff_parser import parse_diff
+from code_reviewer.symbol_index import (
+    SymbolIndex,
+    extract_file_symbols,
+    get_index_path,
+)
+
+from .conftest import git
+
+
+class TestExtractFileSymbols:
+    """Testes para extract_file_symbols."""
+
+    def test_definicoes_e_chamadas(self):
+        definitions, calls = extract_file_symbols(
+            "tarefa.sh", "def a(x):\n    return b(x) + c (x)\n"
+        )
+
+        assert definitions == [("a", 1, "def a(x):")]
+        assert [symbol for symbol, _, _ in calls] == ["b"]
+
+    def test_ignora_comentarios(self):
+        definitions, calls = extract_file_symbols("tarefa.sh", "# chama(x)\n// outra(y)\n")
+
+        assert definitions == []
+        assert calls == []
+
+    def test_linha_de_definicao_nao_conta_como_chamada(self):
+        _, calls = extract_file_symbols("run.js", "function run(task) { return exec(task) }\n")
+
+        assert [symbol for symbol, _, _ in calls] == ["exec"]
+
+    def test_python_usa_arvore_sintatica(self):
+        definitions, calls = extract_file_symbols(
+            "a.py", 'def a(x):\n    return b(x, "c(x)")\n'
+        )
+
+        assert definitions == [("a", 1, "def a(x):")]
+        assert calls == [("b", 2, 'return b(x, "c(x)")')]
+
+    def test_python_invalido_usa_extracao_textual(self):
+        definitions, _ = extract_file_symbols("a.py", "def a(x):\n  return (\n")
+
+        assert definitions == [("a", 1, "def a(x):")]
+
+
+class TestSymbolIndex:
+    """Testes para SymbolIndex."""
+
+    def test_indice_fica_no_diretorio_git(self, repo):
+        SymbolIndex.open(repo).close()
+
+        assert get_index_path(repo) == (repo / ".git" / "airev" / "index" / "symbols.db")
+        assert get_index_path(repo).exists()
+
+    def test_find_callers(self, repo):
+        index = SymbolIndex.open(repo)
+
+        callers = index.find_callers("process_payment", limit=5)
+
+        assert [(ref.file, ref.line) for ref in callers] == [("checkout.py", 6)]
+        assert callers[0].snippet == "return process_payment(cart.total)"
+
+    def test_metodo_homonimo_nao_e_caller(self, repo):
+        (repo / "orders.py").write_text(
+            "import payment\n\n\n"
+            "def pay(order, gateway):\n"
+            "    gateway.charge(order)\n"
+            "    return payment.charge(order)\n"
+        )
+        index = SymbolIndex.open(repo)
+
+        callers = index.find_callers("charge", limit=5)
+
+        assert [(ref.file, ref.line) for ref in callers] == [
+            ("orders.py", 6),
+            ("payment.py", 2),
+        ]
+
+    def test_find_definition(self, repo):
+        index = SymbolIndex.open(repo)
+
+        definition = index.find_definition("charge")
+
+        assert (definition.file, definition.line) == ("payment.py", 5)
+        assert definition.function_name == "charge"
+        assert index.find_definition("inexistente") is None
+
+    def test_reabrir_sem_mudancas_nao_varre_arquivos(self, repo):
+        SymbolIndex.open(repo).close()
+        index = SymbolIndex.open(repo)
+
+        assert index.refresh(repo) == (0, 0)
+
+    def test_varre_apenas_arquivos_alterados(self, repo):
+        index = SymbolIndex.open(repo)
+        (repo / "refund.py").write_text("def refund(p):\n    return process_payment(-p)\n")
+        git(repo, "add", "refund.py")
+        git(repo, "commit", "-q", "-m", "refund")
+
+        assert index.refresh(repo) == (1, 0)
+        assert [ref.file for ref in index.find_callers("process_payment", 5)] == [
+            "checkout.py",
+            "refund.py",
+        ]
+
+    def test_edicao_nao_commitada_e_indexada(self, repo):
+        index = SymbolIndex.open(repo)
+        (repo / "checkout.py").write_text("def checkout(cart):\n    return pay(cart)\n")
+
+        assert index.refresh(repo) == (1, 0)
+        assert index.find_callers("process_payment", 5) == []
+        assert [ref.file for ref in index.find_callers("pay", 5)] == ["checkout.py"]
+
+    def test_arquivo_removido_sai_do_indice(self, repo):
+        index = SymbolIndex.open(repo)
+        git(repo, "rm", "-q", "checkout.py")
+
+        assert index.refresh(repo) == (0, 1)
+        assert index.find_callers("process_payment", 5) == []
+
+    def test_troca_de_branch_mantem_indice_consistente(self, repo):
+        git(repo, "checkout", "-q", "-b", "feature")
+        (repo / "payment.py").write_text("def charge(amount):\n    return amount\n")
+        git(repo, "commit", "-q", "-am", "remove process_payment")
+        index = SymbolIndex.open(repo)
+        assert index.find_definition("process_payment") is None
+
+        git(repo, "checkout", "-q", "main")
+
+        assert index.refresh(repo) == (1, 0)
+        assert index.find_definition("process_payment").file == "payment.py"
+
+    def test_ignora_diretorios_excluidos(self, repo):
+        (repo / "node_modules").mkdir()
+        (repo / "node_modules" / "lib.js").write_text("process_payment(1)\n")
+        index = SymbolIndex.open(repo)
+
+        assert [ref.file for ref in index.find_callers("process_payment", 5)] == ["checkout.py"]
+
+    def test_fora_de_repositorio_git(self, tmp_path):
+        with pytest.raises(subprocess.CalledProcessError):
+            SymbolIndex.open(tmp_path)
+
+
+class TestContextWithIndex:
+    """Testes do context_builder usando o índice."""
+
+    def test_find_callers_e_callees_via_indice(self, repo):
+        index = SymbolIndex.open(repo)
+
+        callers = find_callers("process_payment", repo, index)
+        callees = find_callees(["    value = charge(10)"], repo, index)
+
+        assert [ref.file for ref in callers] == ["checkout.py"]
+        assert [(ref.file, ref.function_name) for ref in callees] == [("payment.py", "charge")]
+
+    def test_build_context_graph_com_indice(self, repo):
+        diff = (
+            "diff --git a/payment.py b/payment.py\n"
+            "@@ -2 +2 @@ def process_payment(amount):\n"
+            "-    return amount\n"
+            "+    return charge(amount)\n"
+        )
+        index = SymbolIndex.open(repo)
+
+        graphs = build_context_graph(parse_diff(diff), repo, index)
+
+        assert graphs[0].function_name == "process_payment"
+        assert [ref.file for ref in graphs[0].callers] == ["checkout.py"]
+        assert [ref.function_name for ref in graphs[0].callees] == ["charge"]
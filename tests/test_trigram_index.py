@@ -0,0 +1,129 @@
+"""Testes para o índice de trigramas."""
+
+from code_reviewer import trigram_index
+from code_reviewer.context_builder import find_callees, find_callers, search_symbols
+from code_reviewer.trigram_index import (
+    TrigramIndex,
+    file_trigrams,
+    get_index_dir,
+    query_trigrams,
+)
+
+
+class TestTrigrams:
+    """Testes da extração de trigramas."""
+
+    def test_apenas_identificadores_e_chamadas(self):
+        grams = file_trigrams(b"x = foo(1) + 'a b'\n")
+
+        assert grams == set(query_trigrams("foo("))
+
+    def test_termo_curto_sem_trigramas(self):
+        assert query_trigrams("f(") == []
+        assert len(query_trigrams("abcd")) == 2
+
+
+class TestTrigramIndex:
+    """Testes do índice persistente de trigramas."""
+
+    def test_candidatos_de_chamadas_e_definicoes(self, repo):
+        index = TrigramIndex.open(repo)
+        try:
+            assert index.candidates(["process_payment"], []) == {"payment.py", "checkout.py"}
+            assert index.candidates([], ["charge"]) == {"payment.py"}
+            assert index.candidates(["missing"], []) == set()
+            assert index.candidates(["f"], []) is None
+        finally:
+            index.close()
+
+    def test_narrow_mantem_arquivos_desconhecidos(self, repo):
+        index = TrigramIndex.open(repo)
+        try:
+            files = ["checkout.py", "notes.md", "payment.py", "new.py"]
+            assert index.narrow(files, [], ["charge"]) == ["payment.py", "new.py"]
+            assert index.narrow(files, ["f"], []) == files
+        finally:
+            index.close()
+
+    def test_reabre_sem_reler_arquivos(self, repo):
+        TrigramIndex.open(repo).close()
+
+        index = TrigramIndex.open(repo)
+        try:
+            assert index.refresh(repo) == 0
+        finally:
+            index.close()
+
+    def test_atualiza_apenas_arquivos_alterados(self, repo):
+        TrigramIndex.open(repo).close()
+        (repo / "checkout.py").write_text("def checkout(cart):\n    return refund(cart)\n")
+        (repo / "refund.py").write_text("def refund(x):\n    return charge(x)\n")
+
+        index = TrigramIndex.open(repo)
+        try:
+            assert index.candidates(["process_payment"], []) == {"payment.py"}
+            assert index.candidates(["charge"], []) == {"payment.py", "refund.py"}
+            assert index.refresh(repo) == 0
+        finally:
+            index.close()
+        assert len(list(get_index_dir(repo).glob("*.tri"))) == 2
+
+    def test_funde_segmentos_acumulados(self, repo, monkeypatch):
+        monkeypatch.setattr(trigram_index, "MAX_SEGMENTS", 2)
+        for i in range(3):
+            TrigramIndex.open(repo).close()
+            (repo / f"user_{i}.py").write_text(f"def use_{i}():\n    return charge({i})\n")
+
+        index = TrigramIndex.open(repo)
+        try:
+            assert index.candidates(["charge"], []) == {
+                "payment.py",
+                "user_0.py",
+                "user_1.py",
+                "user_2.py",
+            }
+        finally:
+            index.close()
+        # Três segmentos fundidos em um, mais o segmento de user_2.py
+        assert len(list(get_index_dir(repo).glob("*.tri"))) == 2
+
+    def test_segmento_corrompido_e_reconstruido(self, repo):
+        TrigramIndex.open(repo).close()
+        for segment in get_index_dir(repo).glob("*.tri"):
+            segment.write_bytes(b"lixo")
+
+        index = TrigramIndex.open(repo)
+        try:
+            assert index.candidates([], ["charge"]) == {"payment.py"}
+        finally:
+            index.close()
+        assert len(list(get_index_dir(repo).glob("*.tri"))) == 1
+
+
+class TestTrigramSearch:
+    """Testes da busca por grep restrita pelo índice de trigramas."""
+
+    def test_grep_apenas_nos_candidatos(self, repo, grep_calls):
+        index = TrigramIndex.open(repo)
+        try:
+            refs = find_callers("process_payment", repo, trigrams=index)
+            callees = find_callees(["    charge(1)"], repo, trigrams=index)
+        finally:
+            index.close()
+
+        assert [ref.file for ref in refs] == ["checkout.py"]
+        assert [ref.file for ref in callees] == ["payment.py"]
+        assert [sorted(cmd[cmd.index("--") + 1 :]) for cmd in grep_calls] == [
+            ["checkout.py", "payment.py"],
+            ["payment.py"],
+        ]
+
+    def test_sem_candidatos_nao_executa_grep(self, repo, grep_calls):
+        index = TrigramIndex.open(repo)
+        try:
+            matches = search_symbols(["missing"], [], repo, trigrams=index)
+        finally:
+            index.close()
+
+        assert matches.callers == {}
+        assert grep_calls == []